@@ -19,14 +19,23 @@ Design principles:
   - Gold standards are mechanistic paths: Drug→Target→Gene→Disease
   - Scoring measures entity resolution accuracy, edge coverage, and path completeness
   - Catalog is versioned and extensible — start with 15 CQs, grow over time
+  - Catalog lives in SQLite so lookups, filters and writes touch only the rows involved
 """
 
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable
 from enum import Enum
+import abc
+import asyncio
+import hashlib
 import json
+import math
 import os
+import re
+import sqlite3
+import time
+import uuid
 from datetime import datetime, timezone
 
 mcp = FastMCP("cq_eval_mcp")
@@ -85,58 +94,731 @@ class StepResult(BaseModel):
     status: str = Field(description="pass, fail, partial, skip")
     expected_curie: Optional[str] = None
     actual_curie: Optional[str] = None
+    source_curie: Optional[str] = Field(default=None, description="Source CURIE when the step observed an edge to actual_curie")
+    relation: Optional[str] = Field(default=None, description="Relation of the observed edge (any relation if omitted)")
     tool_used: Optional[str] = None
     tier: str = "tier1"
     notes: str = ""
+    latency_ms: Optional[float] = Field(default=None, description="Wall-clock time of the tool call")
+    bytes_returned: Optional[int] = Field(default=None, description="Size of the tool response")
+    retries: int = Field(default=0, description="Retries before the recorded outcome")
 
 class CQResult(BaseModel):
     """Complete result of evaluating a competency question."""
     model_config = ConfigDict(extra="forbid")
     cq_id: str
+    run_id: Optional[str] = None
     timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     step_results: List[StepResult] = Field(default_factory=list)
     entity_score: float = Field(default=0.0, description="Fraction of entities resolved correctly (0-1)")
     edge_score: float = Field(default=0.0, description="Fraction of edges validated (0-1)")
     path_complete: bool = Field(default=False, description="Whether full gold standard path was reconstructed")
     overall_score: float = Field(default=0.0, description="Weighted overall score (0-1)")
+    path: Dict[str, Any] = Field(default_factory=dict, description="Edge coverage, longest reconstructed sub-path and missing gaps")
+    latency: Dict[str, Any] = Field(default_factory=dict, description="p50/p95 step latency by tool and tier")
     notes: str = ""
 
 
 # ---------------------------------------------------------------------------
-# Catalog storage (JSON file on disk, versioned)
+# Catalog storage (SQLite, indexed by id, category, difficulty and tag)
 # ---------------------------------------------------------------------------
 
 CATALOG_DIR = os.environ.get("CQ_CATALOG_DIR", os.path.join(os.path.dirname(__file__), "catalog"))
-CATALOG_FILE = os.path.join(CATALOG_DIR, "cq-catalog.json")
+CATALOG_FILE = os.path.join(CATALOG_DIR, "cq-catalog.json")  # legacy format, migrated on first open
+CATALOG_DB = os.path.join(CATALOG_DIR, "cq-catalog.db")
 RESULTS_DIR = os.path.join(CATALOG_DIR, "results")
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    version TEXT NOT NULL,
+    n_entities INTEGER NOT NULL,
+    n_edges INTEGER NOT NULL,
+    n_steps INTEGER NOT NULL,
+    tags TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_category ON questions(category);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions(difficulty);
+CREATE TABLE IF NOT EXISTS question_tags (
+    tag TEXT NOT NULL,
+    cq_id TEXT NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, cq_id)
+);
+CREATE TABLE IF NOT EXISTS import_hashes (
+    source TEXT NOT NULL,
+    cq_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (source, cq_id)
+);
+CREATE TABLE IF NOT EXISTS results (
+    cq_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    entity_score REAL NOT NULL,
+    edge_score REAL NOT NULL,
+    path_complete INTEGER NOT NULL,
+    overall_score REAL NOT NULL,
+    filename TEXT NOT NULL,
+    PRIMARY KEY (cq_id, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results(timestamp);
+CREATE TABLE IF NOT EXISTS step_metrics (
+    cq_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    step_id TEXT NOT NULL,
+    tool_used TEXT,
+    tier TEXT NOT NULL,
+    status TEXT NOT NULL,
+    latency_ms REAL,
+    bytes_returned INTEGER,
+    retries INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_step_metrics_cq ON step_metrics(cq_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_step_metrics_tool ON step_metrics(tool_used, timestamp);
+CREATE INDEX IF NOT EXISTS idx_step_metrics_tier ON step_metrics(tier, timestamp);
+CREATE TABLE IF NOT EXISTS eval_runs (
+    run_id TEXT PRIMARY KEY,
+    cq_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    result_timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_eval_runs_cq ON eval_runs(cq_id, status);
+CREATE TABLE IF NOT EXISTS run_steps (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES eval_runs(run_id),
+    data TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_steps_run ON run_steps(run_id, seq);
+CREATE TRIGGER IF NOT EXISTS trg_questions_insert AFTER INSERT ON questions
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_questions_update AFTER UPDATE ON questions
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_questions_delete AFTER DELETE ON questions
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_question_tags_insert AFTER INSERT ON question_tags
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_question_tags_delete AFTER DELETE ON question_tags
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_catalog_version_insert AFTER INSERT ON catalog_meta WHEN NEW.key = 'version'
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+CREATE TRIGGER IF NOT EXISTS trg_catalog_version_update AFTER UPDATE ON catalog_meta WHEN NEW.key = 'version'
+BEGIN UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation'; END;
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+
 
 def _ensure_dirs():
     os.makedirs(CATALOG_DIR, exist_ok=True)
     os.makedirs(RESULTS_DIR, exist_ok=True)
 
 
-def _load_catalog() -> Dict[str, Any]:
-    _ensure_dirs()
-    if os.path.exists(CATALOG_FILE):
-        with open(CATALOG_FILE, "r") as f:
-            return json.load(f)
-    return {"version": "1.0.0", "questions": {}, "metadata": {"created": datetime.now(timezone.utc).isoformat()}}
+def _db() -> sqlite3.Connection:
+    """Open (once per process) the catalog database, creating and migrating it as needed."""
+    global _conn
+    if _conn is None:
+        _ensure_dirs()
+        conn = sqlite3.connect(CATALOG_DB, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL appends survive a process crash
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(_SCHEMA)
+        with conn:
+            # Bumped by the trg_* triggers on every catalog write (see _CatalogCache)
+            conn.execute("INSERT OR IGNORE INTO catalog_meta VALUES ('generation', 0)")
+            conn.execute("INSERT OR IGNORE INTO catalog_meta VALUES ('version', '1.0.0')")
+            conn.execute(
+                "INSERT OR IGNORE INTO catalog_meta VALUES ('created', ?)",
+                (datetime.now(timezone.utc).isoformat(),)
+            )
+        _migrate_legacy_catalog(conn)
+        _backfill_results_index(conn)
+        _dedupe_step_metrics(conn)
+        _conn = conn
+    return _conn
+
+
+def _migrate_legacy_catalog(conn: sqlite3.Connection):
+    """One-time import of a pre-SQLite cq-catalog.json into an empty database."""
+    if not os.path.exists(CATALOG_FILE):
+        return
+    if conn.execute("SELECT 1 FROM questions LIMIT 1").fetchone():
+        return
+    with open(CATALOG_FILE, "r") as f:
+        legacy = json.load(f)
+    with conn:
+        _put_questions(conn, legacy.get("questions", {}).values())
+        conn.execute(
+            "INSERT OR REPLACE INTO catalog_meta VALUES ('version', ?)",
+            (legacy.get("version", "1.0.0"),)
+        )
+        conn.execute("INSERT OR REPLACE INTO catalog_meta VALUES ('migrated_from', ?)", (CATALOG_FILE,))
+
+
+def _put_questions(conn: sqlite3.Connection, questions):
+    """Upsert question dicts and their tag index rows. Caller owns the transaction."""
+    for cq_data in questions:
+        cq_id = cq_data["id"]
+        tags = cq_data.get("tags", [])
+        conn.execute(
+            """
+            INSERT INTO questions (id, title, category, difficulty, version, n_entities, n_edges, n_steps, tags, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title=excluded.title, category=excluded.category, difficulty=excluded.difficulty,
+                version=excluded.version, n_entities=excluded.n_entities, n_edges=excluded.n_edges,
+                n_steps=excluded.n_steps, tags=excluded.tags, data=excluded.data
+            """,
+            (
+                cq_id,
+                cq_data.get("title", ""),
+                cq_data.get("category", ""),
+                cq_data.get("difficulty", ""),
+                cq_data.get("version", "1.0.0"),
+                len(cq_data.get("entities", [])),
+                len(cq_data.get("edges", [])),
+                len(cq_data.get("workflow", [])),
+                json.dumps(tags),
+                json.dumps(cq_data),
+            )
+        )
+        conn.execute("DELETE FROM question_tags WHERE cq_id = ?", (cq_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO question_tags (tag, cq_id) VALUES (?, ?)",
+            [(tag, cq_id) for tag in tags]
+        )
+    conn.execute(
+        "INSERT OR REPLACE INTO catalog_meta VALUES ('updated', ?)",
+        (datetime.now(timezone.utc).isoformat(),)
+    )
+
+
+def _save_question(cq_data: Dict[str, Any]):
+    """Write a single question — only that record and its tag rows are touched."""
+    _save_questions([cq_data])
+
+
+def _save_questions(questions: List[Dict[str, Any]]):
+    """Write many questions in one transaction: all of them land, or none do."""
+    conn = _db()
+    with conn:
+        _put_questions(conn, questions)
+    _catalog_cache.invalidate()
+
+
+# ---------------------------------------------------------------------------
+# In-process catalog cache
+# ---------------------------------------------------------------------------
+
+class _CatalogCache:
+    """Parsed questions, validated models and filter results, dropped when the catalog changes.
+
+    Entries are filled lazily from indexed queries, so repeated cq_get/cq_list
+    calls in an evaluation sweep cost one PRAGMA instead of a query and a JSON
+    parse. Triggers bump catalog_meta 'generation' on any write to the question
+    tables or the catalog version, ours or external; results and run-journal
+    writes share the database but leave it alone. PRAGMA data_version only
+    moves on commits from other connections, so the generation row is read
+    only after those or after our own writes call invalidate().
+    """
+
+    def __init__(self):
+        self._data_version: Optional[int] = None
+        self._generation: Optional[str] = None
+        self.questions: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.models: Dict[str, CompetencyQuestion] = {}
+        self.listings: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.version: Optional[str] = None
+
+    def invalidate(self):
+        self._data_version = None
+
+    def check(self):
+        conn = _db()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'generation'").fetchone()
+        generation = str(row["value"]) if row else None
+        if generation != self._generation:
+            self.questions.clear()
+            self.models.clear()
+            self.listings.clear()
+            self.version = None
+            self._generation = generation
+
+
+_catalog_cache = _CatalogCache()
+
+
+def _get_question(cq_id: str) -> Optional[Dict[str, Any]]:
+    _catalog_cache.check()
+    if cq_id not in _catalog_cache.questions:
+        row = _db().execute("SELECT data FROM questions WHERE id = ?", (cq_id,)).fetchone()
+        _catalog_cache.questions[cq_id] = json.loads(row["data"]) if row else None
+    return _catalog_cache.questions[cq_id]
 
 
-def _save_catalog(catalog: Dict[str, Any]):
-    _ensure_dirs()
-    catalog["metadata"]["updated"] = datetime.now(timezone.utc).isoformat()
-    with open(CATALOG_FILE, "w") as f:
-        json.dump(catalog, f, indent=2)
+def _get_question_model(cq_id: str) -> Optional[CompetencyQuestion]:
+    cq_data = _get_question(cq_id)
+    if cq_data is None:
+        return None
+    if cq_id not in _catalog_cache.models:
+        _catalog_cache.models[cq_id] = CompetencyQuestion(**cq_data)
+    return _catalog_cache.models[cq_id]
 
 
-def _save_result(result: CQResult):
-    _ensure_dirs()
-    filename = f"{result.cq_id}_{result.timestamp.replace(':', '-')}.json"
-    filepath = os.path.join(RESULTS_DIR, filename)
-    with open(filepath, "w") as f:
-        json.dump(result.model_dump(), f, indent=2)
+def _question_exists(cq_id: str) -> bool:
+    return _get_question(cq_id) is not None
+
+
+def _question_ids() -> List[str]:
+    return [q["id"] for q in _list_questions()]
+
+
+def _list_questions(
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    difficulty: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Index-backed filter over question summaries (never parses the full records)."""
+    _catalog_cache.check()
+    key = (category, tag, difficulty)
+    if key in _catalog_cache.listings:
+        return _catalog_cache.listings[key]
+
+    sql = "SELECT q.* FROM questions q"
+    params: List[Any] = []
+    if tag:
+        sql += " JOIN question_tags t ON t.cq_id = q.id AND t.tag = ?"
+        params.append(tag)
+    clauses = []
+    if category:
+        clauses.append("q.category = ?")
+        params.append(category)
+    if difficulty:
+        clauses.append("q.difficulty = ?")
+        params.append(difficulty)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY q.rowid"
+
+    summaries = [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "category": row["category"],
+            "difficulty": row["difficulty"],
+            "entities": row["n_entities"],
+            "edges": row["n_edges"],
+            "steps": row["n_steps"],
+            "tags": json.loads(row["tags"]),
+            "version": row["version"]
+        }
+        for row in _db().execute(sql, params)
+    ]
+    _catalog_cache.listings[key] = summaries
+    return summaries
+
+
+def _catalog_version() -> str:
+    _catalog_cache.check()
+    if _catalog_cache.version is None:
+        row = _db().execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+        _catalog_cache.version = row["value"] if row else "1.0.0"
+    return _catalog_cache.version
+
+
+def _index_result(conn: sqlite3.Connection, result: Dict[str, Any], filename: str):
+    """Index a result's scores and step metrics, replacing any earlier index of it."""
+    conn.execute(
+        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            result["cq_id"],
+            result["timestamp"],
+            result.get("entity_score", 0.0),
+            result.get("edge_score", 0.0),
+            int(bool(result.get("path_complete"))),
+            result.get("overall_score", 0.0),
+            filename,
+        )
+    )
+    # A step id can repeat within a result (retried steps), so the key is the result
+    conn.execute(
+        "DELETE FROM step_metrics WHERE cq_id = ? AND timestamp = ?",
+        (result["cq_id"], result["timestamp"])
+    )
+    conn.executemany(
+        "INSERT INTO step_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                result["cq_id"],
+                result["timestamp"],
+                step["step_id"],
+                step.get("tool_used"),
+                step.get("tier", "tier1"),
+                step["status"],
+                step.get("latency_ms"),
+                step.get("bytes_returned"),
+                step.get("retries", 0),
+            )
+            for step in result.get("step_results", [])
+        ]
+    )
+
+
+def _backfill_results_index(conn: sqlite3.Connection):
+    """One-time indexing of result files written before the results table existed."""
+    if conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'results_indexed'").fetchone():
+        return
+    with conn:
+        for filename in os.listdir(RESULTS_DIR):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(RESULTS_DIR, filename), "r") as f:
+                _index_result(conn, json.load(f), filename)
+        conn.execute("INSERT INTO catalog_meta VALUES ('results_indexed', ?)", (datetime.now(timezone.utc).isoformat(),))
+
+
+def _dedupe_step_metrics(conn: sqlite3.Connection):
+    """One-time removal of step metrics indexed more than once for the same result."""
+    if conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'step_metrics_deduped'").fetchone():
+        return
+    with conn:
+        conn.execute(
+            "DELETE FROM step_metrics WHERE rowid NOT IN (SELECT MIN(rowid) FROM step_metrics "
+            "GROUP BY cq_id, timestamp, step_id, tool_used, tier, status, latency_ms, bytes_returned, retries)"
+        )
+        conn.execute("INSERT INTO catalog_meta VALUES ('step_metrics_deduped', ?)", (datetime.now(timezone.utc).isoformat(),))
+
+
+def _save_result(result: CQResult, run_id: Optional[str] = None):
+    _save_results([(result, run_id)])
+
+
+def _save_results(scored: List[Tuple[CQResult, Optional[str]]]):
+    """Write result files, then index them and close their runs in one transaction."""
+    conn = _db()
+    indexed = []
+    for result, run_id in scored:
+        filename = f"{result.cq_id}_{result.timestamp.replace(':', '-')}.json"
+        result_data = result.model_dump()
+        with open(os.path.join(RESULTS_DIR, filename), "w") as f:
+            json.dump(result_data, f, indent=2)
+        indexed.append((result_data, filename, run_id))
+    with conn:
+        for result_data, filename, run_id in indexed:
+            _index_result(conn, result_data, filename)
+            if run_id:
+                _close_run(conn, run_id, result_data["timestamp"])
+
+
+def _result_summaries(sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+    """Scalar scores straight from the results index — per-result files are never opened."""
+    return [
+        {
+            "cq_id": row["cq_id"],
+            "timestamp": row["timestamp"],
+            "entity_score": row["entity_score"],
+            "edge_score": row["edge_score"],
+            "path_complete": bool(row["path_complete"]),
+            "overall_score": row["overall_score"]
+        }
+        for row in _db().execute(sql, params)
+    ]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _latency_breakdown(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """p50/p95 latency per tool_used and per tier for steps that carry latency_ms."""
+    by_tool: Dict[str, List[float]] = {}
+    by_tier: Dict[str, List[float]] = {}
+    for step in steps:
+        if step.get("latency_ms") is None:
+            continue
+        by_tool.setdefault(step.get("tool_used") or "unknown", []).append(step["latency_ms"])
+        by_tier.setdefault(step.get("tier", "tier1"), []).append(step["latency_ms"])
+    if not by_tier:
+        return {}
+
+    def stats(values):
+        return {
+            "n": len(values),
+            "p50_ms": round(_percentile(values, 50), 1),
+            "p95_ms": round(_percentile(values, 95), 1)
+        }
+
+    return {
+        "by_tool": {k: stats(v) for k, v in sorted(by_tool.items())},
+        "by_tier": {k: stats(v) for k, v in sorted(by_tier.items())}
+    }
+
+
+# ---------------------------------------------------------------------------
+# Markdown catalog parser (streaming, one pass per line)
+# ---------------------------------------------------------------------------
+
+# The catalog uses ## cqN headers with entity tables and workflow steps
+_CQ_HEADER_RE = re.compile(r'^## (cq\d+)')
+_TITLE_RE = re.compile(r'\*\*Title[:\s]*\*\*\s*')
+_QUESTION_RE = re.compile(r'\*\*Question[:\s]*\*\*\s*')
+_ENTITY_ROW_RE = re.compile(r'\|\s*(\w+)\s*\|\s*([^|]+)\s*\|\s*([A-Z][A-Za-z_]+:[^\s|]+)')
+_PATH_EDGE_RE = re.compile(r'(\w+:[^\s]+)\s*--\[(\w+)\]-->\s*(\w+:[^\s]+)')
+
+
+def _new_section(cq_id: str) -> Dict[str, Any]:
+    return {"id": cq_id, "title": "", "question": "", "entities": [], "edges": [], "hash": hashlib.sha256()}
+
+
+def _finish_section(section: Dict[str, Any]) -> Dict[str, Any]:
+    section["hash"] = section["hash"].hexdigest()
+    return section
+
+
+def _iter_markdown_sections(lines: Iterable[str]):
+    """Yield one parsed dict per ## cqN section while reading lines.
+
+    Each line is hashed and matched once, so memory stays bounded by a
+    single section regardless of file size. The preamble is skipped.
+    """
+    section = None
+    for line in lines:
+        header = _CQ_HEADER_RE.match(line)
+        if header:
+            if section:
+                yield _finish_section(section)
+            section = _new_section(header.group(1))
+            section["hash"].update(line.encode())
+            line = line[header.end():]
+        elif section is None:
+            continue
+        else:
+            section["hash"].update(line.encode())
+
+        if line.startswith("**Title"):
+            section["title"] = _TITLE_RE.sub('', line).strip()
+        elif line.startswith("**Question"):
+            section["question"] = _QUESTION_RE.sub('', line).strip()
+
+        # Extract entities from table rows matching CURIE patterns
+        for match in _ENTITY_ROW_RE.finditer(line):
+            section["entities"].append({
+                "name": match.group(2).strip(),
+                "curie": match.group(3).strip(),
+                "entity_type": match.group(1).strip().lower()
+            })
+
+        # Extract gold standard path edges
+        for match in _PATH_EDGE_RE.finditer(line):
+            section["edges"].append({
+                "source": match.group(1),
+                "target": match.group(3),
+                "relation": match.group(2),
+                "evidence_tier": "tier1"
+            })
+    if section:
+        yield _finish_section(section)
+
+
+# ---------------------------------------------------------------------------
+# Step journal (evaluation runs survive restarts; one run per agent/session)
+# ---------------------------------------------------------------------------
+
+def _open_run(cq_id: str, run_id: Optional[str] = None) -> str:
+    """Return an open run for cq_id, creating it if needed.
+
+    Without a run_id the most recent open run for the CQ is reused, which
+    mirrors the old per-cq_id buffer for callers that don't track runs.
+    """
+    conn = _db()
+    if run_id is None:
+        row = conn.execute(
+            "SELECT run_id FROM eval_runs WHERE cq_id = ? AND status = 'open' ORDER BY started_at DESC LIMIT 1",
+            (cq_id,)
+        ).fetchone()
+        if row:
+            return row["run_id"]
+        run_id = f"{cq_id}-{uuid.uuid4().hex[:12]}"
+    else:
+        row = conn.execute("SELECT cq_id, status FROM eval_runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row:
+            if row["cq_id"] != cq_id:
+                raise ValueError(f"Run '{run_id}' belongs to CQ '{row['cq_id']}', not '{cq_id}'")
+            if row["status"] != "open":
+                raise ValueError(f"Run '{run_id}' has already been scored")
+            return run_id
+    with conn:
+        conn.execute(
+            "INSERT INTO eval_runs (run_id, cq_id, status, started_at) VALUES (?, ?, 'open', ?)",
+            (run_id, cq_id, datetime.now(timezone.utc).isoformat())
+        )
+    return run_id
+
+
+def _find_open_run(cq_id: str, run_id: Optional[str] = None) -> Optional[str]:
+    if run_id:
+        row = _db().execute(
+            "SELECT run_id FROM eval_runs WHERE run_id = ? AND cq_id = ? AND status = 'open'", (run_id, cq_id)
+        ).fetchone()
+    else:
+        row = _db().execute(
+            "SELECT run_id FROM eval_runs WHERE cq_id = ? AND status = 'open' ORDER BY started_at DESC LIMIT 1",
+            (cq_id,)
+        ).fetchone()
+    return row["run_id"] if row else None
+
+
+def _append_step(run_id: str, step: StepResult) -> int:
+    """Append one step to the run journal and return the run's step count."""
+    conn = _db()
+    with conn:
+        conn.execute(
+            "INSERT INTO run_steps (run_id, data, recorded_at) VALUES (?, ?, ?)",
+            (run_id, json.dumps(step.model_dump()), datetime.now(timezone.utc).isoformat())
+        )
+    return conn.execute("SELECT COUNT(*) FROM run_steps WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+
+def _run_steps(run_id: str) -> List[Dict[str, Any]]:
+    return [
+        json.loads(row["data"])
+        for row in _db().execute("SELECT data FROM run_steps WHERE run_id = ? ORDER BY seq", (run_id,))
+    ]
+
+
+def _close_run(conn: sqlite3.Connection, run_id: str, result_timestamp: str):
+    """Mark a run scored. Caller owns the transaction; steps are kept for auditing."""
+    conn.execute(
+        "UPDATE eval_runs SET status = 'scored', result_timestamp = ? WHERE run_id = ?",
+        (result_timestamp, run_id)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Workflow executor (runs WorkflowStep.tool_pattern against a tool backend)
+# ---------------------------------------------------------------------------
+
+class ToolBackend(abc.ABC):
+    """Executes the tool behind a workflow step.
+
+    Subclass and register with register_backend() to run CQs against live
+    MCP servers. call() returns a dict with an optional "curie" (the CURIE
+    the tool resolved), optional "status" (overrides the pass/fail check
+    against expected_curie), optional "source_curie"/"relation" when the
+    tool observed an edge, optional "notes", and optional
+    "bytes_returned"/"retries" for instrumentation.
+    """
+
+    @abc.abstractmethod
+    async def call(self, cq: CompetencyQuestion, step: WorkflowStep) -> Dict[str, Any]:
+        ...
+
+    async def close(self):
+        pass
+
+
+class RecordedBackend(ToolBackend):
+    """Replays recorded tool responses from a JSON file — no live servers needed.
+
+    Keys are tried in order "<cq_id>/<step_id>", then "<tool_pattern>".
+    A response may carry "delay_ms" to simulate tool latency when
+    benchmarking the executor, and "bytes_returned"/"retries" to mimic what
+    a live backend reports.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "r") as f:
+            self.responses: Dict[str, Dict[str, Any]] = json.load(f)
+
+    async def call(self, cq: CompetencyQuestion, step: WorkflowStep) -> Dict[str, Any]:
+        response = self.responses.get(f"{cq.id}/{step.step_id}", self.responses.get(step.tool_pattern))
+        if response is None:
+            raise LookupError(f"No recorded response for {cq.id}/{step.step_id} ({step.tool_pattern})")
+        if response.get("delay_ms"):
+            await asyncio.sleep(response["delay_ms"] / 1000)
+        return response
+
+
+_BACKENDS: Dict[str, Callable[..., ToolBackend]] = {
+    "recorded": RecordedBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[..., ToolBackend]):
+    """Make a tool backend available to cq_execute under the given name."""
+    _BACKENDS[name] = factory
+
+
+async def _execute_step(
+    backend: ToolBackend,
+    cq: CompetencyQuestion,
+    step: WorkflowStep,
+    semaphore: asyncio.Semaphore,
+    step_timeout: float
+) -> StepResult:
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(backend.call(cq, step), timeout=step_timeout)
+        except asyncio.TimeoutError:
+            response = {"status": "fail", "notes": f"timed out after {step_timeout}s"}
+        except Exception as e:
+            response = {"status": "fail", "notes": f"{type(e).__name__}: {e}"}
+        latency_ms = (time.perf_counter() - started) * 1000
+
+    actual_curie = response.get("curie")
+    status = response.get("status")
+    if status is None:
+        if step.expected_curie:
+            status = "pass" if actual_curie == step.expected_curie else "fail"
+        else:
+            status = "pass"
+    return StepResult(
+        step_id=step.step_id,
+        status=status,
+        expected_curie=step.expected_curie,
+        actual_curie=actual_curie,
+        source_curie=response.get("source_curie"),
+        relation=response.get("relation"),
+        tool_used=step.tool_pattern,
+        tier=step.tier,
+        notes=response.get("notes", ""),
+        latency_ms=round(latency_ms, 1),
+        bytes_returned=response.get("bytes_returned"),
+        retries=response.get("retries", 0)
+    )
+
+
+async def _execute_cq(
+    backend: ToolBackend,
+    cq: CompetencyQuestion,
+    semaphore: asyncio.Semaphore,
+    step_timeout: float
+) -> Tuple[str, List[StepResult]]:
+    """Run one CQ's workflow in order, journaling each step as it completes."""
+    run_id = _open_run(cq.id, f"{cq.id}-{uuid.uuid4().hex[:12]}")
+    step_results = []
+    for step in cq.workflow:
+        result = await _execute_step(backend, cq, step, semaphore, step_timeout)
+        _append_step(run_id, result)
+        step_results.append(result)
+    return run_id, step_results
 
 
 # ---------------------------------------------------------------------------
@@ -162,32 +844,11 @@ async def cq_list(
     Returns:
         Summary of matching CQs with id, title, category, difficulty, entity count, edge count.
     """
-    catalog = _load_catalog()
-    questions = catalog.get("questions", {})
-
-    results = []
-    for cq_id, cq_data in questions.items():
-        if category and cq_data.get("category") != category:
-            continue
-        if tag and tag not in cq_data.get("tags", []):
-            continue
-        if difficulty and cq_data.get("difficulty") != difficulty:
-            continue
-        results.append({
-            "id": cq_id,
-            "title": cq_data.get("title", ""),
-            "category": cq_data.get("category", ""),
-            "difficulty": cq_data.get("difficulty", ""),
-            "entities": len(cq_data.get("entities", [])),
-            "edges": len(cq_data.get("edges", [])),
-            "steps": len(cq_data.get("workflow", [])),
-            "tags": cq_data.get("tags", []),
-            "version": cq_data.get("version", "1.0.0")
-        })
+    results = _list_questions(category=category, tag=tag, difficulty=difficulty)
 
     return json.dumps({
         "total": len(results),
-        "catalog_version": catalog.get("version", "1.0.0"),
+        "catalog_version": _catalog_version(),
         "questions": results
     }, indent=2)
 
@@ -205,10 +866,9 @@ async def cq_get(cq_id: str) -> str:
     Returns:
         Complete CQ with entities, edges, workflow steps, and metadata.
     """
-    catalog = _load_catalog()
-    cq_data = catalog.get("questions", {}).get(cq_id)
+    cq_data = _get_question(cq_id)
     if not cq_data:
-        return json.dumps({"error": f"CQ '{cq_id}' not found", "available": list(catalog.get("questions", {}).keys())})
+        return json.dumps({"error": f"CQ '{cq_id}' not found", "available": _question_ids()})
     return json.dumps(cq_data, indent=2)
 
 
@@ -232,10 +892,8 @@ async def cq_add(cq_json: str) -> str:
     except Exception as e:
         return json.dumps({"error": f"Invalid CQ data: {str(e)}"})
 
-    catalog = _load_catalog()
-    is_update = cq.id in catalog.get("questions", {})
-    catalog.setdefault("questions", {})[cq.id] = cq.model_dump()
-    _save_catalog(catalog)
+    is_update = _question_exists(cq.id)
+    _save_question(cq.model_dump())
 
     return json.dumps({
         "status": "updated" if is_update else "created",
@@ -250,90 +908,110 @@ async def cq_add(cq_json: str) -> str:
     name="cq_import_from_markdown",
     annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
 )
-async def cq_import_from_markdown(markdown_path: str) -> str:
+async def cq_import_from_markdown(markdown_path: str, dry_run: bool = False, incremental: bool = True) -> str:
     """Import competency questions from a markdown catalog file.
 
     Parses the structured markdown format used in competency-questions-catalog.md
     and creates CQ entries in the catalog. This is the bootstrap path for
     initializing the golden test set from the existing catalog document.
 
+    The file is streamed one line at a time. Each section's content hash is
+    remembered per source file, so on re-import only sections whose text
+    changed are re-validated and written. The import is transactional: every
+    changed section is validated first and the changed CQs are then written in
+    a single commit. If any section fails validation nothing is written.
+
     Args:
         markdown_path: Path to the competency-questions-catalog.md file.
+        dry_run: Report which CQs would be created, updated or left unchanged
+                 without writing anything.
+        incremental: Skip sections whose text is unchanged since the last import
+                     from this file (set False to re-parse everything).
 
     Returns:
-        Summary of imported CQs with count and any parse warnings.
+        Summary of imported CQs with count, created/updated/unchanged diff, and any parse warnings.
     """
     if not os.path.exists(markdown_path):
         return json.dumps({"error": f"File not found: {markdown_path}"})
 
-    with open(markdown_path, "r") as f:
-        content = f.read()
-
-    # Parse markdown CQ sections — this is a structured format parser
-    # The catalog uses ## cqN headers with entity tables and workflow steps
-    import re
-    cq_sections = re.split(r'^## (cq\d+)', content, flags=re.MULTILINE)
-
-    imported = []
+    source = os.path.abspath(markdown_path)
+    known_hashes = {}
+    if incremental:
+        known_hashes = {
+            row["cq_id"]: row["hash"]
+            for row in _db().execute("SELECT cq_id, hash FROM import_hashes WHERE source = ?", (source,))
+        }
+    existing_ids = set(_question_ids())
+
+    parsed: List[CompetencyQuestion] = []
+    section_hashes: Dict[str, str] = {}
+    skipped: List[str] = []
     warnings = []
+    errors = []
 
-    # cq_sections[0] is preamble, then pairs of (id, content)
-    for i in range(1, len(cq_sections), 2):
-        if i + 1 >= len(cq_sections):
-            break
-        cq_id = cq_sections[i].strip()
-        section = cq_sections[i + 1]
-
-        # Extract title from first line
-        lines = section.strip().split("\n")
-        title = ""
-        question = ""
-        for line in lines:
-            if line.startswith("**Title"):
-                title = re.sub(r'\*\*Title[:\s]*\*\*\s*', '', line).strip()
-            elif line.startswith("**Question"):
-                question = re.sub(r'\*\*Question[:\s]*\*\*\s*', '', line).strip()
-
-        # Extract entities from table rows matching CURIE patterns
-        entities = []
-        entity_pattern = re.compile(r'\|\s*(\w+)\s*\|\s*([^|]+)\s*\|\s*([A-Z][A-Za-z_]+:[^\s|]+)')
-        for match in entity_pattern.finditer(section):
-            entities.append({
-                "name": match.group(2).strip(),
-                "curie": match.group(3).strip(),
-                "entity_type": match.group(1).strip().lower()
-            })
-
-        # Extract gold standard path edges
-        edges = []
-        path_pattern = re.compile(r'(\w+:[^\s]+)\s*--\[(\w+)\]-->\s*(\w+:[^\s]+)')
-        for match in path_pattern.finditer(section):
-            edges.append({
-                "source": match.group(1),
-                "target": match.group(3),
-                "relation": match.group(2),
-                "evidence_tier": "tier1"
-            })
-
-        if title or question:
-            cq = CompetencyQuestion(
-                id=cq_id,
-                title=title or f"Competency Question {cq_id}",
-                question=question or title,
-                entities=[EntityRef(**e) for e in entities],
-                edges=[EdgeRef(**e) for e in edges],
-                source="competency-questions-catalog.md"
-            )
-            catalog = _load_catalog()
-            catalog.setdefault("questions", {})[cq_id] = cq.model_dump()
-            _save_catalog(catalog)
-            imported.append(cq_id)
+    with open(markdown_path, "r") as f:
+        for section in _iter_markdown_sections(f):
+            cq_id = section["id"]
+            section_hashes[cq_id] = section["hash"]
+            if known_hashes.get(cq_id) == section["hash"] and cq_id in existing_ids:
+                skipped.append(cq_id)
+                continue
+
+            if section["title"] or section["question"]:
+                try:
+                    parsed.append(CompetencyQuestion(
+                        id=cq_id,
+                        title=section["title"] or f"Competency Question {cq_id}",
+                        question=section["question"] or section["title"],
+                        entities=[EntityRef(**e) for e in section["entities"]],
+                        edges=[EdgeRef(**e) for e in section["edges"]],
+                        source="competency-questions-catalog.md"
+                    ))
+                except Exception as e:
+                    errors.append(f"{cq_id}: {str(e)}")
+            else:
+                warnings.append(f"{cq_id}: could not parse title or question")
+
+    if errors:
+        return json.dumps({
+            "error": "Validation failed — nothing was imported",
+            "errors": errors,
+            "warnings": warnings
+        }, indent=2)
+
+    created, updated, unchanged = [], [], list(skipped)
+    to_write = []
+    for cq in {cq.id: cq for cq in parsed}.values():
+        cq_data = cq.model_dump()
+        existing = _get_question(cq.id)
+        if existing is None:
+            created.append(cq.id)
         else:
-            warnings.append(f"{cq_id}: could not parse title or question")
+            # created_at belongs to the stored record, not to this import run
+            cq_data["created_at"] = existing.get("created_at", cq_data["created_at"])
+            if cq_data == existing:
+                unchanged.append(cq.id)
+                continue
+            updated.append(cq.id)
+        to_write.append(cq_data)
+
+    if not dry_run:
+        conn = _db()
+        with conn:
+            _put_questions(conn, to_write)
+            conn.executemany(
+                "INSERT OR REPLACE INTO import_hashes VALUES (?, ?, ?)",
+                [(source, cq.id, section_hashes[cq.id]) for cq in parsed]
+            )
+        _catalog_cache.invalidate()
 
     return json.dumps({
-        "imported": len(imported),
-        "cq_ids": imported,
+        "dry_run": dry_run,
+        "imported": len(parsed) + len(skipped),
+        "cq_ids": list(section_hashes),
+        "created": created,
+        "updated": updated,
+        "unchanged": unchanged,
         "warnings": warnings,
         "note": "Review imported CQs with cq_get and refine entities/edges/workflow as needed"
     }, indent=2)
@@ -343,6 +1021,28 @@ async def cq_import_from_markdown(markdown_path: str) -> str:
 # MCP Tools — Scoring and Results
 # ---------------------------------------------------------------------------
 
+@mcp.tool(
+    name="cq_start_run",
+    annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
+)
+async def cq_start_run(cq_id: str) -> str:
+    """Start a new evaluation run for a CQ.
+
+    Pass the returned run_id to cq_record_step and cq_score so that several
+    agents can evaluate the same CQ concurrently without mixing their steps.
+
+    Args:
+        cq_id: The CQ about to be evaluated
+
+    Returns:
+        The new run id.
+    """
+    if not _question_exists(cq_id):
+        return json.dumps({"error": f"CQ '{cq_id}' not found in catalog"})
+    run_id = _open_run(cq_id, f"{cq_id}-{uuid.uuid4().hex[:12]}")
+    return json.dumps({"cq_id": cq_id, "run_id": run_id})
+
+
 @mcp.tool(
     name="cq_record_step",
     annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
@@ -355,12 +1055,19 @@ async def cq_record_step(
     actual_curie: Optional[str] = None,
     tool_used: Optional[str] = None,
     tier: str = "tier1",
-    notes: str = ""
+    notes: str = "",
+    run_id: Optional[str] = None,
+    latency_ms: Optional[float] = None,
+    bytes_returned: Optional[int] = None,
+    retries: int = 0,
+    source_curie: Optional[str] = None,
+    relation: Optional[str] = None
 ) -> str:
     """Record the result of executing a single CQ workflow step.
 
     Called by the evaluation skill after each step in a CQ workflow.
-    Results accumulate in a session buffer until cq_score is called.
+    Results are appended to a persistent run journal until cq_score is called,
+    so a long evaluation survives server restarts.
 
     Args:
         cq_id: The CQ being evaluated
@@ -371,9 +1078,18 @@ async def cq_record_step(
         tool_used: Tool or curl pattern used
         tier: Architecture tier (tier1, tier2, tier3)
         notes: Additional context
+        run_id: Evaluation run (from cq_start_run). Omit to use the CQ's
+                current open run; pass one so parallel agents evaluating the
+                same CQ don't share steps.
+        latency_ms: Wall-clock time of the tool call (optional)
+        bytes_returned: Size of the tool response in bytes (optional)
+        retries: Number of retries before this outcome
+        source_curie: For edge steps, the CURIE the edge starts from (actual_curie
+                      is its target); enables graph-based edge scoring
+        relation: For edge steps, the observed relation (e.g., 'agonist')
 
     Returns:
-        Confirmation with running step count.
+        Confirmation with run id and running step count.
     """
     result = StepResult(
         step_id=step_id,
@@ -382,19 +1098,26 @@ async def cq_record_step(
         actual_curie=actual_curie,
         tool_used=tool_used,
         tier=tier,
-        notes=notes
+        notes=notes,
+        latency_ms=latency_ms,
+        bytes_returned=bytes_returned,
+        retries=retries,
+        source_curie=source_curie,
+        relation=relation
     )
 
-    # Store in session buffer (in-memory, keyed by cq_id)
-    if not hasattr(cq_record_step, "_buffers"):
-        cq_record_step._buffers = {}
-    cq_record_step._buffers.setdefault(cq_id, []).append(result.model_dump())
+    try:
+        run_id = _open_run(cq_id, run_id)
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+    steps_recorded = _append_step(run_id, result)
 
     return json.dumps({
         "cq_id": cq_id,
+        "run_id": run_id,
         "step_id": step_id,
         "status": status,
-        "steps_recorded": len(cq_record_step._buffers[cq_id])
+        "steps_recorded": steps_recorded
     })
 
 
@@ -402,13 +1125,18 @@ async def cq_record_step(
     name="cq_score",
     annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
 )
-async def cq_score(cq_id: str) -> str:
+async def cq_score(cq_id: str, run_id: Optional[str] = None) -> str:
     """Score a CQ evaluation by comparing recorded steps against gold standard.
 
     Calculates entity_score (fraction of entities resolved), edge_score
     (fraction of edges validated), path_complete (full path reconstructed),
     and overall_score (weighted composite).
 
+    When steps report observed edges (source_curie + actual_curie, optionally
+    relation), edge_score is true gold-edge coverage and the result's `path`
+    gives the longest reconstructed sub-path and the missing gaps. Otherwise
+    edge_score falls back to passed steps over edges + workflow steps.
+
     Scoring weights (aligned with BTE-RAG methodology):
       entity_score: 0.4 (node resolution accuracy)
       edge_score: 0.4 (relationship coverage)
@@ -416,22 +1144,32 @@ async def cq_score(cq_id: str) -> str:
 
     Args:
         cq_id: The CQ to score
+        run_id: Run to score (optional — defaults to the CQ's current open run)
 
     Returns:
         Complete CQResult with scores and per-step details.
     """
     # Get gold standard
-    catalog = _load_catalog()
-    cq_data = catalog.get("questions", {}).get(cq_id)
+    cq_data = _get_question(cq_id)
     if not cq_data:
         return json.dumps({"error": f"CQ '{cq_id}' not found in catalog"})
 
     # Get recorded steps
-    buffers = getattr(cq_record_step, "_buffers", {})
-    steps = buffers.get(cq_id, [])
+    run_id = _find_open_run(cq_id, run_id)
+    steps = _run_steps(run_id) if run_id else []
     if not steps:
         return json.dumps({"error": f"No steps recorded for '{cq_id}'. Run the workflow first."})
 
+    result = _score_steps(cq_data, steps, run_id)
+    _save_result(result, run_id=run_id)
+
+    return json.dumps(result.model_dump(), indent=2)
+
+
+def _score_steps(cq_data: Dict[str, Any], steps: List[Dict[str, Any]], run_id: Optional[str] = None) -> CQResult:
+    """Score recorded steps against a CQ's gold standard (pure — nothing is written)."""
+    cq_id = cq_data["id"]
+
     # Score entities
     gold_entities = {e["curie"] for e in cq_data.get("entities", [])}
     resolved_entities = {s["actual_curie"] for s in steps if s.get("actual_curie") and s["status"] in ("pass", "partial")}
@@ -439,31 +1177,252 @@ async def cq_score(cq_id: str) -> str:
 
     # Score edges
     gold_edges = cq_data.get("edges", [])
-    passed_steps = {s["step_id"] for s in steps if s["status"] == "pass"}
-    edge_score = len(passed_steps) / max(len(gold_edges) + len(cq_data.get("workflow", [])), 1)
-
-    # Path completeness — all entities resolved AND all edges validated
-    path_complete = entity_score == 1.0 and all(s["status"] in ("pass", "partial") for s in steps)
+    path = _score_path(gold_edges, steps)
+    if path["method"] == "graph":
+        edge_score = path["edge_coverage"]
+        # Path completeness — all entities resolved AND every gold edge observed
+        path_complete = entity_score == 1.0 and path["edges_covered"] == path["edges_total"]
+    else:
+        # No step reported a source_curie: fall back to counting passed steps
+        passed_steps = {s["step_id"] for s in steps if s["status"] == "pass"}
+        edge_score = len(passed_steps) / max(len(gold_edges) + len(cq_data.get("workflow", [])), 1)
+        path_complete = entity_score == 1.0 and all(s["status"] in ("pass", "partial") for s in steps)
 
     # Weighted overall
     overall_score = (entity_score * 0.4) + (edge_score * 0.4) + (0.2 if path_complete else 0.0)
 
     result = CQResult(
         cq_id=cq_id,
+        run_id=run_id,
         step_results=[StepResult(**s) for s in steps],
         entity_score=round(entity_score, 3),
         edge_score=round(edge_score, 3),
         path_complete=path_complete,
         overall_score=round(overall_score, 3),
+        path=path,
+        latency=_latency_breakdown(steps),
         notes=f"Scored against {len(gold_entities)} entities, {len(gold_edges)} edges"
     )
+    return result
 
-    _save_result(result)
 
-    # Clear buffer
-    buffers.pop(cq_id, None)
+def _chains(edges: List[Dict[str, Any]]) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+    """Longest chain of edges ending at each node: DP over a topological order (Kahn).
 
-    return json.dumps(result.model_dump(), indent=2)
+    Returns (depth, parent): the number of edges on that chain and the node
+    before it. Nodes on a cycle never reach in-degree 0 and are left out.
+    """
+    successors: Dict[str, List[str]] = {}
+    indegree: Dict[str, int] = {}
+    for e in edges:
+        successors.setdefault(e["source"], []).append(e["target"])
+        indegree[e["target"]] = indegree.get(e["target"], 0) + 1
+        indegree.setdefault(e["source"], 0)
+    queue = [node for node, degree in indegree.items() if degree == 0]
+    depth = {node: 0 for node in queue}
+    parent: Dict[str, Optional[str]] = {node: None for node in queue}
+    while queue:
+        node = queue.pop()
+        for nxt in successors.get(node, []):
+            if depth[node] + 1 > depth.get(nxt, -1):
+                depth[nxt] = depth[node] + 1
+                parent[nxt] = node
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+    return depth, parent
+
+
+def _score_path(gold_edges: List[Dict[str, Any]], steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Match observed (source, relation, target) triples against the gold edge graph.
+
+    Steps that pass or partially pass with a source_curie are observations;
+    their order does not matter. Returns edge coverage, the longest chain of
+    covered gold edges, and the missing gaps: connected groups of uncovered
+    gold edges, each listed in path order. A gap's length is its longest
+    run of consecutive missing edges (the hops to fill to bridge it), and
+    gaps are sorted shortest first. Everything is linear in edges + steps.
+    """
+    observed: Dict[Tuple[str, str], set] = {}
+    for s in steps:
+        if s.get("source_curie") and s.get("actual_curie") and s["status"] in ("pass", "partial"):
+            relation = s.get("relation")
+            observed.setdefault((s["source_curie"], s["actual_curie"]), set()).add(
+                relation.lower() if relation else None
+            )
+    if not gold_edges or not observed:
+        return {"method": "steps"}
+
+    covered, missing = [], []
+    for e in gold_edges:
+        relations = observed.get((e["source"], e["target"]), ())
+        if None in relations or e["relation"].lower() in relations:
+            covered.append(e)
+        else:
+            missing.append(e)
+
+    depth, parent = _chains(covered)
+    longest: List[str] = []
+    if depth:
+        node = max(depth, key=depth.get)
+        while node is not None:
+            longest.append(node)
+            node = parent[node]
+        longest.reverse()
+
+    # Gaps: union-find over the endpoints of uncovered edges
+    root: Dict[str, str] = {}
+
+    def find(node):
+        root.setdefault(node, node)
+        while root[node] != node:
+            root[node] = root[root[node]]
+            node = root[node]
+        return node
+
+    for e in missing:
+        root[find(e["source"])] = find(e["target"])
+    gaps_by_root: Dict[str, List[Dict[str, Any]]] = {}
+    for e in missing:
+        gaps_by_root.setdefault(find(e["source"]), []).append(
+            {"source": e["source"], "relation": e["relation"], "target": e["target"]}
+        )
+    # Lengths along the chain, not edge counts: A->B, A->C missing is one hop
+    # to bridge. A gap that is all cycle counts each of its edges.
+    gap_depth, _ = _chains(missing)
+    gaps = []
+    for edges in gaps_by_root.values():
+        edges.sort(key=lambda e: gap_depth.get(e["source"], len(missing)))
+        length = max((gap_depth.get(e["target"], 0) for e in edges), default=0) or len(edges)
+        gaps.append((length, edges))
+    gaps.sort(key=lambda gap: (gap[0], len(gap[1])))
+
+    return {
+        "method": "graph",
+        "edges_total": len(gold_edges),
+        "edges_covered": len(covered),
+        "edge_coverage": len(covered) / len(gold_edges),
+        "longest_subpath": longest if len(longest) > 1 else [],
+        "gaps": [edges for _, edges in gaps],
+        "gap_lengths": [length for length, _ in gaps],
+        "shortest_gap": gaps[0][0] if gaps else 0
+    }
+
+
+_IN_CHUNK = 500  # bound values per IN (...) list; older SQLite builds allow 999 per statement
+
+
+def _select_in(sql: str, values: List[Any]) -> Iterable[sqlite3.Row]:
+    """Rows of sql (one '{}' marks the IN list) for values, a chunk of them per query."""
+    values = list(dict.fromkeys(values))
+    for i in range(0, len(values), _IN_CHUNK):
+        chunk = values[i:i + _IN_CHUNK]
+        yield from _db().execute(sql.format(",".join("?" * len(chunk))), chunk)
+
+
+def _score_summary(results: List[CQResult]) -> Dict[str, Any]:
+    n = len(results)
+    return {
+        "runs": n,
+        "mean_overall_score": round(sum(r.overall_score for r in results) / n, 3) if n else 0.0,
+        "mean_entity_score": round(sum(r.entity_score for r in results) / n, 3) if n else 0.0,
+        "mean_edge_score": round(sum(r.edge_score for r in results) / n, 3) if n else 0.0,
+        "path_complete_rate": round(sum(r.path_complete for r in results) / n, 3) if n else 0.0,
+    }
+
+
+@mcp.tool(
+    name="cq_score_batch",
+    annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
+)
+async def cq_score_batch(
+    cq_ids: Optional[List[str]] = None,
+    run_ids: Optional[List[str]] = None
+) -> str:
+    """Score many recorded evaluations in one pass (e.g. a nightly regression sweep).
+
+    Every open run is scored (optionally restricted to cq_ids or run_ids).
+    Gold standards are looked up once per CQ, journaled steps are read a few
+    hundred runs per query, and all results are indexed in a single
+    transaction.
+
+    Args:
+        cq_ids: Only score open runs for these CQs (optional; omit, rather
+                than pass an empty list, to score every CQ)
+        run_ids: Only score these runs (optional; same rule)
+
+    Returns:
+        Aggregate summary overall and broken down by category, difficulty and
+        step tier, plus per-run scores.
+    """
+    if cq_ids == [] or run_ids == []:
+        return json.dumps({"error": "cq_ids and run_ids must not be empty; omit them to score every open run"})
+
+    sql = "SELECT run_id, cq_id FROM eval_runs WHERE status = 'open'"
+    if run_ids:
+        rows = _select_in(sql + " AND run_id IN ({})", run_ids)
+    elif cq_ids:
+        rows = _select_in(sql + " AND cq_id IN ({})", cq_ids)
+    else:
+        rows = _db().execute(sql)
+    wanted = set(cq_ids) if cq_ids else None
+    runs = {row["run_id"]: row["cq_id"] for row in rows if wanted is None or row["cq_id"] in wanted}
+
+    steps_by_run: Dict[str, List[Dict[str, Any]]] = {run_id: [] for run_id in runs}
+    # Each run's steps come from one query, so ORDER BY seq keeps them in order
+    for row in _select_in("SELECT run_id, data FROM run_steps WHERE run_id IN ({}) ORDER BY seq", list(runs)):
+        steps_by_run[row["run_id"]].append(json.loads(row["data"]))
+
+    scored: List[Tuple[CQResult, str]] = []
+    skipped = []
+    by_category: Dict[str, List[CQResult]] = {}
+    by_difficulty: Dict[str, List[CQResult]] = {}
+    for run_id, cq_id in runs.items():
+        cq_data = _get_question(cq_id)
+        if not cq_data:
+            skipped.append({"run_id": run_id, "cq_id": cq_id, "reason": "CQ not found in catalog"})
+            continue
+        if not steps_by_run[run_id]:
+            skipped.append({"run_id": run_id, "cq_id": cq_id, "reason": "no steps recorded"})
+            continue
+        result = _score_steps(cq_data, steps_by_run[run_id], run_id)
+        scored.append((result, run_id))
+        by_category.setdefault(cq_data.get("category", ""), []).append(result)
+        by_difficulty.setdefault(cq_data.get("difficulty", ""), []).append(result)
+
+    _save_results(scored)
+
+    by_tier: Dict[str, Dict[str, int]] = {}
+    for result, _ in scored:
+        for step in result.step_results:
+            tier = by_tier.setdefault(step.tier, {"steps": 0, "pass": 0, "partial": 0, "fail": 0, "skip": 0})
+            tier["steps"] += 1
+            if step.status in tier:
+                tier[step.status] += 1
+    for tier in by_tier.values():
+        tier["pass_rate"] = round(tier["pass"] / tier["steps"], 3)
+
+    results = [r for r, _ in scored]
+    return json.dumps({
+        "scored": len(results),
+        "skipped": skipped,
+        "summary": _score_summary(results),
+        "by_category": {k: _score_summary(v) for k, v in sorted(by_category.items())},
+        "by_difficulty": {k: _score_summary(v) for k, v in sorted(by_difficulty.items())},
+        "by_tier": dict(sorted(by_tier.items())),
+        "latency": _latency_breakdown([step.model_dump() for r in results for step in r.step_results]),
+        "results": [
+            {
+                "cq_id": r.cq_id,
+                "run_id": r.run_id,
+                "entity_score": r.entity_score,
+                "edge_score": r.edge_score,
+                "path_complete": r.path_complete,
+                "overall_score": r.overall_score
+            }
+            for r in results
+        ]
+    }, indent=2)
 
 
 @mcp.tool(
@@ -480,26 +1439,12 @@ async def cq_results(cq_id: Optional[str] = None, limit: int = 10) -> str:
     Returns:
         List of CQResult summaries ordered by timestamp (newest first).
     """
-    _ensure_dirs()
-    results = []
-    for filename in sorted(os.listdir(RESULTS_DIR), reverse=True):
-        if not filename.endswith(".json"):
-            continue
-        if cq_id and not filename.startswith(cq_id + "_"):
-            continue
-        filepath = os.path.join(RESULTS_DIR, filename)
-        with open(filepath, "r") as f:
-            result = json.load(f)
-            results.append({
-                "cq_id": result.get("cq_id"),
-                "timestamp": result.get("timestamp"),
-                "entity_score": result.get("entity_score"),
-                "edge_score": result.get("edge_score"),
-                "path_complete": result.get("path_complete"),
-                "overall_score": result.get("overall_score")
-            })
-        if len(results) >= limit:
-            break
+    if cq_id:
+        results = _result_summaries(
+            "SELECT * FROM results WHERE cq_id = ? ORDER BY timestamp DESC LIMIT ?", [cq_id, limit]
+        )
+    else:
+        results = _result_summaries("SELECT * FROM results ORDER BY timestamp DESC LIMIT ?", [limit])
 
     return json.dumps({"results": results, "total": len(results)}, indent=2)
 
@@ -517,31 +1462,126 @@ async def cq_compare(cq_id: str) -> str:
         cq_id: The CQ to compare results for
 
     Returns:
-        Time series of scores for the specified CQ.
+        Time series of scores and p50/p95 step latency (per tool and tier) for
+        the specified CQ, plus latency over all its evaluations.
     """
-    _ensure_dirs()
-    series = []
-    for filename in sorted(os.listdir(RESULTS_DIR)):
-        if not filename.startswith(cq_id + "_") or not filename.endswith(".json"):
-            continue
-        filepath = os.path.join(RESULTS_DIR, filename)
-        with open(filepath, "r") as f:
-            result = json.load(f)
-            series.append({
-                "timestamp": result.get("timestamp"),
-                "entity_score": result.get("entity_score"),
-                "edge_score": result.get("edge_score"),
-                "overall_score": result.get("overall_score"),
-                "path_complete": result.get("path_complete")
-            })
+    steps_by_timestamp: Dict[str, List[Dict[str, Any]]] = {}
+    for row in _db().execute(
+        "SELECT timestamp, tool_used, tier, latency_ms FROM step_metrics "
+        "WHERE cq_id = ? AND latency_ms IS NOT NULL ORDER BY timestamp",
+        (cq_id,)
+    ):
+        steps_by_timestamp.setdefault(row["timestamp"], []).append(dict(row))
+
+    series = [
+        {
+            "timestamp": r["timestamp"],
+            "entity_score": r["entity_score"],
+            "edge_score": r["edge_score"],
+            "overall_score": r["overall_score"],
+            "path_complete": r["path_complete"],
+            "latency": _latency_breakdown(steps_by_timestamp.get(r["timestamp"], []))
+        }
+        for r in _result_summaries("SELECT * FROM results WHERE cq_id = ? ORDER BY timestamp", [cq_id])
+    ]
+    all_steps = [step for steps in steps_by_timestamp.values() for step in steps]
 
     return json.dumps({
         "cq_id": cq_id,
         "evaluations": len(series),
+        "latency": _latency_breakdown(all_steps),
         "series": series
     }, indent=2)
 
 
+# ---------------------------------------------------------------------------
+# MCP Tools — Workflow Execution
+# ---------------------------------------------------------------------------
+
+@mcp.tool(
+    name="cq_execute",
+    annotations={"readOnlyHint": False, "destructiveHint": False, "idempotentHint": False}
+)
+async def cq_execute(
+    cq_ids: Optional[List[str]] = None,
+    backend: str = "recorded",
+    backend_options: Optional[Dict[str, Any]] = None,
+    concurrency: int = 4,
+    step_timeout: float = 30.0,
+    score: bool = True
+) -> str:
+    """Execute CQ workflows against a registered tool backend.
+
+    Each CQ's workflow steps run in order; independent CQs run in parallel,
+    with at most `concurrency` tool calls in flight. Every step is journaled
+    under a fresh run, so results can also be scored later with cq_score.
+
+    Args:
+        cq_ids: CQs to execute (optional — defaults to every CQ with a workflow)
+        backend: Registered backend name ('recorded' replays responses from a JSON file)
+        backend_options: Keyword arguments for the backend (recorded: {"path": "responses.json"})
+        concurrency: Maximum concurrent tool calls across all CQs
+        step_timeout: Per-step timeout in seconds; a timed-out step is recorded as fail
+        score: Score each run once its workflow finishes
+
+    Returns:
+        Per-CQ run ids and step outcomes, optional scores, and throughput.
+    """
+    if backend not in _BACKENDS:
+        return json.dumps({"error": f"Unknown backend '{backend}'", "available": sorted(_BACKENDS)})
+    try:
+        tool_backend = _BACKENDS[backend](**(backend_options or {}))
+    except Exception as e:
+        return json.dumps({"error": f"Could not start backend '{backend}': {str(e)}"})
+
+    questions = []
+    missing = []
+    for cq_id in cq_ids or _question_ids():
+        cq = _get_question_model(cq_id)
+        if cq is None:
+            missing.append(cq_id)
+        elif cq.workflow:
+            questions.append(cq)
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    started = time.perf_counter()
+    try:
+        runs = await asyncio.gather(*(
+            _execute_cq(tool_backend, cq, semaphore, step_timeout) for cq in questions
+        ))
+    finally:
+        await tool_backend.close()
+    elapsed = time.perf_counter() - started
+
+    scored: List[Tuple[CQResult, str]] = []
+    if score:
+        scored = [
+            (_score_steps(_get_question(cq.id), [s.model_dump() for s in steps], run_id), run_id)
+            for cq, (run_id, steps) in zip(questions, runs)
+        ]
+        _save_results(scored)
+    scores = {run_id: result.overall_score for result, run_id in scored}
+
+    n_steps = sum(len(steps) for _, steps in runs)
+    return json.dumps({
+        "backend": backend,
+        "executed": len(questions),
+        "missing": missing,
+        "elapsed_s": round(elapsed, 3),
+        "steps": n_steps,
+        "steps_per_second": round(n_steps / elapsed, 2) if elapsed > 0 else None,
+        "runs": [
+            {
+                "cq_id": cq.id,
+                "run_id": run_id,
+                "steps": {s.step_id: s.status for s in steps},
+                "overall_score": scores.get(run_id)
+            }
+            for cq, (run_id, steps) in zip(questions, runs)
+        ]
+    }, indent=2)
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The server is run from this directory, not installed; import it the same way
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """The server module with an empty catalog database under tmp_path."""
+    monkeypatch.setattr(server, "CATALOG_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "CATALOG_FILE", str(tmp_path / "cq-catalog.json"))
+    monkeypatch.setattr(server, "CATALOG_DB", str(tmp_path / "cq-catalog.db"))
+    monkeypatch.setattr(server, "RESULTS_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(server, "_conn", None)
+    monkeypatch.setattr(server, "_catalog_cache", server._CatalogCache())
+    yield server
+    if server._conn is not None:
+        server._conn.close()
+
+
+def make_question(cq_id="cq1", category="mechanistic", difficulty="moderate"):
+    """A Drug -> Target -> Disease question with two gold edges."""
+    return {
+        "id": cq_id,
+        "title": f"Question {cq_id}",
+        "question": "How does the drug act on the disease?",
+        "category": category,
+        "difficulty": difficulty,
+        "entities": [
+            {"name": "Drug", "curie": "CHEMBL:1", "entity_type": "drug"},
+            {"name": "Target", "curie": "HGNC:2", "entity_type": "gene"},
+            {"name": "Disease", "curie": "MONDO:3", "entity_type": "disease"},
+        ],
+        "edges": [
+            {"source": "CHEMBL:1", "target": "HGNC:2", "relation": "agonist"},
+            {"source": "HGNC:2", "target": "MONDO:3", "relation": "causes"},
+        ],
+        "workflow": [
+            {"step_id": "anchor", "description": "Resolve the drug", "tool_pattern": "chembl_search"},
+        ],
+    }
+
+
+@pytest.fixture
+def question():
+    """make_question() with the defaults."""
+    return make_question()
+
+
+@pytest.fixture
+def add_question(catalog):
+    """Add make_question(**kwargs) to the catalog."""
+    def add(**kwargs):
+        catalog._save_question(catalog.CompetencyQuestion(**make_question(**kwargs)).model_dump())
+    return add
@@ -0,0 +1,81 @@
+"""Tests for cq_score_batch run selection and aggregation."""
+
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+
+def _run(srv, cq_id, statuses=("pass",)):
+    """Open a run for cq_id and record one anchor step per status."""
+    run = json.loads(asyncio.run(srv.cq_start_run(cq_id)))["run_id"]
+    for status in statuses:
+        asyncio.run(srv.cq_record_step(cq_id, "anchor", status, actual_curie="CHEMBL:1", run_id=run))
+    return run
+
+
+def _batch(srv, **kwargs):
+    return json.loads(asyncio.run(srv.cq_score_batch(**kwargs)))
+
+
+def _open_runs(srv):
+    return {row["run_id"] for row in srv._db().execute("SELECT run_id FROM eval_runs WHERE status = 'open'")}
+
+
+@pytest.fixture
+def runs(catalog, add_question):
+    add_question(cq_id="cq1", category="mechanistic")
+    add_question(cq_id="cq2", category="genetic")
+    return {"cq1": _run(catalog, "cq1"), "cq2": _run(catalog, "cq2", ("pass", "fail"))}
+
+
+def test_none_scores_every_open_run(catalog, runs):
+    batch = _batch(catalog)
+    assert batch["scored"] == 2
+    assert {r["run_id"] for r in batch["results"]} == set(runs.values())
+    assert sorted(batch["by_category"]) == ["genetic", "mechanistic"]
+    assert batch["by_tier"]["tier1"] == {"steps": 3, "pass": 2, "partial": 0, "fail": 1, "skip": 0, "pass_rate": 0.667}
+    assert not _open_runs(catalog)
+
+
+@pytest.mark.parametrize("kwargs", [{"cq_ids": []}, {"run_ids": []}, {"cq_ids": ["cq1"], "run_ids": []}])
+def test_empty_filters_are_rejected(catalog, runs, kwargs):
+    assert "error" in _batch(catalog, **kwargs)
+    assert _open_runs(catalog) == set(runs.values())
+
+
+def test_filters(catalog, runs):
+    assert [r["cq_id"] for r in _batch(catalog, cq_ids=["cq2"])["results"]] == ["cq2"]
+    assert _open_runs(catalog) == {runs["cq1"]}
+    # Both filters apply
+    assert _batch(catalog, cq_ids=["cq2"], run_ids=[runs["cq1"]])["scored"] == 0
+    assert _batch(catalog, cq_ids=["cq1"], run_ids=[runs["cq1"], runs["cq1"]])["scored"] == 1
+
+
+def test_runs_without_steps_or_question_are_skipped(catalog, runs):
+    empty = json.loads(asyncio.run(catalog.cq_start_run("cq1")))["run_id"]
+    batch = _batch(catalog, run_ids=[empty])
+    assert batch["scored"] == 0
+    assert batch["skipped"] == [{"run_id": empty, "cq_id": "cq1", "reason": "no steps recorded"}]
+
+
+def test_long_id_lists_are_queried_in_chunks(catalog, runs, monkeypatch):
+    monkeypatch.setattr(catalog, "_IN_CHUNK", 1)
+    # Interleave the journals of the two runs
+    asyncio.run(catalog.cq_record_step("cq1", "mechanism", "partial", run_id=runs["cq1"]))
+    asyncio.run(catalog.cq_record_step("cq2", "mechanism", "skip", run_id=runs["cq2"]))
+    batch = _batch(catalog, run_ids=list(runs.values()))
+    assert batch["scored"] == 2
+    conn = catalog._db()
+    for cq_id, statuses in (("cq1", ["pass", "partial"]), ("cq2", ["pass", "fail", "skip"])):
+        filename = conn.execute("SELECT filename FROM results WHERE cq_id = ?", (cq_id,)).fetchone()["filename"]
+        with open(f"{catalog.RESULTS_DIR}/{filename}") as f:
+            assert [step["status"] for step in json.load(f)["step_results"]] == statuses
+
+
+def test_more_ids_than_sqlite_binds_in_one_statement(catalog, runs):
+    # The default limit of SQLite builds before 3.32 (many builds raise it)
+    catalog._db().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    run_ids = [f"missing-{i}" for i in range(2000)] + [runs["cq1"]]
+    assert _batch(catalog, run_ids=run_ids)["scored"] == 1
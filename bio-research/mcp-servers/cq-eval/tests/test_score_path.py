@@ -0,0 +1,82 @@
+"""Tests for graph-based edge scoring (_score_path / _score_steps)."""
+
+import pytest
+
+
+def _edges(*pairs, relation="regulates"):
+    return [{"source": a, "target": b, "relation": relation} for a, b in pairs]
+
+
+def _observed(*pairs, relation=None, status="pass"):
+    return [
+        {"step_id": f"{a}-{b}", "status": status, "source_curie": a, "actual_curie": b, "relation": relation}
+        for a, b in pairs
+    ]
+
+
+CHAIN = _edges(("A", "B"), ("B", "C"), ("C", "D"), ("D", "E"), ("E", "F"))
+
+
+def test_without_observed_edges_steps_are_counted(catalog):
+    assert catalog._score_path(CHAIN, [{"step_id": "anchor", "status": "pass", "actual_curie": "A"}]) == {
+        "method": "steps"
+    }
+
+
+def test_fully_covered_chain(catalog):
+    path = catalog._score_path(CHAIN, _observed(*[(e["source"], e["target"]) for e in reversed(CHAIN)]))
+    assert path["edge_coverage"] == 1.0
+    assert path["longest_subpath"] == ["A", "B", "C", "D", "E", "F"]
+    assert (path["gaps"], path["gap_lengths"], path["shortest_gap"]) == ([], [], 0)
+
+
+def test_relations_must_match_when_reported(catalog):
+    steps = _observed(("A", "B"), relation="Regulates") + _observed(("B", "C"), relation="inhibits")
+    path = catalog._score_path(CHAIN[:2], steps)
+    assert path["edges_covered"] == 1
+    # Failed steps are not observations
+    assert catalog._score_path(CHAIN[:2], _observed(("A", "B"), status="fail")) == {"method": "steps"}
+
+
+def test_gaps_are_measured_along_the_chain(catalog):
+    # A-B missing (1 hop), C-D-E missing (2 hops)
+    path = catalog._score_path(CHAIN, _observed(("B", "C"), ("E", "F")))
+    assert path["gap_lengths"] == [1, 2]
+    assert path["shortest_gap"] == 1
+    assert [[(e["source"], e["target"]) for e in gap] for gap in path["gaps"]] == [
+        [("A", "B")], [("C", "D"), ("D", "E")]
+    ]
+
+
+def test_gap_edges_are_listed_in_path_order(catalog):
+    gold = _edges(("C", "D"), ("B", "C"), ("A", "B"))
+    path = catalog._score_path(gold, _observed(("A", "B")))
+    assert [(e["source"], e["target"]) for e in path["gaps"][0]] == [("B", "C"), ("C", "D")]
+    assert path["shortest_gap"] == 2
+
+
+def test_fan_out_is_one_hop_not_one_per_edge(catalog):
+    """Three missing targets of one node form a gap one edge long."""
+    gold = _edges(("A", "B"), ("B", "C"), ("B", "D"), ("B", "E"), ("X", "Y"), ("Y", "Z"))
+    path = catalog._score_path(gold, _observed(("A", "B")))
+    assert path["gap_lengths"] == [1, 2]
+    assert len(path["gaps"][0]) == 3
+
+
+def test_missing_cycle_counts_its_edges(catalog):
+    gold = _edges(("A", "B"), ("B", "C"), ("C", "B"))
+    path = catalog._score_path(gold, _observed(("A", "B")))
+    assert path["gap_lengths"] == [2]
+
+
+@pytest.mark.parametrize("observed, complete", [
+    ((("CHEMBL:1", "HGNC:2"), ("HGNC:2", "MONDO:3")), True),
+    ((("CHEMBL:1", "HGNC:2"),), False),
+])
+def test_score_steps_uses_the_graph(catalog, question, observed, complete):
+    steps = [{"step_id": "anchor", "status": "pass", "actual_curie": "CHEMBL:1"}] + _observed(*observed)
+    result = catalog._score_steps(question, steps)
+    assert result.path["method"] == "graph"
+    assert result.entity_score == (1.0 if complete else 0.667)
+    assert result.edge_score == (1.0 if complete else 0.5)
+    assert result.path_complete is complete
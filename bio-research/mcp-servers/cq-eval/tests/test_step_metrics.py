@@ -0,0 +1,61 @@
+"""Tests for the per-step latency index behind cq_compare."""
+
+import asyncio
+import json
+
+
+def _record_and_score(srv, cq_id="cq1"):
+    run = json.loads(asyncio.run(srv.cq_start_run(cq_id)))["run_id"]
+    for latency in (10.0, 20.0, 30.0):
+        # The same step id recorded three times, e.g. retried with another tool
+        asyncio.run(srv.cq_record_step(cq_id, "anchor", "pass", actual_curie="CHEMBL:1",
+                                       tool_used="chembl_search", run_id=run, latency_ms=latency))
+    return json.loads(asyncio.run(srv.cq_score(cq_id, run)))
+
+
+def _metrics(srv):
+    return srv._db().execute("SELECT step_id, latency_ms FROM step_metrics ORDER BY latency_ms").fetchall()
+
+
+def test_repeated_step_ids_are_all_indexed(catalog, add_question):
+    add_question()
+    _record_and_score(catalog)
+    assert [tuple(row) for row in _metrics(catalog)] == [("anchor", 10.0), ("anchor", 20.0), ("anchor", 30.0)]
+
+
+def test_reindexing_a_result_does_not_duplicate_samples(catalog, add_question):
+    add_question()
+    result = _record_and_score(catalog)
+    conn = catalog._db()
+    filename = conn.execute("SELECT filename FROM results").fetchone()["filename"]
+    with conn:
+        catalog._index_result(conn, result, filename)
+        catalog._index_result(conn, result, filename)
+    assert len(_metrics(catalog)) == 3
+
+
+def test_duplicates_in_an_existing_index_are_removed_on_open(catalog, add_question):
+    add_question()
+    _record_and_score(catalog)
+    conn = catalog._db()
+    with conn:
+        conn.execute("INSERT INTO step_metrics SELECT * FROM step_metrics")
+        conn.execute("DELETE FROM catalog_meta WHERE key = 'step_metrics_deduped'")
+    assert len(_metrics(catalog)) == 6
+
+    conn.close()
+    catalog._conn = None
+    assert len(_metrics(catalog)) == 3
+
+
+def test_cq_compare_counts_each_sample_once(catalog, add_question):
+    add_question()
+    _record_and_score(catalog)
+    _record_and_score(catalog)
+    # Re-indexing both results (e.g. a backfill) must not inflate the counts
+    conn = catalog._db()
+    with conn:
+        conn.execute("DELETE FROM catalog_meta WHERE key = 'results_indexed'")
+    catalog._backfill_results_index(conn)
+    compare = json.loads(asyncio.run(catalog.cq_compare("cq1")))
+    assert compare["latency"]["by_tool"]["chembl_search"]["n"] == 6
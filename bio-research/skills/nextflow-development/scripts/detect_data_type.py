@@ -8,6 +8,7 @@ the most appropriate pipeline for the data.
 Usage:
     python detect_data_type.py /path/to/data
     python detect_data_type.py /path/to/data --json
+    python detect_data_type.py /path/to/data --manifest scan.json
 """
 
 import argparse
@@ -15,10 +16,15 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 
+# Import the scanner module on its own: the utils package also loads the
+# NCBI client, response cache and download machinery
+sys.path.insert(0, str(Path(__file__).parent / "utils"))
+from file_discovery import ScanIndex, classify_file
+
 
 def load_all_pipeline_configs() -> Dict[str, Dict]:
     """Load all pipeline configurations."""
@@ -34,47 +40,29 @@ def load_all_pipeline_configs() -> Dict[str, Dict]:
     return configs
 
 
-def scan_directory(directory: str) -> Dict:
-    """Scan directory and collect file information."""
-    info = {
-        'fastq_count': 0,
-        'bam_count': 0,
-        'cram_count': 0,
-        'filenames': [],
-        'directories': [],
-        'total_size_gb': 0,
-    }
-
-    directory = os.path.abspath(directory)
-
-    for root, dirs, files in os.walk(directory):
-        # Collect directory names
-        rel_root = os.path.relpath(root, directory)
-        if rel_root != '.':
-            info['directories'].append(rel_root.lower())
-
-        for filename in files:
-            filename_lower = filename.lower()
-
-            # Count file types
-            if any(filename_lower.endswith(ext) for ext in ['.fastq.gz', '.fq.gz', '.fastq', '.fq']):
-                info['fastq_count'] += 1
-            elif filename_lower.endswith('.bam'):
-                info['bam_count'] += 1
-            elif filename_lower.endswith('.cram'):
-                info['cram_count'] += 1
-
-            # Collect filenames for pattern matching
-            info['filenames'].append(filename_lower)
-
-            # Sum file sizes
-            try:
-                size = os.path.getsize(os.path.join(root, filename))
-                info['total_size_gb'] += size / (1024**3)
-            except:
-                pass
+def scan_directory(directory: str, index: Optional[ScanIndex] = None) -> Dict:
+    """
+    Scan directory (or use an existing scan of it) and collect file information.
 
-    return info
+    Symlinked directories are not descended into, and every file name is
+    counted (links to the same file included), as with a plain os.walk().
+    """
+    index = (index or ScanIndex.scan(directory)).unfollowed()
+    counts = {'fastq': 0, 'bam': 0, 'cram': 0}
+    for name in index.filenames:
+        kind = classify_file(name)
+        if kind:
+            counts[kind[0]] += 1
+
+    return {
+        'fastq_count': counts['fastq'],
+        'bam_count': counts['bam'],
+        'cram_count': counts['cram'],
+        # Lowercased names for pattern matching
+        'filenames': [name.lower() for name in index.filenames],
+        'directories': [d.lower() for d in index.directories],
+        'total_size_gb': index.total_size / (1024**3),
+    }
 
 
 def calculate_pipeline_scores(scan_info: Dict, configs: Dict) -> Dict[str, Dict]:
@@ -172,12 +160,13 @@ def calculate_pipeline_scores(scan_info: Dict, configs: Dict) -> Dict[str, Dict]
     return scores
 
 
-def detect_pipeline(directory: str) -> Tuple[str, Dict]:
+def detect_pipeline(directory: str, scan_info: Optional[Dict] = None) -> Tuple[str, Dict]:
     """
     Detect the most appropriate pipeline for the data.
 
     Args:
         directory: Path to data directory
+        scan_info: Result of scan_directory() (scanned here if not given)
 
     Returns:
         Tuple of (recommended_pipeline, all_scores)
@@ -186,7 +175,7 @@ def detect_pipeline(directory: str) -> Tuple[str, Dict]:
         raise ValueError(f"Not a directory: {directory}")
 
     configs = load_all_pipeline_configs()
-    scan_info = scan_directory(directory)
+    scan_info = scan_info or scan_directory(directory)
 
     # Check if any sequencing files found
     total_files = scan_info['fastq_count'] + scan_info['bam_count'] + scan_info['cram_count']
@@ -206,7 +195,8 @@ def print_results(
     recommended: str,
     scores: Dict,
     scan_info: Dict,
-    output_json: bool = False
+    output_json: bool = False,
+    manifest: Optional[str] = None
 ):
     """Print detection results."""
     if output_json:
@@ -256,7 +246,8 @@ def print_results(
     if test_cmd:
         print(f"   {test_cmd}")
     print(f"\n3. Generate samplesheet:")
-    print(f"   python scripts/generate_samplesheet.py {directory} {recommended}")
+    manifest_arg = f" --manifest {manifest}" if manifest else ""
+    print(f"   python scripts/generate_samplesheet.py {directory} {recommended}{manifest_arg}")
 
 
 def main():
@@ -267,18 +258,22 @@ def main():
 Examples:
     %(prog)s ./data
     %(prog)s ./fastqs --json
+    %(prog)s ./fastqs --manifest scan.json   # reuse the scan in generate_samplesheet.py
         """
     )
 
     parser.add_argument('directory', help='Directory containing sequencing data')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='Directory scan manifest: reused if it exists for this directory, '
+                             'written otherwise')
 
     args = parser.parse_args()
 
     try:
-        scan_info = scan_directory(args.directory)
-        recommended, scores = detect_pipeline(args.directory)
-        print_results(args.directory, recommended, scores, scan_info, args.json)
+        scan_info = scan_directory(args.directory, ScanIndex.open(args.directory, args.manifest))
+        recommended, scores = detect_pipeline(args.directory, scan_info)
+        print_results(args.directory, recommended, scores, scan_info, args.json, args.manifest)
         sys.exit(0)
 
     except ValueError as e:
@@ -13,6 +13,7 @@ Usage:
     python generate_samplesheet.py /path/to/data rnaseq -o samplesheet.csv
     python generate_samplesheet.py /path/to/bams sarek --input-type bam
     python generate_samplesheet.py --validate samplesheet.csv rnaseq
+    python generate_samplesheet.py /path/to/data rnaseq --manifest scan.json
 """
 
 import argparse
@@ -26,7 +27,7 @@ import yaml
 # Add parent directory to path for utils import
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.file_discovery import discover_files, detect_input_type, find_index_file
+from utils.file_discovery import ScanIndex, find_index_file
 from utils.sample_inference import (
     extract_sample_info,
     infer_tumor_normal_status,
@@ -55,7 +56,8 @@ def generate_samplesheet(
     output_file: Optional[str] = None,
     input_type: str = "auto",
     single_end: bool = False,
-    interactive: bool = True
+    interactive: bool = True,
+    index: Optional[ScanIndex] = None
 ) -> Tuple[Optional[str], ValidationResult]:
     """
     Generate samplesheet for specified pipeline.
@@ -67,6 +69,8 @@ def generate_samplesheet(
         input_type: File type (auto, fastq, bam, cram)
         single_end: Suppress pairing warnings for single-end data
         interactive: Prompt for missing info
+        index: Scan of input_dir (e.g. from ScanIndex.open); scanned once
+            here if not given, then reused for discovery and validation
 
     Returns:
         Tuple of (output_path, validation_result)
@@ -75,9 +79,15 @@ def generate_samplesheet(
     samplesheet_config = config.get("samplesheet", {})
     supported_types = samplesheet_config.get("input_types", ["fastq"])
 
+    # One scan of the directory serves detection, discovery and validation
+    try:
+        index = index or ScanIndex.scan(input_dir)
+    except ValueError as e:
+        return None, ValidationResult(valid=False, errors=[str(e)])
+
     # Determine input type
     if input_type == "auto":
-        input_type = detect_input_type(input_dir)
+        input_type = index.input_type()
         print(f"Auto-detected input type: {input_type.upper()}")
 
     if input_type not in supported_types:
@@ -89,7 +99,7 @@ def generate_samplesheet(
 
     # Discover files
     try:
-        files = discover_files(input_dir, input_type)
+        files = index.files(input_type)
     except ValueError as e:
         return None, ValidationResult(valid=False, errors=[str(e)])
 
@@ -110,7 +120,7 @@ def generate_samplesheet(
     if input_type == "fastq":
         rows = _process_fastq_files(files, config, single_end)
     else:
-        rows = _process_alignment_files(files, config, input_type)
+        rows = _process_alignment_files(files, config, input_type, index)
 
     if not rows:
         return None, ValidationResult(
@@ -127,7 +137,7 @@ def generate_samplesheet(
         rows = _process_atacseq_samples(rows)
 
     # Validate before writing
-    validation = validate_samplesheet(rows, pipeline, config)
+    validation = validate_samplesheet(rows, pipeline, config, index)
 
     if not validation.valid:
         print("\nValidation errors:")
@@ -204,14 +214,15 @@ def _process_fastq_files(files, config: Dict, single_end: bool) -> List[Dict]:
     return rows
 
 
-def _process_alignment_files(files, config: Dict, input_type: str) -> List[Dict]:
+def _process_alignment_files(files, config: Dict, input_type: str,
+                             index: Optional[ScanIndex] = None) -> List[Dict]:
     """Process BAM/CRAM files into samplesheet rows."""
     rows = []
     columns = config.get("samplesheet", {}).get("columns", [])
 
     for file_info in files:
         # Find index file
-        index_path = find_index_file(file_info.path)
+        index_path = find_index_file(file_info.path, index)
 
         info = extract_sample_info(file_info.path)
 
@@ -349,8 +360,9 @@ def _print_preview(rows: List[Dict], config: Dict):
         print(f"... ({len(rows) - 3} more rows)")
 
 
-def validate_existing_samplesheet(csv_path: str, pipeline: str) -> ValidationResult:
-    """Validate an existing samplesheet file."""
+def validate_existing_samplesheet(csv_path: str, pipeline: str,
+                                  index: Optional[ScanIndex] = None) -> ValidationResult:
+    """Validate an existing samplesheet file, checking paths against index when given."""
     import csv
 
     if not os.path.exists(csv_path):
@@ -367,7 +379,7 @@ def validate_existing_samplesheet(csv_path: str, pipeline: str) -> ValidationRes
         return ValidationResult(valid=False, errors=["Samplesheet is empty"])
 
     config = load_pipeline_config(pipeline)
-    return validate_samplesheet(rows, pipeline, config)
+    return validate_samplesheet(rows, pipeline, config, index)
 
 
 def main():
@@ -385,6 +397,10 @@ Examples:
     # Validate existing samplesheet
     %(prog)s --validate samplesheet.csv rnaseq
 
+    # Reuse the scan from detect_data_type.py --manifest
+    %(prog)s ./fastqs rnaseq --manifest scan.json
+    %(prog)s --validate samplesheet.csv rnaseq --manifest scan.json
+
 Supported pipelines: rnaseq, sarek, atacseq
         """
     )
@@ -400,13 +416,17 @@ Supported pipelines: rnaseq, sarek, atacseq
                         help='Validate existing samplesheet instead of generating')
     parser.add_argument('--no-interactive', action='store_true',
                         help='Non-interactive mode (use defaults)')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='Directory scan manifest: reused if it exists for this directory, '
+                             'written otherwise (with --validate: checked instead of the filesystem)')
 
     args = parser.parse_args()
 
     try:
         if args.validate:
             # Validate existing samplesheet
-            result = validate_existing_samplesheet(args.input, args.pipeline)
+            index = ScanIndex.load(args.manifest) if args.manifest else None
+            result = validate_existing_samplesheet(args.input, args.pipeline, index)
             if result.valid:
                 print(f"✓ Samplesheet is valid for {args.pipeline}")
                 if result.warnings:
@@ -430,7 +450,8 @@ Supported pipelines: rnaseq, sarek, atacseq
                 args.output,
                 args.input_type,
                 args.single_end,
-                interactive=not args.no_interactive
+                interactive=not args.no_interactive,
+                index=ScanIndex.open(args.input, args.manifest)
             )
 
             if output_path is None:
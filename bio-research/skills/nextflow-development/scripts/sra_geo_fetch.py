@@ -24,7 +24,7 @@ import os
 import re
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -33,17 +33,20 @@ from typing import Dict, List, Optional, Tuple
 sys.path.insert(0, str(Path(__file__).parent))
 from utils.ncbi_utils import (
     check_network_access,
-    fetch_geo_metadata,
-    fetch_sra_study_accession,
-    fetch_sra_run_info,
-    fetch_sra_run_info_detailed,
-    fetch_ena_fastq_urls,
+    get_resolver,
     download_file,
+    is_download_complete,
+    DOWNLOAD_BUFFER_SIZE,
     format_file_size,
     estimate_download_size,
     group_samples_by_type,
     format_sample_groups_table,
 )
+from utils.http_client import get_client
+from utils.download_scheduler import DownloadScheduler, DownloadTask
+from utils.download_progress import DownloadProgress, format_duration
+from utils.fastq_store import LINK_MODES, FastqStore
+from utils.fastq_validator import FastqValidator
 
 # Set up logging
 logging.basicConfig(
@@ -154,30 +157,29 @@ def cmd_info(args):
     geo_id = args.geo_id.upper()
 
     print(f"\nFetching information for {geo_id}...")
+    study = get_resolver(geo_id)
 
-    # Check network
-    network_ok, network_msg = check_network_access()
-    if not network_ok:
-        print(f"\n⚠️  Network issues detected:\n{network_msg}")
-
-    # Get GEO metadata
-    metadata = fetch_geo_metadata(geo_id)
+    # GEO, BioProject, SRA, ENA and PubMed lookups run concurrently
+    # (served from the response cache on re-runs)
+    overview = study.overview()
+    metadata = overview['metadata']
     if not metadata:
+        # Diagnose only on failure, so cached re-runs stay off the network
+        network_ok, network_msg = check_network_access()
+        if not network_ok:
+            print(f"\n⚠️  Network issues detected:\n{network_msg}")
         print(f"\n❌ Could not fetch metadata for {geo_id}")
         return 1
 
-    # Get SRA study accession
-    sra_study = fetch_sra_study_accession(geo_id)
+    runs = overview['runs']
+    sra_studies = overview['sra_studies']
+    sra_study = sra_studies[0] if sra_studies else None
+    publication = overview['publication']
+    fastq_files = {srr: files for study_files in overview['fastq_files'].values()
+                   for srr, files in study_files.items()}
 
-    # Get detailed run info
-    print("Fetching SRA run information...")
-    runs = fetch_sra_run_info_detailed(geo_id)
-    if not runs:
-        # Fallback to basic method
-        runs = fetch_sra_run_info(geo_id)
-
-    # Group samples by type
-    groups = group_samples_by_type(runs) if runs else {}
+    # Group samples by type (sizes from ENA where available)
+    groups = group_samples_by_type(runs, fastq_files) if runs else {}
 
     # Suggest genome and pipeline
     organism = metadata.get('organism', 'Unknown')
@@ -191,7 +193,8 @@ def cmd_info(args):
     pipeline = suggest_pipeline(primary_strategy)
 
     # Estimate download size
-    est_size = estimate_download_size(runs)
+    est_size = estimate_download_size(runs, fastq_files)
+    exact_size = bool(runs) and all(r['srr'] in fastq_files for r in runs)
 
     # Display info
     print("\n" + "━" * 70)
@@ -199,11 +202,17 @@ def cmd_info(args):
     print("━" * 70)
     print(f"Organism:     {organism}")
     print(f"Samples:      {metadata.get('n_samples', 'N/A')}")
-    print(f"SRA Study:    {sra_study or 'Not found'}")
+    print(f"BioProject:   {overview['bioproject'] or 'Not found'}")
+    print(f"SRA Study:    {', '.join(sra_studies) or 'Not found'}")
     print(f"Runs:         {len(runs)}")
-    print(f"Est. Size:    ~{format_file_size(est_size)}")
+    if exact_size:
+        print(f"Size:         {format_file_size(est_size)} (ENA)")
+    else:
+        print(f"Est. Size:    ~{format_file_size(est_size)}")
     print(f"Genome:       {genome or 'Unknown (manual selection required)'}")
     print(f"Pipeline:     nf-core/{pipeline} (suggested)")
+    if publication:
+        print(f"Publication:  {publication['authors']} ({publication['year']}) {publication['journal']}")
 
     # Show sample groups table
     if groups:
@@ -230,12 +239,15 @@ def cmd_info(args):
             'title': metadata.get('title'),
             'organism': organism,
             'n_samples': metadata.get('n_samples'),
+            'bioproject': overview['bioproject'],
             'sra_study': sra_study,
+            'sra_studies': sra_studies,
             'n_runs': len(runs),
             'groups': {k: {**v, 'runs': None, 'gsm_ids': list(v.get('gsm_ids', []))} for k, v in groups.items()},
             'suggested_genome': genome,
             'suggested_pipeline': pipeline,
             'summary': metadata.get('summary'),
+            'publication': publication,
         }
         output_path = Path(args.output_json)
         with open(output_path, 'w') as f:
@@ -252,9 +264,7 @@ def cmd_groups(args):
     print(f"\nFetching sample groups for {geo_id}...")
 
     # Get detailed run info
-    runs = fetch_sra_run_info_detailed(geo_id)
-    if not runs:
-        runs = fetch_sra_run_info(geo_id)
+    runs = get_resolver(geo_id).runs()
 
     if not runs:
         print(f"\n❌ No runs found for {geo_id}")
@@ -301,7 +311,7 @@ def cmd_list(args):
 
     print(f"\nFetching run list for {geo_id}...")
 
-    runs = fetch_sra_run_info(geo_id)
+    runs = get_resolver(geo_id).runs()
     if not runs:
         print(f"\n❌ No runs found for {geo_id}")
         return 1
@@ -344,16 +354,96 @@ def cmd_list(args):
     return 0
 
 
-def download_fastq_file(url: str, output_path: Path, timeout: int = 600) -> Tuple[str, bool]:
-    """Download a single FASTQ file."""
+def download_fastq_file(
+    fastq: Dict,
+    output_path: Path,
+    timeout: int = 600,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    show_progress: bool = False,
+    progress: Optional[DownloadProgress] = None,
+    validator: Optional[FastqValidator] = None,
+) -> Tuple[str, bool]:
+    """Download a single FASTQ file, verified against ENA's size and MD5 (and validated inline)."""
     filename = output_path.name
-    if output_path.exists():
+    if is_download_complete(output_path, fastq.get('bytes')):
         return filename, True  # Already exists
 
-    success = download_file(url, output_path, timeout=timeout, show_progress=False)
+    on_chunk = on_retry = None
+    if progress:
+        part_path = output_path.with_name(output_path.name + '.part')
+        progress.start(output_path, fastq['url'], fastq.get('bytes'),
+                       part_path.stat().st_size if part_path.exists() else 0)
+        on_chunk = lambda n: progress.chunk(output_path, n)
+        on_retry = lambda offset, error: progress.retry(output_path, error, offset)
+
+    success = download_file(
+        fastq['url'], output_path, timeout=timeout, show_progress=show_progress,
+        expected_size=fastq.get('bytes'), expected_md5=fastq.get('md5'), buffer_size=buffer_size,
+        on_chunk=on_chunk, on_retry=on_retry, validator=validator,
+    )
+    if progress:
+        progress.finish(output_path, success)
     return filename, success
 
 
+def quarantine_invalid(path: Path) -> Optional[Path]:
+    """
+    Rename a file that failed validation to '<name>.invalid'.
+
+    The next run only checks sizes, so under its own name the file would
+    be taken as complete and never downloaded again.
+
+    Returns:
+        The new path, or None if the file is missing or could not be renamed
+    """
+    quarantined = path.with_name(path.name + '.invalid')
+    try:
+        os.replace(path, quarantined)
+    except OSError as e:
+        logger.error(f"Could not move invalid {path.name} aside: {e}")
+        return None
+    return quarantined
+
+
+def check_read_counts(runs: List[Dict], fastq_files: Dict[str, List[Dict]],
+                      results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Compare inline validation results with the SRA spot count of each run.
+
+    Each file of a paired run ('_1'/'_2') and the only file of a single-end
+    run should hold one read per spot; other files (e.g. unpaired reads next
+    to a pair) have no expected count.
+
+    Args:
+        runs: Run records with 'srr' and 'spots'
+        fastq_files: ENA files per run
+        results: FastqValidator results by file name
+
+    Returns:
+        Dict of file name -> {run, reads, spots, spots_match, valid, error}
+    """
+    spots = {run['srr']: int(run['spots']) for run in runs if str(run.get('spots', '')).isdigit()}
+    report = {}
+    for srr, files in fastq_files.items():
+        for fastq in files:
+            filename = fastq['url'].split('/')[-1]
+            result = results.get(filename)
+            if result is None:
+                continue
+            expected = None
+            if len(files) == 1 or re.search(r'_[12]\.f(ast)?q', filename):
+                expected = spots.get(srr)
+            report[filename] = {
+                'run': srr,
+                'reads': result['reads'],
+                'spots': expected,
+                'spots_match': result['reads'] == expected if expected is not None else None,
+                'valid': result['valid'],
+                'error': result['error'],
+            }
+    return report
+
+
 def interactive_select_group(groups: Dict[str, Dict]) -> Optional[str]:
     """Interactively select a sample group."""
     if len(groups) <= 1:
@@ -400,30 +490,42 @@ def cmd_download(args):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"\nPreparing download for {geo_id}...")
+    study = get_resolver(geo_id)
 
     # Get detailed run info (includes BioProject fallback for SuperSeries)
     print("Fetching SRA run information...")
-    runs = fetch_sra_run_info_detailed(geo_id)
-    if not runs:
-        runs = fetch_sra_run_info(geo_id)
+    runs = study.runs()
 
     if not runs:
         print(f"❌ No runs found for {geo_id}")
         return 1
 
     # Collect all unique SRA studies from runs (SuperSeries may have multiple)
-    sra_studies = set(r.get('sra_study', '') for r in runs if r.get('sra_study'))
+    sra_studies = study.sra_studies()
     if not sra_studies:
         print(f"❌ Could not find any SRA studies for {geo_id}")
         return 1
 
     if len(sra_studies) > 1:
-        print(f"SuperSeries detected with {len(sra_studies)} SRA studies: {', '.join(sorted(sra_studies))}")
+        print(f"SuperSeries detected with {len(sra_studies)} SRA studies: {', '.join(sra_studies)}")
     else:
-        print(f"SRA Study: {list(sra_studies)[0]}")
+        print(f"SRA Study: {sra_studies[0]}")
 
-    # Group samples
-    groups = group_samples_by_type(runs)
+    # Get ENA FASTQ URLs from all SRA studies (fetched concurrently)
+    print("\nFetching FASTQ URLs from ENA...")
+    fastq_files = {}
+    for sra_study, study_files in study.fastq_files_by_study().items():
+        if study_files:
+            print(f"  {sra_study}: {len(study_files)} runs")
+            fastq_files.update(study_files)
+
+    if not fastq_files:
+        print("❌ No FASTQ URLs found in ENA")
+        print("Tip: Try using SRA toolkit directly with prefetch + fasterq-dump")
+        return 1
+
+    # Group samples (sizes from ENA)
+    groups = group_samples_by_type(runs, fastq_files)
 
     # Show sample groups if multiple types exist
     if len(groups) > 1:
@@ -436,20 +538,6 @@ def cmd_download(args):
     if args.interactive and len(groups) > 1 and not selected_subset:
         selected_subset = interactive_select_group(groups)
 
-    # Get ENA FASTQ URLs from all SRA studies
-    print("\nFetching FASTQ URLs from ENA...")
-    fastq_urls = {}
-    for sra_study in sorted(sra_studies):
-        study_urls = fetch_ena_fastq_urls(sra_study)
-        if study_urls:
-            print(f"  {sra_study}: {len(study_urls)} runs")
-            fastq_urls.update(study_urls)
-
-    if not fastq_urls:
-        print("❌ No FASTQ URLs found in ENA")
-        print("Tip: Try using SRA toolkit directly with prefetch + fasterq-dump")
-        return 1
-
     # Apply filter if specified
     if selected_subset:
         filter_parts = selected_subset.split(':')
@@ -464,62 +552,145 @@ def cmd_download(args):
                 continue
             filtered_srrs.add(run['srr'])
 
-        fastq_urls = {srr: urls for srr, urls in fastq_urls.items() if srr in filtered_srrs}
-        print(f"\n📦 Filtered to {len(fastq_urls)} runs matching \"{selected_subset}\"")
+        fastq_files = {srr: files for srr, files in fastq_files.items() if srr in filtered_srrs}
+        print(f"\n📦 Filtered to {len(fastq_files)} runs matching \"{selected_subset}\"")
 
     # Count files to download
-    total_files = sum(len(urls) for urls in fastq_urls.values())
-    print(f"\n📦 Found {len(fastq_urls)} runs, {total_files} FASTQ files to download")
+    total_files = sum(len(files) for files in fastq_files.values())
+    print(f"\n📦 Found {len(fastq_files)} runs, {total_files} FASTQ files to download")
 
-    # Check for existing files
+    # Shared content-addressed store: runs already downloaded for another
+    # study are linked instead of downloaded, new ones are downloaded into it
+    store = FastqStore(Path(args.store)) if args.store else None
+
+    # Check for existing files (partial .part files are resumed)
     existing = 0
-    downloads_needed = []
-    for srr, urls in fastq_urls.items():
-        for url in urls:
-            filename = url.split('/')[-1]
+    linked = 0
+    downloads_needed = []  # (fastq, download path, output path)
+    validation = {}  # file name -> FastqValidator result
+    linked_validation = {}  # results recorded in the store when first downloaded
+    for srr, files in fastq_files.items():
+        for fastq in files:
+            filename = fastq['url'].split('/')[-1]
             filepath = output_dir / filename
-            if filepath.exists():
+            if is_download_complete(filepath, fastq.get('bytes')):
                 existing += 1
+                continue
+            if not (store and fastq.get('md5')):
+                downloads_needed.append((fastq, filepath, filepath))
+                continue
+            try:
+                method = store.link(fastq['md5'], filepath, args.link_mode)
+            except OSError as e:
+                # e.g. a hardlink across filesystems; fetch this file directly instead
+                logger.warning(f"Could not link {filename} from the FASTQ store, downloading it: {e}")
+                downloads_needed.append((fastq, filepath, filepath))
+                continue
+            if method:
+                linked += 1
+                stored = store.info(fastq['md5']).get('validation')
+                if args.validate and stored:
+                    validation[filename] = linked_validation[filename] = stored
             else:
-                downloads_needed.append((url, filepath))
+                # Downloaded apart from other studies fetching the same file, then committed
+                downloads_needed.append((fastq, store.incoming_path(fastq['md5'], filename, output_dir), filepath))
 
     if existing:
         print(f"  ✓ {existing} files already exist, skipping")
+    if linked:
+        print(f"  🔗 {linked} files linked from the FASTQ store ({store.root})")
+    existing += linked
 
     if not downloads_needed:
         print("\n✅ All files already downloaded!")
         return 0
 
-    print(f"  ↓ {len(downloads_needed)} files to download")
+    sizes = [fastq.get('bytes') for fastq, _, _ in downloads_needed]
+    size_note = f" ({format_file_size(sum(sizes))})" if None not in sizes else ""
+    print(f"  ↓ {len(downloads_needed)} files to download{size_note}")
     print()
 
     # Download files
     successful = 0
     failed = []
+    output_paths = {target: filepath for _, target, filepath in downloads_needed}
+    # Inline validation reads the bytes as they are written; no second pass
+    validators = {
+        target: FastqValidator(filepath.name) for _, target, filepath in downloads_needed
+    } if args.validate else {}
+
+    def place(fastq: Dict, target: Path, success: bool) -> bool:
+        """Record validation and move a file downloaded for the store into it and the output directory."""
+        if success and target != output_paths[target]:
+            try:
+                store.commit(fastq['md5'], target)
+            except OSError as e:
+                logger.error(f"Could not move {target.name} into the FASTQ store: {e}")
+                return False
+        if success and target in validators:
+            result = validators[target].result()
+            validation[output_paths[target].name] = result
+            if target != output_paths[target]:
+                store.save_info(fastq['md5'], {'validation': result})
+        if success and target != output_paths[target]:
+            try:
+                store.link(fastq['md5'], output_paths[target], args.link_mode)
+            except OSError as e:
+                logger.error(f"Could not link {target.name} into {output_dir}: {e}")
+                return False
+        return success
+
+    buffer_size = int(args.buffer_mb * 1024 * 1024)
+    progress = DownloadProgress(
+        total_files=len(downloads_needed),
+        total_bytes=sum(sizes) if None not in sizes else None,
+        events_path=args.progress_events,
+        summary_path=args.progress_summary,
+        interval=args.progress_interval,
+        console=args.parallel > 1,
+    )
 
     if args.parallel > 1:
-        # Parallel download
-        with ThreadPoolExecutor(max_workers=args.parallel) as executor:
-            futures = {
-                executor.submit(download_fastq_file, url, filepath): filepath
-                for url, filepath in downloads_needed
-            }
-
-            for i, future in enumerate(as_completed(futures), 1):
-                filepath = futures[future]
-                filename, success = future.result()
+        # Parallel download: largest files first, per-host caps, adaptive concurrency
+        scheduler = DownloadScheduler(
+            max_workers=args.parallel,
+            per_host=args.per_host,
+            segment_size=int(args.segment_mb * 1024 * 1024),
+            max_bandwidth=args.max_bandwidth * 1024 * 1024 if args.max_bandwidth else None,
+            adaptive=not args.no_adaptive,
+            timeout=args.timeout,
+            buffer_size=buffer_size,
+            progress=progress,
+        )
+        tasks = [
+            DownloadTask(fastq['url'], target, fastq.get('bytes'), fastq.get('md5'), validators.get(target))
+            for fastq, target, _ in downloads_needed
+        ]
+        done = 0
+        print_lock = threading.Lock()
+
+        def report(task: DownloadTask, success: bool):
+            nonlocal done, successful
+            success = place({'md5': task.md5}, task.path, success)
+            filename = output_paths[task.path].name
+            with print_lock:
+                done += 1
                 status = "✓" if success else "✗"
-                print(f"  [{i}/{len(downloads_needed)}] {status} {filename}")
+                print(f"  [{done}/{len(tasks)}] {status} {filename}")
                 if success:
                     successful += 1
                 else:
                     failed.append(filename)
+
+        scheduler.run(tasks, on_complete=report)
     else:
         # Sequential download
-        for i, (url, filepath) in enumerate(downloads_needed, 1):
+        for i, (fastq, target, filepath) in enumerate(downloads_needed, 1):
             filename = filepath.name
             print(f"  [{i}/{len(downloads_needed)}] Downloading {filename}...")
-            success = download_file(url, filepath, timeout=args.timeout)
+            _, success = download_fastq_file(fastq, target, args.timeout, buffer_size, show_progress=True,
+                                             progress=progress, validator=validators.get(target))
+            success = place(fastq, target, success)
             if success:
                 successful += 1
                 print(f"    ✓ Done")
@@ -527,9 +698,33 @@ def cmd_download(args):
                 failed.append(filename)
                 print(f"    ✗ Failed")
 
+    transfer = progress.close()
+
+    read_counts = check_read_counts(runs, fastq_files, validation) if args.validate else None
+    if read_counts is not None:
+        invalid = [name for name, r in read_counts.items() if not r['valid']]
+        mismatched = [name for name, r in read_counts.items() if r['valid'] and r['spots_match'] is False]
+        print(f"\n🔎 Validated {len(read_counts)} files, "
+              f"{sum(r['reads'] for r in read_counts.values()):,} reads")
+        for name in invalid:
+            quarantined = quarantine_invalid(output_dir / name)
+            note = f" (moved to {quarantined.name})" if quarantined else ""
+            print(f"  ✗ {name}: {read_counts[name]['error']}{note}")
+        for name in mismatched:
+            r = read_counts[name]
+            print(f"  ⚠️  {name}: {r['reads']:,} reads, SRA reports {r['spots']:,} spots")
+        for name in invalid:
+            if name in linked_validation:
+                existing -= 1
+            else:
+                successful -= 1
+        failed.extend(invalid)
+
     print(f"\n📊 Download summary:")
     print(f"  ✓ Successful: {successful + existing}")
     print(f"  ✗ Failed: {len(failed)}")
+    print(f"  ⏱ {format_file_size(transfer['bytes_downloaded'])} in {format_duration(transfer['elapsed_s'])} "
+          f"({format_file_size(transfer['avg_bytes_per_s'])}/s, {transfer['retries']} retries)")
 
     if failed:
         print(f"\nFailed downloads:")
@@ -543,10 +738,14 @@ def cmd_download(args):
     metadata_path = output_dir / "download_metadata.json"
     metadata = {
         'geo_id': geo_id,
-        'sra_studies': sorted(sra_studies),
-        'n_runs': len(fastq_urls),
+        'sra_studies': sra_studies,
+        'n_runs': len(fastq_files),
         'n_files': total_files,
         'output_dir': str(output_dir.absolute()),
+        'fastq_store': str(store.root) if store else None,
+        'transfer': {k: transfer[k] for k in ('elapsed_s', 'bytes_downloaded', 'avg_bytes_per_s',
+                                              'retries', 'hosts')},
+        'validation': read_counts,
     }
     with open(metadata_path, 'w') as f:
         json.dump(metadata, f, indent=2)
@@ -554,6 +753,40 @@ def cmd_download(args):
     return 0
 
 
+def cmd_gc(args):
+    """Remove FASTQ store objects no output directory links to."""
+    if not args.store:
+        print("❌ No FASTQ store configured (use --store or NF_CORE_FASTQ_STORE)")
+        return 1
+
+    store = FastqStore(Path(args.store))
+    print(f"\nScanning FASTQ store {store.root}...")
+    stats = store.gc(dry_run=args.dry_run)
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"  ✓ Kept: {stats['kept']} files still linked")
+    print(f"  🗑 {action}: {stats['removed']} files ({format_file_size(stats['bytes_freed'])})")
+    return 0
+
+
+def cmd_cache(args):
+    """Show the metadata response cache, or empty it."""
+    cache = get_client().cache
+    if cache is None:
+        print("❌ The response cache is disabled (NF_CORE_HTTP_CACHE is 'off')")
+        return 1
+
+    if args.clear:
+        cache.clear()
+        print(f"🗑 Cleared the response cache {cache.path}")
+        return 0
+
+    stats = cache.stats()
+    print(f"\nResponse cache: {cache.path}")
+    print(f"  Entries: {stats['entries']:,}")
+    print(f"  Size:    {format_file_size(stats['bytes'])} of {format_file_size(cache.max_bytes)}")
+    return 0
+
+
 def cmd_samplesheet(args):
     """Generate samplesheet for nf-core pipeline."""
     geo_id = args.geo_id.upper()
@@ -563,13 +796,14 @@ def cmd_samplesheet(args):
     print(f"\nGenerating samplesheet for {geo_id}...")
 
     # Get run info
-    runs = fetch_sra_run_info(geo_id)
+    study = get_resolver(geo_id)
+    runs = study.runs()
     if not runs:
         print(f"❌ No runs found for {geo_id}")
         return 1
 
     # Get GEO metadata for sample naming
-    metadata = fetch_geo_metadata(geo_id)
+    metadata = study.geo_metadata()
     organism = metadata.get('organism', 'Unknown') if metadata else 'Unknown'
     genome = suggest_genome(organism)
 
@@ -673,8 +907,16 @@ Examples:
   %(prog)s download GSE110004 -o ./fastq --subset "RNA-Seq:PAIRED"
   %(prog)s samplesheet GSE110004 \\
       --fastq-dir ./fastq -o samplesheet.csv # Generate samplesheet
+  %(prog)s --offline groups GSE110004        # Use cached metadata only
+  %(prog)s download GSE110004 -o ./fastq --store ~/fastq-store  # Shared, deduplicated store
+  %(prog)s gc --store ~/fastq-store          # Drop store files no study links to
+  %(prog)s cache --clear                     # Empty the metadata response cache
         """
     )
+    parser.add_argument('--offline', action='store_true',
+                        help='Use cached metadata only, never the network (also NF_CORE_OFFLINE=1)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached metadata and re-fetch (responses are still cached)')
 
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
@@ -701,8 +943,35 @@ Examples:
     dl_parser.add_argument('--subset', '-s', help='Filter subset (e.g., RNA-Seq:PAIRED)')
     dl_parser.add_argument('--interactive', '-i', action='store_true',
                            help='Interactively select sample group to download')
-    dl_parser.add_argument('--parallel', '-p', type=int, default=4, help='Parallel downloads')
+    dl_parser.add_argument('--parallel', '-p', type=int, default=4,
+                           help='Max parallel downloads (tuned to throughput up to this)')
     dl_parser.add_argument('--timeout', '-t', type=int, default=600, help='Download timeout (sec)')
+    dl_parser.add_argument('--buffer-mb', type=float, default=DOWNLOAD_BUFFER_SIZE / (1024 * 1024),
+                           help='Download buffer size in MB (default: 1, or GEO_SRA_BUFFER_MB)')
+    dl_parser.add_argument('--per-host', type=int, default=4,
+                           help='Max concurrent connections per host (default: 4)')
+    dl_parser.add_argument('--segment-mb', type=float, default=1024,
+                           help='Split files of at least twice this size into parallel byte ranges '
+                                '(default: 1024, 0 disables)')
+    dl_parser.add_argument('--max-bandwidth', type=float,
+                           help='Total bandwidth cap in MB/s (default: unlimited)')
+    dl_parser.add_argument('--no-adaptive', action='store_true',
+                           help='Always use --parallel connections instead of tuning to throughput')
+    dl_parser.add_argument('--store', default=os.environ.get('NF_CORE_FASTQ_STORE'),
+                           help='Shared FASTQ store; runs are downloaded once and linked into --output '
+                                '(default: NF_CORE_FASTQ_STORE)')
+    dl_parser.add_argument('--link-mode', choices=LINK_MODES, default='auto',
+                           help='How store files are placed in --output (default: auto = reflink, '
+                                'then hardlink, then copy)')
+    dl_parser.add_argument('--validate', action='store_true',
+                           help='Check gzip integrity, FASTQ framing and read counts (vs SRA spots) '
+                                'while downloading')
+    dl_parser.add_argument('--progress-events', metavar='PATH',
+                           help='Append JSON-lines progress events (start/progress/retry/complete/summary)')
+    dl_parser.add_argument('--progress-summary', metavar='PATH',
+                           help='Progress summary JSON, rewritten every --progress-interval seconds')
+    dl_parser.add_argument('--progress-interval', type=float, default=5.0,
+                           help='Seconds between progress updates (default: 5)')
 
     # samplesheet command
     ss_parser = subparsers.add_parser('samplesheet', help='Generate samplesheet')
@@ -711,18 +980,38 @@ Examples:
     ss_parser.add_argument('--output', '-o', default='samplesheet.csv', help='Output samplesheet')
     ss_parser.add_argument('--pipeline', '-p', help='Target pipeline (auto-detected if not specified)')
 
+    # gc command
+    gc_parser = subparsers.add_parser('gc', help='Remove FASTQ store files no output directory uses')
+    gc_parser.add_argument('--store', default=os.environ.get('NF_CORE_FASTQ_STORE'),
+                           help='FASTQ store (default: NF_CORE_FASTQ_STORE)')
+    gc_parser.add_argument('--dry-run', action='store_true', help='Report what would be removed')
+
+    # cache command
+    cache_parser = subparsers.add_parser('cache', help='Show or clear the metadata response cache')
+    cache_parser.add_argument('--clear', action='store_true', help='Remove all cached responses')
+
     args = parser.parse_args()
 
     if not args.command:
         parser.print_help()
         return 1
 
+    cache = get_client().cache
+    if cache:
+        cache.offline = cache.offline or args.offline
+        cache.refresh = args.refresh
+    elif args.offline:
+        print("❌ --offline requires the response cache (NF_CORE_HTTP_CACHE is 'off')")
+        return 1
+
     commands = {
         'info': cmd_info,
         'groups': cmd_groups,
         'list': cmd_list,
         'download': cmd_download,
         'samplesheet': cmd_samplesheet,
+        'gc': cmd_gc,
+        'cache': cmd_cache,
     }
 
     return commands[args.command](args)
@@ -0,0 +1,62 @@
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# The scripts are run from this directory, not installed; import them the same way
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.http_client import HttpStream  # noqa: E402
+
+
+class FakeClient:
+    """
+    In-memory stand-in for HttpClient.stream() serving `files` by URL.
+
+    Honours Range headers. `faults` is consumed one entry per request:
+    'connect' raises before any byte is sent, 'short' ends the body halfway,
+    'drop' raises halfway through the body, None serves normally.
+    """
+
+    def __init__(self, files, chunk_size=16):
+        self.files = files
+        self.chunk_size = chunk_size
+        self.faults = []
+        self.requests = []
+
+    @contextmanager
+    def stream(self, url, timeout=None, chunk_size=65536, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers.get('Range')))
+        fault = self.faults.pop(0) if self.faults else None
+        if fault == 'connect':
+            raise ConnectionError("connection refused")
+        data = self.files[url]
+        status = 200
+        if 'Range' in headers:
+            start, _, end = headers['Range'][len('bytes='):].partition('-')
+            data = data[int(start):int(end) + 1 if end else None]
+            status = 206
+        if fault in ('short', 'drop'):
+            body = data[:len(data) // 2]
+        else:
+            body = data
+
+        def chunks():
+            for i in range(0, len(body), self.chunk_size):
+                yield body[i:i + self.chunk_size]
+            if fault == 'drop':
+                raise ConnectionError("connection reset")
+
+        yield HttpStream(status, {'content-length': str(len(data))}, chunks())
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """FakeClient installed for ncbi_utils and download_scheduler; add files to .files."""
+    from utils import download_scheduler, ncbi_utils
+    client = FakeClient({})
+    monkeypatch.setattr(ncbi_utils, 'get_client', lambda: client)
+    monkeypatch.setattr(download_scheduler, 'get_client', lambda: client)
+    return client
@@ -0,0 +1,67 @@
+"""Tests for download_file() resume and integrity checks."""
+
+import hashlib
+
+from utils.ncbi_utils import download_file
+
+URL = 'https://ftp.sra.ebi.ac.uk/vol1/fastq/SRR100/SRR100_1.fastq.gz'
+DATA = bytes(range(256)) * 4
+
+
+def _download(tmp_path, **kwargs):
+    kwargs.setdefault('expected_size', len(DATA))
+    kwargs.setdefault('expected_md5', hashlib.md5(DATA).hexdigest())
+    return download_file(URL, tmp_path / 'SRR100_1.fastq.gz', show_progress=False, **kwargs)
+
+
+def test_complete_download_is_renamed_into_place(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    assert _download(tmp_path)
+    assert (tmp_path / 'SRR100_1.fastq.gz').read_bytes() == DATA
+    assert not (tmp_path / 'SRR100_1.fastq.gz.part').exists()
+
+
+def test_failure_before_the_partial_file_exists_is_retried(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    fake_client.faults = ['connect', 'connect']
+    assert _download(tmp_path)
+    assert len(fake_client.requests) == 3
+
+
+def test_dropped_connection_resumes_from_the_partial_file(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    fake_client.faults = ['drop']
+    assert _download(tmp_path)
+    assert fake_client.requests[1] == (URL, f'bytes={len(DATA) // 2}-')
+    assert (tmp_path / 'SRR100_1.fastq.gz').read_bytes() == DATA
+
+
+def test_body_ending_early_is_resumed(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    fake_client.faults = ['short']
+    assert _download(tmp_path)
+    assert fake_client.requests[1][1] == f'bytes={len(DATA) // 2}-'
+
+
+def test_short_partial_is_kept_when_resumes_run_out(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    fake_client.faults = ['short'] * 3
+    assert not _download(tmp_path, max_resumes=2)
+    part = tmp_path / 'SRR100_1.fastq.gz.part'
+    assert 0 < part.stat().st_size < len(DATA)
+
+    assert _download(tmp_path)
+    assert (tmp_path / 'SRR100_1.fastq.gz').read_bytes() == DATA
+
+
+def test_md5_mismatch_discards_the_file(tmp_path, fake_client):
+    fake_client.files[URL] = DATA
+    assert not _download(tmp_path, expected_md5='0' * 32)
+    assert not (tmp_path / 'SRR100_1.fastq.gz').exists()
+    assert not (tmp_path / 'SRR100_1.fastq.gz.part').exists()
+
+
+def test_existing_complete_file_is_not_downloaded_again(tmp_path, fake_client):
+    (tmp_path / 'SRR100_1.fastq.gz').write_bytes(DATA)
+    assert _download(tmp_path)
+    assert fake_client.requests == []
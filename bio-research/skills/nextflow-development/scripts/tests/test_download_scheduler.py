@@ -0,0 +1,87 @@
+"""Tests for DownloadScheduler and segmented downloads."""
+
+import hashlib
+
+import pytest
+
+from utils import download_scheduler
+from utils.download_scheduler import DownloadScheduler, DownloadTask
+from utils.ncbi_utils import download_file
+
+BIG = 'https://ftp.sra.ebi.ac.uk/vol1/fastq/SRR1/SRR1_1.fastq.gz'
+SMALL = 'https://ftp.sra.ebi.ac.uk/vol1/fastq/SRR2/SRR2_1.fastq.gz'
+DATA = bytes(range(256)) * 4
+
+
+def _task(tmp_path, url=BIG, data=DATA):
+    return DownloadTask(url, tmp_path / url.rsplit('/', 1)[-1], len(data), hashlib.md5(data).hexdigest())
+
+
+def _scheduler(**kwargs):
+    kwargs.setdefault('segment_size', 256)
+    return DownloadScheduler(max_workers=2, adaptive=False, **kwargs)
+
+
+def test_large_files_are_fetched_in_segments(tmp_path, fake_client):
+    fake_client.files[BIG] = DATA
+    task = _task(tmp_path)
+    assert _scheduler().run([task]) == {task.path: True}
+    assert task.path.read_bytes() == DATA
+    assert sorted(r for _, r in fake_client.requests) == [
+        'bytes=0-255', 'bytes=256-511', 'bytes=512-767', 'bytes=768-1023']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['SRR1_1.fastq.gz']
+
+
+def test_small_files_are_fetched_whole(tmp_path, fake_client):
+    fake_client.files[SMALL] = DATA[:300]
+    task = _task(tmp_path, SMALL, DATA[:300])
+    assert _scheduler().run([task]) == {task.path: True}
+    assert fake_client.requests == [(SMALL, None)]
+
+
+def test_interrupted_segments_resume_where_they_stopped(tmp_path, fake_client):
+    fake_client.files[BIG] = DATA
+    fake_client.faults = ['drop']
+    task = _task(tmp_path)
+    assert _scheduler(max_resumes=0).run([task]) == {task.path: False}
+    assert (tmp_path / 'SRR1_1.fastq.gz.seg.part.json').exists()
+
+    fake_client.requests.clear()
+    assert _scheduler().run([task]) == {task.path: True}
+    assert task.path.read_bytes() == DATA
+    fetched = sum(int(end) + 1 - int(start)
+                  for start, end in (r[len('bytes='):].split('-') for _, r in fake_client.requests))
+    assert fetched < len(DATA)
+
+
+def test_sequential_download_does_not_resume_a_segmented_partial(tmp_path, fake_client):
+    fake_client.files[BIG] = DATA
+    fake_client.faults = ['drop']
+    task = _task(tmp_path)
+    _scheduler(max_resumes=0).run([task])
+    assert (tmp_path / 'SRR1_1.fastq.gz.seg.part').stat().st_size == len(DATA)
+
+    # Without an MD5 a full-size sparse partial would otherwise pass as complete
+    assert download_file(BIG, task.path, show_progress=False, expected_size=len(DATA))
+    assert task.path.read_bytes() == DATA
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['SRR1_1.fastq.gz']
+
+
+def test_segmented_setup_failure_fails_only_that_file(tmp_path, fake_client, monkeypatch):
+    fake_client.files[BIG] = DATA
+    fake_client.files[SMALL] = DATA[:300]
+
+    def no_space(self, task, segment_size):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(download_scheduler._SegmentedFile, '__init__', no_space)
+    big, small = _task(tmp_path), _task(tmp_path, SMALL, DATA[:300])
+    assert _scheduler().run([big, small]) == {big.path: False, small.path: True}
+
+
+@pytest.mark.parametrize('md5', [None, '0' * 32])
+def test_segmented_md5_is_checked(tmp_path, fake_client, md5):
+    fake_client.files[BIG] = DATA
+    task = DownloadTask(BIG, tmp_path / 'SRR1_1.fastq.gz', len(DATA), md5)
+    assert _scheduler().run([task]) == {task.path: md5 is None}
+    assert task.path.exists() == (md5 is None)
@@ -0,0 +1,81 @@
+"""Tests for the content-addressed FASTQ store shared between studies."""
+
+import hashlib
+import os
+
+from utils.fastq_store import FastqStore
+from utils.ncbi_utils import download_file
+
+URL = 'https://ftp.sra.ebi.ac.uk/vol1/fastq/SRR100/SRR100_1.fastq.gz'
+DATA = b'@r1\nACGT\n+\nFFFF\n' * 64
+MD5 = hashlib.md5(DATA).hexdigest()
+NAME = 'SRR100_1.fastq.gz'
+
+
+def test_each_output_directory_downloads_apart(tmp_path):
+    store = FastqStore(tmp_path / 'store')
+    first = store.incoming_path(MD5, NAME, tmp_path / 'GSE1')
+    second = store.incoming_path(MD5, NAME, tmp_path / 'GSE2')
+    assert first != second
+    assert first.name == second.name == NAME
+    # The same study resumes its own partial file on the next run
+    assert store.incoming_path(MD5, NAME, tmp_path / 'GSE1') == first
+
+
+def test_incoming_downloads_are_not_stored_files(tmp_path):
+    store = FastqStore(tmp_path / 'store')
+    incoming = store.incoming_path(MD5, NAME, tmp_path / 'GSE1')
+    incoming.parent.mkdir(parents=True)
+    incoming.write_bytes(DATA)
+    assert store.get(MD5) is None
+
+
+def test_concurrent_studies_do_not_share_a_partial_file(tmp_path, fake_client):
+    """Interleaved downloads of one MD5 for two studies both end up intact."""
+    fake_client.files[URL] = DATA
+    fake_client.faults = ['drop', 'drop']
+    store = FastqStore(tmp_path / 'store')
+    paths = [store.incoming_path(MD5, NAME, tmp_path / study) for study in ('GSE1', 'GSE2')]
+    # Both studies have half the file when they resume
+    for path in paths:
+        assert not download_file(URL, path, show_progress=False, expected_size=len(DATA),
+                                 expected_md5=MD5, max_resumes=0)
+        assert (path.parent / f"{NAME}.part").stat().st_size == len(DATA) // 2
+    for path in paths:
+        assert download_file(URL, path, show_progress=False, expected_size=len(DATA), expected_md5=MD5)
+
+    stored = store.commit(MD5, paths[0])
+    assert store.link(MD5, tmp_path / 'GSE1' / NAME, 'hardlink') == 'hardlink'
+    assert store.commit(MD5, paths[1]) == stored
+    assert stored.read_bytes() == DATA
+    # The first writer's file is kept, so its links still point at the stored file
+    assert os.path.samefile(stored, tmp_path / 'GSE1' / NAME)
+    assert not paths[0].parent.exists() and not paths[1].parent.exists()
+
+
+def test_gc_keeps_recent_incoming_downloads(tmp_path):
+    store = FastqStore(tmp_path / 'store')
+    incoming = store.incoming_path(MD5, NAME, tmp_path / 'GSE1')
+    incoming.parent.mkdir(parents=True)
+    (incoming.parent / f"{NAME}.part").write_bytes(DATA[:10])
+    assert store.gc() == {'kept': 0, 'removed': 0, 'bytes_freed': 0}
+
+    os.utime(incoming.parent / f"{NAME}.part", (0, 0))
+    assert store.gc() == {'kept': 0, 'removed': 1, 'bytes_freed': 10}
+    assert not store.object_path(MD5, NAME).parent.exists()
+
+
+def test_gc_removes_objects_no_study_links_to(tmp_path):
+    store = FastqStore(tmp_path / 'store')
+    incoming = store.incoming_path(MD5, NAME, tmp_path / 'GSE1')
+    incoming.parent.mkdir(parents=True)
+    incoming.write_bytes(DATA)
+    store.commit(MD5, incoming)
+    store.link(MD5, tmp_path / 'GSE1' / NAME, 'copy')
+    assert store.gc()['kept'] == 1
+
+    (tmp_path / 'GSE1' / NAME).unlink()
+    stats = store.gc()
+    assert (stats['kept'], stats['removed']) == (0, 1)
+    assert stats['bytes_freed'] >= len(DATA)
+    assert store.get(MD5) is None
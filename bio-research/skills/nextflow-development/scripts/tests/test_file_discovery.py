@@ -0,0 +1,69 @@
+"""Tests for the shared directory scan (ScanIndex) and pipeline detection input."""
+
+import os
+
+import pytest
+
+from utils.file_discovery import ScanIndex, discover_files
+
+detect_data_type = pytest.importorskip("detect_data_type")
+
+
+@pytest.fixture
+def symlink_farm(tmp_path):
+    """data/ with real files, a symlinked directory and two links to one file."""
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "b_R1.fastq.gz").write_bytes(b"b")
+    data = tmp_path / "data"
+    (data / "real").mkdir(parents=True)
+    (data / "real" / "a_R1.fastq.gz").write_bytes(b"a1")
+    (data / "real" / "a_R2.fastq.gz").write_bytes(b"a2")
+    (data / "linked").symlink_to(outside, target_is_directory=True)
+    (data / "farm").mkdir()
+    (data / "farm" / "c_R1.fastq.gz").symlink_to(outside / "b_R1.fastq.gz")
+    (data / "farm" / "d_R1.fastq.gz").symlink_to(outside / "b_R1.fastq.gz")
+    return data
+
+
+def _walk_counts(directory):
+    """What detect_data_type counted before the shared scan: a plain os.walk()."""
+    names = [name.lower() for _, _, files in os.walk(directory) for name in files]
+    dirs = [os.path.relpath(root, directory).lower() for root, _, _ in os.walk(directory)]
+    dirs.remove(".")
+    return len([n for n in names if n.endswith(".fastq.gz")]), sorted(names), sorted(dirs)
+
+
+def test_detection_sees_what_os_walk_sees(symlink_farm):
+    info = detect_data_type.scan_directory(str(symlink_farm))
+    fastq_count, names, dirs = _walk_counts(symlink_farm)
+    assert info["fastq_count"] == fastq_count == 4
+    assert sorted(info["filenames"]) == names
+    assert sorted(info["directories"]) == dirs
+
+
+def test_discovery_follows_directory_links_and_dedupes(symlink_farm):
+    found = discover_files(str(symlink_farm))
+    assert len(found) == 3
+    assert {os.path.realpath(f.path) for f in found} == {
+        os.path.realpath(symlink_farm / "real" / "a_R1.fastq.gz"),
+        os.path.realpath(symlink_farm / "real" / "a_R2.fastq.gz"),
+        os.path.realpath(symlink_farm.parent / "outside" / "b_R1.fastq.gz"),
+    }
+
+
+def test_one_manifest_serves_detection_and_generation(symlink_farm, tmp_path):
+    manifest = str(tmp_path / "scan.json")
+    index = ScanIndex.open(str(symlink_farm), manifest)
+    reloaded = ScanIndex.open(str(symlink_farm), manifest)
+    assert reloaded.listing == index.listing
+    assert len(reloaded.files("fastq")) == 3
+    assert detect_data_type.scan_directory(str(symlink_farm), reloaded)["fastq_count"] == 4
+
+
+def test_lookup_answers_from_the_scan(symlink_farm):
+    index = ScanIndex.scan(str(symlink_farm))
+    assert index.lookup(str(symlink_farm / "real" / "a_R1.fastq.gz")) == "file"
+    assert index.lookup(str(symlink_farm / "real")) == "dir"
+    assert index.lookup(str(symlink_farm / "real" / "missing.fastq.gz")) == "missing"
+    assert index.lookup("/elsewhere/x.fastq.gz") is None
@@ -0,0 +1,84 @@
+"""Tests for utils.response_cache."""
+
+import sqlite3
+
+from utils.response_cache import ResponseCache, cache_key, redact_url
+
+URL = ('https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi'
+       '?db=sra&id=1&api_key=SECRETKEY&tool=nf-core&email=me%40example.org')
+
+
+def _stored(path):
+    with sqlite3.connect(str(path)) as conn:
+        return [row for row in conn.execute("SELECT * FROM responses")]
+
+
+def test_redact_url_drops_ignored_params():
+    assert redact_url(URL) == 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=sra&id=1'
+
+
+def test_cache_key_ignores_api_key():
+    assert cache_key(URL) == cache_key(redact_url(URL))
+
+
+def test_api_key_never_reaches_the_database(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.put(URL, 200, {'content-type': 'application/json'}, b'{}')
+    assert cache.get(URL) == (200, {'content-type': 'application/json'}, b'{}')
+    cache.close()
+
+    assert 'SECRETKEY' not in repr(_stored(tmp_path / 'responses.db'))
+    assert b'SECRETKEY' not in (tmp_path / 'responses.db').read_bytes()
+
+
+def test_keys_stored_by_older_versions_are_redacted_on_open(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.put(URL, 200, {}, b'{}')
+    cache._conn.execute("UPDATE responses SET url = ?", (URL,))
+    cache.close()
+
+    ResponseCache(tmp_path / 'responses.db').close()
+    assert 'SECRETKEY' not in repr(_stored(tmp_path / 'responses.db'))
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db', ttls={'esummary': -1})
+    cache.put(URL, 200, {}, b'{}')
+    assert cache.get(URL) is None
+    assert cache.get(URL, allow_stale=True) == (200, {}, b'{}')
+
+
+def test_offline_mode_serves_expired_entries(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db', ttls={'esummary': -1}, offline=True)
+    cache.put(URL, 200, {}, b'{}')
+    assert cache.get(URL) == (200, {}, b'{}')
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db', max_bytes=250)
+    urls = [f'https://www.ebi.ac.uk/ena/portal/api/filereport?accession=PRJ{i}' for i in range(3)]
+    cache.put(urls[0], 200, {}, b'x' * 100)
+    cache.put(urls[1], 200, {}, b'x' * 100)
+    cache.get(urls[0])
+    cache.put(urls[2], 200, {}, b'x' * 100)
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[2]) is not None
+
+
+def test_running_total_tracks_replacements_and_clear(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.put(URL, 200, {}, b'x' * 10)
+    cache.put(URL, 200, {}, b'x' * 4)
+    assert cache.stats() == {'entries': 1, 'bytes': 4}
+    assert cache._total == 4
+    cache.clear()
+    assert cache.stats() == {'entries': 0, 'bytes': 0}
+    assert cache._total == 0
+
+
+def test_total_is_restored_on_open(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.put(URL, 200, {}, b'x' * 10)
+    cache.close()
+    assert ResponseCache(tmp_path / 'responses.db')._total == 10
@@ -0,0 +1,107 @@
+"""Tests for parsing SRA esummary pages (ExpXml/Runs fragments) into run records."""
+
+import pytest
+
+from utils.ncbi_utils import _parse_sra_summaries
+
+EXPXML = (
+    '<Summary><Title>GSM100: liver rep1; Homo sapiens; RNA-Seq</Title>'
+    '<Platform instrument_model="Illumina NovaSeq 6000">ILLUMINA</Platform>'
+    '<Statistics total_runs="2" total_spots="300" total_bases="60000" total_size="1234"/></Summary>'
+    '<Submitter acc="SRA1" center_name="GEO" contact_name="A &amp; B" lab_name=""/>'
+    '<Experiment acc="SRX100" ver="1" status="public" name="GSM100: liver rep1; Homo sapiens; RNA-Seq"/>'
+    '<Study acc="SRP100" name="Liver study"/>'
+    '<Organism taxid="9606" ScientificName="Homo sapiens"/>'
+    '<Sample acc="SRS100" name=""/>'
+    '<Instrument ILLUMINA="Illumina NovaSeq 6000"/>'
+    '<Library_descriptor><LIBRARY_NAME>liver_rep1</LIBRARY_NAME>'
+    '<LIBRARY_STRATEGY>RNA-Seq</LIBRARY_STRATEGY><LIBRARY_SOURCE>TRANSCRIPTOMIC</LIBRARY_SOURCE>'
+    '<LIBRARY_SELECTION>cDNA</LIBRARY_SELECTION>'
+    '<LIBRARY_LAYOUT> <PAIRED NOMINAL_LENGTH="300"/> </LIBRARY_LAYOUT>'
+    '</Library_descriptor><Bioproject>PRJNA100</Bioproject><Biosample>SAMN100</Biosample>'
+)
+RUNS = (
+    '<Run acc="SRR101" total_spots="100" total_bases="20000" load_done="true" is_public="true"/>'
+    '<Run is_public="true" total_bases="40000" total_spots="200" acc="SRR102"/>'
+)
+
+
+def _page(*entries):
+    result = {'uids': []}
+    for i, (expxml, runs) in enumerate(entries):
+        uid = str(1000 + i)
+        result['uids'].append(uid)
+        result[uid] = {'uid': uid, 'expxml': expxml, 'runs': runs}
+    return {'result': result}
+
+
+def test_entry_fields_and_every_run():
+    runs = _parse_sra_summaries(_page((EXPXML, RUNS)))
+    assert [r['srr'] for r in runs] == ['SRR101', 'SRR102']
+    assert runs[0] == {
+        'srr': 'SRR101',
+        'srx': 'SRX100',
+        'gsm': 'GSM100',
+        'sample_name': 'liver_rep1',
+        'library_name': 'liver_rep1',
+        'layout': 'PAIRED',
+        'library_strategy': 'RNA-Seq',
+        'library_source': 'TRANSCRIPTOMIC',
+        'library_selection': 'cDNA',
+        'platform': 'ILLUMINA',
+        'model': 'Illumina NovaSeq 6000',
+        'organism': 'Homo sapiens',
+        'bioproject': 'PRJNA100',
+        'biosample': 'SAMN100',
+        'sra_study': 'SRP100',
+        'spots': 100,
+        'bases': 20000,
+    }
+
+
+def test_run_attributes_are_read_by_name():
+    """SRR102's attributes come in a different order from SRR101's."""
+    runs = _parse_sra_summaries(_page((EXPXML, RUNS)))
+    assert (runs[1]['spots'], runs[1]['bases']) == (200, 40000)
+
+
+@pytest.mark.parametrize('replace, gsm', [
+    (('<Sample acc="SRS100" name=""/>', '<Sample acc="SRS100" name="GSM200"/>'), 'GSM200'),
+    (('<LIBRARY_NAME>liver_rep1</LIBRARY_NAME>', '<LIBRARY_NAME>GSM300</LIBRARY_NAME>'), 'GSM300'),
+    (('GSM100: ', ''), ''),
+])
+def test_gsm_comes_from_the_first_field_that_has_one(replace, gsm):
+    runs = _parse_sra_summaries(_page((EXPXML.replace(*replace), RUNS)))
+    assert runs[0]['gsm'] == gsm
+
+
+def test_single_end_and_missing_fields():
+    expxml = '<Experiment acc="SRX9" name=""/><Library_descriptor><LIBRARY_LAYOUT><SINGLE/></LIBRARY_LAYOUT></Library_descriptor>'
+    runs = _parse_sra_summaries(_page((expxml, '<Run acc="SRR9" total_spots="" total_bases="n/a"/>')))
+    assert runs[0]['layout'] == 'SINGLE'
+    assert runs[0]['library_strategy'] == runs[0]['library_source'] == 'UNKNOWN'
+    assert (runs[0]['spots'], runs[0]['bases']) == (0, 0)
+    assert runs[0]['model'] == runs[0]['organism'] == ''
+
+
+def test_layout_is_unknown_without_a_layout_element():
+    runs = _parse_sra_summaries(_page(('<Experiment acc="SRX9"/>', '<Run acc="SRR9"/>')))
+    assert runs[0]['layout'] == 'UNKNOWN'
+
+
+def test_escaped_text_is_unescaped():
+    expxml = EXPXML.replace('<LIBRARY_NAME>liver_rep1', '<LIBRARY_NAME>liver &amp; kidney')
+    assert _parse_sra_summaries(_page((expxml, RUNS)))[0]['library_name'] == 'liver & kidney'
+
+
+def test_malformed_entry_is_skipped_and_the_rest_kept():
+    page = _page((EXPXML.replace('</Summary>', ''), RUNS), (EXPXML.replace('SRX100', 'SRX200'), RUNS))
+    runs = _parse_sra_summaries(page)
+    assert {r['srx'] for r in runs} == {'SRX200'}
+    assert len(runs) == 2
+
+
+def test_runs_without_accession_and_empty_pages():
+    assert _parse_sra_summaries(_page((EXPXML, '<Run acc="" total_spots="1"/>'))) == []
+    assert _parse_sra_summaries({}) == []
+    assert _parse_sra_summaries({'result': {'uids': ['1']}}) == []
@@ -0,0 +1,74 @@
+"""Tests for StudyResolver memoization and concurrency."""
+
+import asyncio
+
+from utils import ncbi_utils
+from utils.ncbi_utils import StudyResolver
+
+FILES = {
+    'SRP1': {'SRR1': [{'url': 'u1', 'bytes': 1, 'md5': None, 'aspera': None}]},
+    'SRP2': {'SRR2': [{'url': 'u2', 'bytes': 2, 'md5': None, 'aspera': None}]},
+}
+
+
+def _resolver(monkeypatch):
+    monkeypatch.setattr(ncbi_utils, 'fetch_ena_fastq_files', lambda study: FILES[study])
+    resolver = StudyResolver('GSE1')
+    resolver._memo.update({
+        'sra_studies': ['SRP1', 'SRP2'],
+        'geo_metadata': {'geo_id': 'GSE1', 'pubmed_ids': []},
+        'bioproject': 'PRJNA1',
+        'runs_detailed': [{'srr': 'SRR1'}, {'srr': 'SRR2'}],
+    })
+    return resolver
+
+
+def test_fastq_files_by_study(monkeypatch):
+    resolver = _resolver(monkeypatch)
+    assert resolver.fastq_files_by_study() == FILES
+    assert set(resolver.fastq_files()) == {'SRR1', 'SRR2'}
+
+
+def test_lookups_work_inside_a_running_event_loop(monkeypatch):
+    resolver = _resolver(monkeypatch)
+
+    async def main():
+        return resolver.fastq_files_by_study(), resolver.overview(), await resolver.overview_async()
+
+    files, overview, overview_async = asyncio.run(main())
+    assert files == FILES
+    assert overview == overview_async
+    assert overview['fastq_files'] == FILES
+    assert overview['bioproject'] == 'PRJNA1'
+    assert overview['publication'] is None
+
+
+def _paged_resolver(monkeypatch, n_runs=10, chunk_size=3):
+    """Resolver whose efetch history chunks complete in reverse order."""
+    resolver = StudyResolver('GSE1', chunk_size=chunk_size)
+    resolver._memo['sra_search'] = {'term': 'GSE1[GEO]', 'count': n_runs, 'webenv': 'W', 'query_key': '1'}
+    starts = list(range(0, n_runs, chunk_size))
+
+    def iter_history(endpoint, params, parse, retmode='json'):
+        for start in reversed(starts):
+            yield start, [{'srr': f'SRR{i}'} for i in range(start, min(start + chunk_size, n_runs))]
+
+    monkeypatch.setattr(resolver, '_iter_history', iter_history)
+    return resolver
+
+
+def test_runs_stream_chunk_by_chunk(monkeypatch):
+    resolver = _paged_resolver(monkeypatch)
+    stream = resolver.iter_runs_detailed()
+    assert next(stream) == [{'srr': 'SRR9'}]
+    assert 'runs_detailed' not in resolver._memo
+
+    rest = list(stream)
+    assert len(rest) == 3
+    assert [r['srr'] for r in resolver.runs_detailed()] == [f'SRR{i}' for i in range(10)]
+
+
+def test_runs_detailed_are_in_search_order(monkeypatch):
+    resolver = _paged_resolver(monkeypatch)
+    assert [r['srr'] for r in resolver.runs()] == [f'SRR{i}' for i in range(10)]
+    assert list(resolver.iter_runs_detailed()) == [resolver.runs_detailed()]
@@ -3,6 +3,13 @@ Utility modules for nf-core pipeline deployment.
 
 Modules:
     ncbi_utils: NCBI/GEO/SRA data fetching and download utilities
+    http_client: Pooled keep-alive HTTP client shared by the NCBI/ENA fetchers
+    rate_limit: Token-bucket NCBI rate limiter (NCBI_API_KEY aware)
+    response_cache: Persistent on-disk cache for metadata responses
+    download_scheduler: Bandwidth-aware parallel FASTQ download scheduler
+    download_progress: JSON-lines/summary-file download progress and metrics
+    fastq_store: Content-addressed FASTQ store shared across studies
+    fastq_validator: Inline gzip/FASTQ validation of downloads
     file_discovery: Find FASTQ, BAM, and CRAM files
     sample_inference: Extract sample info, detect tumor/normal
     validators: Validate samplesheets before writing
@@ -11,13 +18,24 @@ Modules:
 # NCBI utilities for GEO/SRA data acquisition
 from .ncbi_utils import (
     check_network_access,
+    check_network_access_async,
+    StudyResolver,
+    get_resolver,
     fetch_geo_metadata,
     fetch_sra_study_accession,
     fetch_sra_run_info,
     fetch_sra_run_info_detailed,
     fetch_bioproject_from_geo,
     fetch_ena_fastq_urls,
+    fetch_ena_fastq_files,
+    iter_ena_fastq_files,
+    fetch_geo_metadata_async,
+    fetch_sra_run_info_detailed_async,
+    fetch_bioproject_from_geo_async,
+    fetch_ena_fastq_files_async,
+    fetch_pubmed_metadata_async,
     download_file,
+    is_download_complete,
     fetch_pubmed_metadata,
     format_file_size,
     estimate_download_size,
@@ -25,8 +43,17 @@ from .ncbi_utils import (
     format_sample_groups_table,
 )
 
+# Shared HTTP client
+from .http_client import HttpClient, HttpError, get_client
+from .rate_limit import TokenBucket, ncbi_rate_limiter
+from .response_cache import ResponseCache, CacheMissError
+from .download_scheduler import DownloadScheduler, DownloadTask
+from .download_progress import DownloadProgress
+from .fastq_store import FastqStore
+from .fastq_validator import FastqValidator
+
 # File discovery utilities
-from .file_discovery import discover_files, FileInfo, count_files_by_type
+from .file_discovery import discover_files, discover_all_files, FileInfo, ScanIndex, count_files_by_type
 
 # Sample inference utilities
 from .sample_inference import (
@@ -42,21 +69,53 @@ from .validators import validate_samplesheet, ValidationResult
 __all__ = [
     # ncbi_utils
     'check_network_access',
+    'check_network_access_async',
+    'StudyResolver',
+    'get_resolver',
     'fetch_geo_metadata',
     'fetch_sra_study_accession',
     'fetch_sra_run_info',
     'fetch_sra_run_info_detailed',
     'fetch_bioproject_from_geo',
     'fetch_ena_fastq_urls',
+    'fetch_ena_fastq_files',
+    'iter_ena_fastq_files',
+    'fetch_geo_metadata_async',
+    'fetch_sra_run_info_detailed_async',
+    'fetch_bioproject_from_geo_async',
+    'fetch_ena_fastq_files_async',
+    'fetch_pubmed_metadata_async',
     'download_file',
+    'is_download_complete',
     'fetch_pubmed_metadata',
     'format_file_size',
     'estimate_download_size',
     'group_samples_by_type',
     'format_sample_groups_table',
+    # http_client
+    'HttpClient',
+    'HttpError',
+    'get_client',
+    # rate_limit
+    'TokenBucket',
+    'ncbi_rate_limiter',
+    # response_cache
+    'ResponseCache',
+    'CacheMissError',
+    # download_scheduler
+    'DownloadScheduler',
+    'DownloadTask',
+    # download_progress
+    'DownloadProgress',
+    # fastq_store
+    'FastqStore',
+    # fastq_validator
+    'FastqValidator',
     # file_discovery
     'discover_files',
+    'discover_all_files',
     'FileInfo',
+    'ScanIndex',
     'count_files_by_type',
     # sample_inference
     'extract_sample_info',
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Download Progress and Metrics
+=============================
+Structured progress for FASTQ downloads: throughput per file and overall,
+ETA, retries and failures.
+
+Progress is written as a JSON-lines event stream and/or a summary JSON file
+rewritten every `interval` seconds, for orchestration to tail or poll.
+Per-host totals show which mirror is faster from the current site.
+
+Event types (every event has 'event' and 'time'):
+    start     file, url, host, bytes_total, bytes_resumed
+    progress  file, bytes, bytes_total, bytes_per_s, eta_s, stalled
+    retry     file, bytes, error
+    complete  file, success, bytes, seconds, bytes_per_s
+    summary   overall counters, as in the summary file
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .ncbi_utils import format_file_size
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _FileProgress:
+    """Transfer state of one file."""
+    name: str
+    url: str
+    host: str
+    total: Optional[int]
+    resumed: int
+    started: float
+    last_chunk: float
+    bytes: int = 0          # downloaded in this run
+    interval_bytes: int = 0  # snapshot at the previous tick
+    rate: float = 0.0
+    retries: int = 0
+
+    @property
+    def done(self) -> int:
+        return self.resumed + self.bytes
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as e.g. '1h 02m', '3m 10s' or '45s'."""
+    if seconds is None:
+        return '?'
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class DownloadProgress:
+    """
+    Thread-safe progress tracker for a batch of downloads.
+
+    Call start(), chunk(), retry() and finish() from the download threads;
+    a background thread emits 'progress' and 'summary' events and rewrites
+    the summary file every `interval` seconds. Use as a context manager,
+    or call close() to write the final summary.
+
+    Args:
+        total_files: Number of files in the batch
+        total_bytes: Sum of the expected file sizes, if known (for ETA)
+        events_path: JSON-lines event stream (appended to)
+        summary_path: Summary JSON file (rewritten atomically)
+        interval: Seconds between progress/summary updates
+        stall_after: Seconds without data before an active file counts as stalled
+        console: Also print a one-line status every interval
+    """
+
+    def __init__(
+        self,
+        total_files: int,
+        total_bytes: Optional[int] = None,
+        events_path: Optional[Path] = None,
+        summary_path: Optional[Path] = None,
+        interval: float = 5.0,
+        stall_after: float = 60.0,
+        console: bool = False,
+    ):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.summary_path = Path(summary_path) if summary_path else None
+        self.interval = interval
+        self.stall_after = stall_after
+        self.console = console
+
+        self._lock = threading.Lock()
+        self._events = open(events_path, 'a') if events_path else None
+        self._active: Dict[str, _FileProgress] = {}
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._failed: List[str] = []
+        self._completed = 0
+        self._completed_bytes = 0
+        self._bytes = 0
+        self._interval_bytes = 0
+        self._rate = 0.0
+        self._retries = 0
+        self._started = time.monotonic()
+        self._last_tick = self._started
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'DownloadProgress':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _emit(self, event: str, **fields):
+        if not self._events:
+            return
+        line = json.dumps({'event': event, 'time': round(time.time(), 3), **fields})
+        with self._lock:
+            self._events.write(line + '\n')
+            self._events.flush()
+
+    def start(self, path: Path, url: str, size: Optional[int] = None, resumed: int = 0):
+        """Record that a file transfer began, resuming from `resumed` bytes."""
+        now = time.monotonic()
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._active[str(path)] = _FileProgress(path.name, url, host, size, resumed, now, now)
+        self._emit('start', file=path.name, url=url, host=host, bytes_total=size, bytes_resumed=resumed)
+
+    def chunk(self, path: Path, n: int):
+        """Record n bytes written for a file."""
+        with self._lock:
+            state = self._active.get(str(path))
+            if state:
+                state.bytes += n
+                state.last_chunk = time.monotonic()
+            self._bytes += n
+
+    def retry(self, path: Path, error: Exception, offset: Optional[int] = None):
+        """
+        Record a retry after a dropped connection.
+
+        Args:
+            path: File being downloaded
+            error: The error that interrupted the transfer
+            offset: File size the transfer resumes from, if it restarts there
+        """
+        with self._lock:
+            self._retries += 1
+            state = self._active.get(str(path))
+            if not state:
+                return
+            state.retries += 1
+            if offset is not None:
+                state.bytes = max(0, offset - state.resumed)
+            done = state.done
+        self._emit('retry', file=path.name, bytes=done, error=str(error))
+
+    def finish(self, path: Path, success: bool):
+        """Record that a file completed or failed."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._active.pop(str(path), None)
+            if success:
+                self._completed += 1
+            else:
+                self._failed.append(path.name)
+            if state is None:
+                seconds = None
+            else:
+                seconds = now - state.started
+                if success:
+                    self._completed_bytes += state.done
+                host = self._hosts.setdefault(state.host, {'files': 0, 'bytes': 0, 'seconds': 0.0})
+                host['files'] += 1
+                host['bytes'] += state.bytes
+                host['seconds'] += seconds
+        self._emit('complete', file=path.name, success=success,
+                   bytes=state.done if state else None,
+                   seconds=round(seconds, 3) if seconds is not None else None,
+                   bytes_per_s=round(state.bytes / seconds) if seconds else None)
+
+    def _eta(self, remaining: Optional[int], rate: float) -> Optional[float]:
+        if remaining is None or rate <= 0:
+            return None
+        return round(max(0, remaining) / rate, 1)
+
+    def summary(self) -> Dict:
+        """Current overall counters, per-host throughput and active files."""
+        now = time.monotonic()
+        with self._lock:
+            active = []
+            for state in self._active.values():
+                remaining = state.total - state.done if state.total is not None else None
+                active.append({
+                    'file': state.name,
+                    'host': state.host,
+                    'bytes': state.done,
+                    'bytes_total': state.total,
+                    'bytes_per_s': round(state.rate),
+                    'eta_s': self._eta(remaining, state.rate),
+                    'retries': state.retries,
+                    'stalled': now - state.last_chunk > self.stall_after,
+                })
+            done_bytes = self._completed_bytes + sum(s.done for s in self._active.values())
+            remaining = self.total_bytes - done_bytes if self.total_bytes is not None else None
+            elapsed = now - self._started
+            return {
+                'elapsed_s': round(elapsed, 1),
+                'files_total': self.total_files,
+                'files_done': self._completed,
+                'files_failed': len(self._failed),
+                'files_active': len(active),
+                'bytes_total': self.total_bytes,
+                'bytes_done': done_bytes,
+                'bytes_downloaded': self._bytes,
+                'bytes_per_s': round(self._rate),
+                'avg_bytes_per_s': round(self._bytes / elapsed) if elapsed else 0,
+                'eta_s': self._eta(remaining, self._rate),
+                'retries': self._retries,
+                'failed': list(self._failed),
+                'stalled': [f['file'] for f in active if f['stalled']],
+                'active': active,
+                'hosts': {
+                    host: {**stats, 'seconds': round(stats['seconds'], 1),
+                           'bytes_per_s': round(stats['bytes'] / stats['seconds']) if stats['seconds'] else None}
+                    for host, stats in self._hosts.items()
+                },
+            }
+
+    def _tick(self):
+        """Update interval rates and emit progress, summary and console output."""
+        now = time.monotonic()
+        with self._lock:
+            span = (now - self._last_tick) or self.interval
+            self._last_tick = now
+            self._rate = (self._bytes - self._interval_bytes) / span
+            self._interval_bytes = self._bytes
+            for state in self._active.values():
+                state.rate = (state.bytes - state.interval_bytes) / span
+                state.interval_bytes = state.bytes
+
+        summary = self.summary()
+        for f in summary['active']:
+            self._emit('progress', **{k: f[k] for k in ('file', 'bytes', 'bytes_total', 'bytes_per_s',
+                                                        'eta_s', 'stalled')})
+        self._emit('summary', **summary)
+        self._write_summary(summary)
+        if self.console and summary['files_active']:
+            stalled = f", {len(summary['stalled'])} stalled" if summary['stalled'] else ''
+            print(f"  … {summary['files_done']}/{self.total_files} files, "
+                  f"{format_file_size(summary['bytes_per_s'])}/s, "
+                  f"ETA {format_duration(summary['eta_s'])}{stalled}", flush=True)
+
+    def _write_summary(self, summary: Dict):
+        if not self.summary_path:
+            return
+        try:
+            tmp = self.summary_path.with_name(self.summary_path.name + '.tmp')
+            tmp.write_text(json.dumps(summary, indent=2))
+            os.replace(tmp, self.summary_path)
+        except OSError as e:
+            logger.warning(f"Could not write progress summary {self.summary_path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._tick()
+
+    def close(self) -> Dict:
+        """Stop the background updates and write the final summary."""
+        if self._stop.is_set():
+            return self.summary()
+        self._stop.set()
+        self._thread.join()
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            self._rate = self._bytes / elapsed if elapsed else 0.0
+        summary = self.summary()
+        self._emit('summary', **summary, final=True)
+        self._write_summary(summary)
+        if self._events:
+            with self._lock:
+                self._events.close()
+                self._events = None
+        return summary
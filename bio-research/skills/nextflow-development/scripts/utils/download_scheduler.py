@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Parallel Download Scheduler
+===========================
+Bandwidth-aware scheduler for FASTQ downloads.
+
+- Largest files start first, so big files don't become the long tail
+- Concurrent connections are capped per host
+- Very large files are split into byte-range segments downloaded in
+  parallel into '<name>.seg.part', with progress kept in
+  '<name>.seg.part.json' so segments resume. The distinct name keeps a
+  sequential download from reading the preallocated file as complete
+- Concurrency adapts to measured throughput (hill climbing between 1 and
+  max_workers)
+- An optional global bandwidth cap is shared by all transfers
+- A task's validator sees the bytes as they arrive; segmented files are
+  validated during the MD5 pass over the assembled file instead
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .download_progress import DownloadProgress
+from .fastq_validator import FastqValidator
+from .http_client import get_client
+from .ncbi_utils import DOWNLOAD_BUFFER_SIZE, _part_path, _segments_path, download_file
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_SIZE = 1024 * 1024 * 1024  # 1 GB
+STATE_SAVE_INTERVAL = 64 * 1024 * 1024     # persist segment progress every 64 MB
+
+
+@dataclass
+class DownloadTask:
+    """A file to download, with the size/MD5 reported by ENA when known."""
+    url: str
+    path: Path
+    size: Optional[int] = None
+    md5: Optional[str] = None
+    validator: Optional[FastqValidator] = None
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+
+class _SegmentedFile:
+    """Byte-range segments of one file, with resumable progress on disk."""
+
+    def __init__(self, task: DownloadTask, segment_size: int):
+        self.task = task
+        self.part_path = _segments_path(task.path)
+        self.state_path = self.part_path.with_name(self.part_path.name + '.json')
+        self.lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.failed = False
+        self.started = False
+
+        state = self._load()
+        if state:
+            self.segments = state['segments']
+        else:
+            self.segments = [
+                [start, min(start + segment_size, task.size) - 1, 0]
+                for start in range(0, task.size, segment_size)
+            ]
+            self.task.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.part_path, 'wb') as f:
+                f.truncate(task.size)
+            self.save()
+        self.remaining = sum(1 for s in self.segments if not self.is_done(s))
+
+    def _load(self) -> Optional[Dict]:
+        """Saved progress, if it matches this file and the partial file is intact."""
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get('size') == self.task.size and self.part_path.stat().st_size == self.task.size:
+                return state
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def is_done(segment: List[int]) -> bool:
+        start, end, done = segment
+        return start + done > end
+
+    def save(self):
+        """Write progress atomically (segment workers share one temporary file, so one at a time)."""
+        with self._save_lock:
+            with self.lock:
+                data = json.dumps({'size': self.task.size, 'segments': self.segments})
+            tmp = self.state_path.with_name(self.state_path.name + '.tmp')
+            tmp.write_text(data)
+            os.replace(tmp, self.state_path)
+
+    def finalize(self, buffer_size: int) -> bool:
+        """Verify the assembled file against the expected MD5 (and validator) and rename it into place."""
+        validator = self.task.validator
+        if self.task.md5 or validator:
+            digest = hashlib.md5() if self.task.md5 else None
+            with open(self.part_path, 'rb') as f:
+                for block in iter(lambda: f.read(buffer_size), b''):
+                    if digest:
+                        digest.update(block)
+                    if validator:
+                        validator.update(block)
+            if digest and digest.hexdigest() != self.task.md5.lower():
+                logger.error(f"MD5 mismatch for {self.task.path.name}: {digest.hexdigest()} != {self.task.md5}")
+                self.discard()
+                return False
+        os.replace(self.part_path, self.task.path)
+        self.state_path.unlink(missing_ok=True)
+        _part_path(self.task.path).unlink(missing_ok=True)  # superseded contiguous partial
+        return True
+
+    def discard(self):
+        self.part_path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+
+
+class DownloadScheduler:
+    """
+    Run download tasks in parallel with per-host caps and adaptive concurrency.
+
+    Args:
+        max_workers: Upper bound on concurrent transfers
+        per_host: Maximum concurrent connections to one host
+        segment_size: Byte-range segment size; files of at least two
+                      segments are split (0 disables segmenting)
+        max_bandwidth: Global cap in bytes/second (None = unlimited)
+        adaptive: Tune concurrency to measured throughput; otherwise always
+                  run max_workers transfers
+        timeout: Per-connection timeout in seconds
+        buffer_size: Network read and file write buffer size in bytes
+        interval: Seconds between throughput measurements
+        max_resumes: Resume attempts per file or segment after a dropped connection
+        progress: Optional DownloadProgress receiving per-file transfer events
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        per_host: int = 4,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_bandwidth: Optional[float] = None,
+        adaptive: bool = True,
+        timeout: int = 600,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        interval: float = 5.0,
+        max_resumes: int = 3,
+        progress: Optional[DownloadProgress] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.segment_size = segment_size
+        self.adaptive = adaptive
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self.max_resumes = max_resumes
+        self.progress = progress
+        self._bandwidth = TokenBucket(max_bandwidth, capacity=max_bandwidth) if max_bandwidth else None
+
+        self._cond = threading.Condition()
+        self._pending: List = []
+        self._host_active: Dict[str, int] = {}
+        self._active = 0
+        self.concurrency = self.max_workers
+        self._bytes_lock = threading.Lock()
+        self.bytes_downloaded = 0
+
+    def _on_chunk(self, n: int):
+        """Account for downloaded bytes and apply the bandwidth cap."""
+        with self._bytes_lock:
+            self.bytes_downloaded += n
+        if self._bandwidth:
+            self._bandwidth.acquire(n)
+
+    def run(
+        self,
+        tasks: List[DownloadTask],
+        on_complete: Optional[Callable[[DownloadTask, bool], None]] = None,
+    ) -> Dict[Path, bool]:
+        """
+        Download all tasks and return success per output path.
+
+        Args:
+            tasks: Files to download
+            on_complete: Called from a worker thread as each file finishes
+        """
+        results: Dict[Path, bool] = {}
+        results_lock = threading.Lock()
+
+        def complete(task: DownloadTask, success: bool):
+            with results_lock:
+                results[task.path] = success
+            if self.progress:
+                self.progress.finish(task.path, success)
+            if on_complete:
+                on_complete(task, success)
+
+        # Largest first; unknown sizes last
+        for task in sorted(tasks, key=lambda t: (t.size is None, -(t.size or 0))):
+            if self._should_segment(task):
+                try:
+                    segmented = _SegmentedFile(task, self.segment_size)
+                except OSError as e:
+                    # e.g. no space to preallocate; the other files still run
+                    logger.error(f"Cannot start a segmented download of {task.path.name}: {e}")
+                    segments_path = _segments_path(task.path)
+                    segments_path.unlink(missing_ok=True)
+                    segments_path.with_name(segments_path.name + '.json').unlink(missing_ok=True)
+                    complete(task, False)
+                    continue
+                if not segmented.remaining:
+                    complete(task, segmented.finalize(self.buffer_size))
+                    continue
+                self._pending.extend(
+                    (task, segmented, i) for i, s in enumerate(segmented.segments) if not segmented.is_done(s)
+                )
+            else:
+                self._pending.append((task, None, None))
+
+        self.concurrency = (self.max_workers + 1) // 2 if self.adaptive else self.max_workers
+        finished = threading.Event()
+        workers = [
+            threading.Thread(target=self._worker, args=(complete,), daemon=True)
+            for _ in range(min(self.max_workers, len(self._pending)))
+        ]
+        monitor = threading.Thread(target=self._adapt, args=(finished,), daemon=True)
+        for worker in workers:
+            worker.start()
+        if self.adaptive:
+            monitor.start()
+        for worker in workers:
+            worker.join()
+        finished.set()
+        return results
+
+    def _should_segment(self, task: DownloadTask) -> bool:
+        if not self.segment_size or not task.size or task.size < 2 * self.segment_size:
+            return False
+        segments_path = _segments_path(task.path)
+        state_path = segments_path.with_name(segments_path.name + '.json')
+        # A contiguous partial from a single-stream download is resumed as such
+        return state_path.exists() or not _part_path(task.path).exists()
+
+    def _next_unit(self):
+        """Take the largest pending unit whose host has a free slot, or None when done."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    return None
+                if self._active < self.concurrency:
+                    for i, unit in enumerate(self._pending):
+                        host = unit[0].host
+                        if self._host_active.get(host, 0) < self.per_host:
+                            del self._pending[i]
+                            self._host_active[host] = self._host_active.get(host, 0) + 1
+                            self._active += 1
+                            return unit
+                self._cond.wait(1.0)
+
+    def _release(self, host: str):
+        with self._cond:
+            self._host_active[host] -= 1
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _worker(self, complete: Callable[[DownloadTask, bool], None]):
+        while True:
+            unit = self._next_unit()
+            if unit is None:
+                return
+            task, segmented, index = unit
+            try:
+                if segmented is None:
+                    on_chunk, on_retry = self._file_hooks(task)
+                    success = download_file(
+                        task.url, task.path, timeout=self.timeout, show_progress=False,
+                        expected_size=task.size, expected_md5=task.md5, buffer_size=self.buffer_size,
+                        max_resumes=self.max_resumes, on_chunk=on_chunk, on_retry=on_retry,
+                        validator=task.validator,
+                    )
+                    complete(task, success)
+                    continue
+
+                if self.progress:
+                    with segmented.lock:
+                        first = not segmented.started
+                        segmented.started = True
+                        resumed = sum(s[2] for s in segmented.segments)
+                    if first:
+                        self.progress.start(task.path, task.url, task.size, resumed)
+
+                ok = not segmented.failed and self._download_segment(segmented, index)
+                with segmented.lock:
+                    segmented.failed = segmented.failed or not ok
+                    segmented.remaining -= 1
+                    last = segmented.remaining == 0
+                if last:
+                    complete(task, not segmented.failed and segmented.finalize(self.buffer_size))
+            finally:
+                self._release(task.host)
+
+    def _file_hooks(self, task: DownloadTask):
+        """on_chunk/on_retry callbacks for a whole-file download of task."""
+        if not self.progress:
+            return self._on_chunk, None
+        part_path = _part_path(task.path)
+        resumed = part_path.stat().st_size if part_path.exists() else 0
+        self.progress.start(task.path, task.url, task.size, resumed)
+
+        def on_chunk(n: int):
+            self._on_chunk(n)
+            self.progress.chunk(task.path, n)
+
+        def on_retry(offset: int, error: Exception):
+            self.progress.retry(task.path, error, offset)
+
+        return on_chunk, on_retry
+
+    def _download_segment(self, segmented: _SegmentedFile, index: int) -> bool:
+        """Fetch one byte range into its place in the partial file, resuming on errors."""
+        task = segmented.task
+        segment = segmented.segments[index]
+        start, end = segment[0], segment[1]
+
+        for attempt in range(self.max_resumes + 1):
+            if segmented.is_done(segment):
+                return True
+            try:
+                headers = {'Range': f'bytes={start + segment[2]}-{end}'}
+                with get_client().stream(task.url, timeout=self.timeout, chunk_size=self.buffer_size,
+                                         headers=headers) as response:
+                    if response.status != 206:
+                        logger.error(f"{task.host} ignored a byte-range request for {task.path.name}; "
+                                     f"disable segmenting to download it")
+                        return False
+                    with open(segmented.part_path, 'r+b') as f:
+                        f.seek(start + segment[2])
+                        unsaved = 0
+                        for chunk in response:
+                            chunk = chunk[:end + 1 - start - segment[2]]
+                            f.write(chunk)
+                            with segmented.lock:
+                                segment[2] += len(chunk)
+                            self._on_chunk(len(chunk))
+                            if self.progress:
+                                self.progress.chunk(task.path, len(chunk))
+                            unsaved += len(chunk)
+                            if unsaved >= STATE_SAVE_INTERVAL:
+                                f.flush()
+                                segmented.save()
+                                unsaved = 0
+                            if segmented.is_done(segment):
+                                break
+                segmented.save()
+            except Exception as e:
+                segmented.save()
+                if attempt == self.max_resumes:
+                    logger.error(f"Segment {index} of {task.path.name} failed: {e}")
+                    return False
+                logger.warning(f"Segment {index} of {task.path.name} interrupted, resuming: {e}")
+                if self.progress:
+                    self.progress.retry(task.path, e)
+        return segmented.is_done(segment)
+
+    def _adapt(self, finished: threading.Event):
+        """
+        Hill-climb concurrency on measured throughput.
+
+        Each interval, keep moving concurrency in the same direction while
+        throughput improves and reverse when it drops by more than 5%.
+        """
+        direction = 1
+        previous_rate = None
+        last_bytes = self.bytes_downloaded
+        while not finished.wait(self.interval):
+            with self._bytes_lock:
+                rate = (self.bytes_downloaded - last_bytes) / self.interval
+                last_bytes = self.bytes_downloaded
+            if previous_rate is not None and rate < previous_rate * 0.95:
+                direction = -direction
+            previous_rate = rate
+            with self._cond:
+                self.concurrency = min(self.max_workers, max(1, self.concurrency + direction))
+                self._cond.notify_all()
+            logger.debug(f"Throughput {rate / 1e6:.1f} MB/s, concurrency -> {self.concurrency}")
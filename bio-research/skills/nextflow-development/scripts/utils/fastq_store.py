@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed FASTQ Store
+=============================
+Shared store of downloaded FASTQ files keyed by ENA MD5, so runs that
+appear in several GEO series (e.g., a SuperSeries and its SubSeries) are
+downloaded and stored once and linked into each study's output directory.
+
+Layout:
+    <root>/objects/<md5[:2]>/<md5>/<filename>   verified FASTQ
+    <root>/objects/<md5[:2]>/<md5>/.links       paths linked to it
+    <root>/objects/<md5[:2]>/<md5>/.info.json   e.g. inline validation result
+    <root>/objects/<md5[:2]>/<md5>/.incoming-<writer>/<filename>
+                                                download in progress
+
+Files are placed into output directories as reflinks (copy-on-write, on
+filesystems that support it), hardlinks, or copies. gc() removes objects
+no output directory links to any more.
+
+Studies fetched at the same time may need the same file. Each output
+directory downloads into its own incoming directory (so an interrupted
+download is resumed by the next run for that directory) and the verified
+file is moved into place with commit(); the first writer to finish wins.
+
+Configuration (environment):
+    NF_CORE_FASTQ_STORE: Store directory (unset = no store)
+"""
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LINK_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+PART_MAX_AGE = 24 * 3600  # unfinished downloads older than this are garbage
+
+_FICLONE = 0x40049409  # Linux ioctl: clone src into dst (btrfs, XFS, ...)
+_LINKS = '.links'
+_INFO = '.info.json'
+_INCOMING = '.incoming-'
+
+
+def _reflink(src: Path, dst: Path):
+    """Copy-on-write clone of src to dst; raises OSError where unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink(missing_ok=True)
+            raise
+
+
+class FastqStore:
+    """
+    Content-addressed FASTQ store keyed by MD5.
+
+    Only files verified against their MD5 belong in the store, so downloads
+    go to incoming_path() through download_file (which renames the file
+    into place only after the checksum matches), are moved into the store
+    with commit() and are then link()ed into the output directory.
+
+    Args:
+        root: Store directory (created if missing)
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root).expanduser()
+        self.objects = self.root / 'objects'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _dir(self, md5: str) -> Path:
+        md5 = md5.lower()
+        return self.objects / md5[:2] / md5
+
+    def object_path(self, md5: str, filename: str) -> Path:
+        """Where a file with this MD5 is (or will be) stored."""
+        return self._dir(md5) / filename
+
+    def incoming_path(self, md5: str, filename: str, writer: Path) -> Path:
+        """
+        Where writer (an output directory) downloads a file before commit().
+
+        Concurrent writers never share a partial file, and the same writer
+        resumes its own on the next run.
+        """
+        tag = hashlib.sha1(str(Path(writer).absolute()).encode()).hexdigest()[:12]
+        return self._dir(md5) / f"{_INCOMING}{tag}" / filename
+
+    def commit(self, md5: str, path: Path) -> Path:
+        """
+        Move a verified download from incoming_path() into the store.
+
+        If another writer stored the same MD5 first, its file is kept (links
+        to it stay valid) and this copy is discarded.
+
+        Returns:
+            The stored file
+        """
+        dest = self.object_path(md5, path.name)
+        try:
+            os.link(path, dest)
+        except FileExistsError:
+            pass
+        except OSError:
+            # No hardlinks on this filesystem; the content is identical either way
+            if not dest.exists():
+                os.replace(path, dest)
+        path.unlink(missing_ok=True)
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass  # other files of this writer are still downloading
+        return dest
+
+    def get(self, md5: str) -> Optional[Path]:
+        """Stored file for an MD5, or None."""
+        directory = self._dir(md5)
+        if not directory.is_dir():
+            return None
+        for entry in directory.iterdir():
+            if entry.name != _LINKS and not entry.name.startswith('.') and '.part' not in entry.name:
+                return entry
+        return None
+
+    def info(self, md5: str) -> Dict:
+        """Information saved with save_info() for an object ({} if none)."""
+        try:
+            return json.loads((self._dir(md5) / _INFO).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save_info(self, md5: str, info: Dict):
+        """Merge info into what is recorded for an object, so later studies reuse it."""
+        path = self._dir(md5) / _INFO
+        with self._lock:
+            data = {**self.info(md5), **info}
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            os.replace(tmp, path)
+
+    def link(self, md5: str, dest: Path, mode: str = 'auto') -> Optional[str]:
+        """
+        Place the stored file for md5 at dest.
+
+        Args:
+            md5: ENA MD5 of the file
+            dest: Path in the output directory (replaced if it exists)
+            mode: 'reflink', 'hardlink', 'copy', or 'auto' (first that works)
+
+        Returns:
+            The method used, or None if the MD5 is not in the store
+        """
+        src = self.get(md5)
+        if src is None:
+            return None
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.link")
+        tmp.unlink(missing_ok=True)
+
+        methods = ('reflink', 'hardlink', 'copy') if mode == 'auto' else (mode,)
+        for method in methods:
+            try:
+                if method == 'reflink':
+                    _reflink(src, tmp)
+                elif method == 'hardlink':
+                    os.link(src, tmp)
+                else:
+                    shutil.copyfile(src, tmp)
+                break
+            except OSError as e:
+                if method == methods[-1]:
+                    tmp.unlink(missing_ok=True)
+                    raise
+                logger.debug(f"{method} failed for {dest.name}: {e}")
+        os.replace(tmp, dest)
+
+        with self._lock, open(src.parent / _LINKS, 'a') as f:
+            f.write(f"{method}\t{dest.absolute()}\n")
+        return method
+
+    def _live_links(self, obj: Path) -> Dict[str, str]:
+        """Recorded links (path -> method) that still hold this object's content."""
+        live = {}
+        try:
+            lines = (obj.parent / _LINKS).read_text().splitlines()
+        except OSError:
+            return live
+        size = obj.stat().st_size
+        for line in lines:
+            method, _, path = line.partition('\t')
+            try:
+                if method == 'hardlink':
+                    alive = os.path.samefile(path, obj)
+                else:
+                    alive = os.path.getsize(path) == size
+            except OSError:
+                alive = False
+            if alive:
+                live[path] = method
+        return live
+
+    def gc(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Remove objects that no output directory links to.
+
+        An object is kept while any recorded link still exists (for
+        hardlinks, still pointing at the same inode). Unfinished downloads
+        are removed once older than PART_MAX_AGE.
+
+        Returns:
+            Dict with 'kept', 'removed' and 'bytes_freed'
+        """
+        stats = {'kept': 0, 'removed': 0, 'bytes_freed': 0}
+        now = time.time()
+        for directory in sorted(self.objects.glob('*/*')):
+            if not directory.is_dir():
+                continue
+            obj = self.get(directory.name)
+            if obj is not None:
+                live = self._live_links(obj)
+                if live:
+                    stats['kept'] += 1
+                    if not dry_run:
+                        with self._lock:
+                            (directory / _LINKS).write_text(
+                                ''.join(f"{method}\t{path}\n" for path, method in live.items()))
+                    continue
+            files = [p for p in directory.rglob('*') if p.is_file()]
+            if obj is None:
+                mtimes = [p.stat().st_mtime for p in files]
+                if mtimes and now - max(mtimes) < PART_MAX_AGE:
+                    continue  # download in progress
+
+            size = sum(p.stat().st_size for p in files)
+            stats['removed'] += 1
+            stats['bytes_freed'] += size
+            if not dry_run:
+                shutil.rmtree(directory, ignore_errors=True)
+                try:
+                    directory.parent.rmdir()
+                except OSError:
+                    pass  # other objects share the prefix directory
+        return stats
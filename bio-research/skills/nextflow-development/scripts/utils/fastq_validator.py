@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Inline FASTQ Validation
+=======================
+Checks a FASTQ(.gz) file while it is being downloaded, from the same
+chunks that are written to disk, so integrity checking needs no second
+read of the file.
+
+A worker thread decompresses the stream (multi-member gzip included),
+counts reads and checks four-line record framing: '@' header, '+'
+separator, and sequence and quality of equal length. A gzip stream that
+ends early is reported as truncated.
+"""
+
+import logging
+import queue
+import threading
+import zlib
+from itertools import repeat
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_RESET = object()
+_END = object()
+
+
+class FastqValidator:
+    """
+    Streaming FASTQ validator fed with raw (possibly gzipped) file chunks.
+
+    Feed chunks with update() in file order (same interface as a hashlib
+    digest); reset() restarts from byte 0. result() waits for the worker
+    to finish and returns the outcome. The worker thread starts on the
+    first chunk, so idle validators cost nothing.
+
+    Args:
+        name: File name, for messages
+        compressed: Input is gzip (default: name ends with '.gz')
+        queue_size: Chunks buffered ahead of the worker before update() blocks
+    """
+
+    def __init__(self, name: str, compressed: Optional[bool] = None, queue_size: int = 16):
+        self.name = name
+        self.compressed = name.endswith('.gz') if compressed is None else compressed
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._result: Optional[Dict] = None
+        self._start_state()
+
+    def _start_state(self):
+        self.reads = 0
+        self.fed = 0
+        self.error: Optional[str] = None
+        self._decompressor = zlib.decompressobj(wbits=31) if self.compressed else None
+        self._pending = b''
+        self._carry: List[bytes] = []
+
+    def update(self, chunk: bytes):
+        """Queue the next chunk of the file."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(chunk)
+
+    def reset(self):
+        """Discard everything fed so far (the download restarted from byte 0)."""
+        if self._thread is not None:
+            self._queue.put(_RESET)
+
+    def result(self) -> Dict:
+        """
+        Wait for validation to finish.
+
+        Returns:
+            Dict with 'reads', 'valid', 'error' (None when valid) and 'bytes' (input checked)
+        """
+        if self._result is None:
+            if self._thread is not None:
+                self._queue.put(_END)
+                self._thread.join()
+            self._finish()
+            self._result = {'reads': self.reads, 'valid': self.error is None, 'error': self.error,
+                            'bytes': self.fed}
+        return self._result
+
+    def _run(self):
+        # Always drain to _END: update() must never block on a dead worker
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            if item is _RESET:
+                self._start_state()
+            elif self.error is None:
+                try:
+                    self._feed(item)
+                except zlib.error as e:
+                    self.error = f"corrupt gzip data: {e}"
+                except Exception as e:
+                    logger.debug(f"Validation of {self.name} failed", exc_info=True)
+                    self.error = f"validation failed: {e}"
+
+    def _feed(self, chunk: bytes):
+        """Decompress a raw chunk, following concatenated gzip members."""
+        self.fed += len(chunk)
+        if self._decompressor is None:
+            self._lines(chunk)
+            return
+        while chunk:
+            self._lines(self._decompressor.decompress(chunk))
+            if not self._decompressor.eof:
+                return
+            chunk = self._decompressor.unused_data
+            if chunk:
+                self._decompressor = zlib.decompressobj(wbits=31)
+
+    def _lines(self, data: bytes):
+        """Check the complete records in data; keep partial lines and records for later."""
+        if not data:
+            return
+        lines = (self._pending + data).split(b'\n')
+        self._pending = lines.pop()
+        if self._carry:
+            lines = self._carry + lines
+        complete = len(lines) - len(lines) % 4
+        self._carry = lines[complete:]
+        self._check(lines[:complete])
+
+    def _check(self, records: List[bytes]):
+        """Check the framing of whole four-line records."""
+        if not records or self.error:
+            return
+        headers, seqs, plus, quals = records[0::4], records[1::4], records[2::4], records[3::4]
+        if not all(map(bytes.startswith, headers, repeat(b'@'))):
+            self.error = f"read {self.reads + self._first_bad(headers, b'@') + 1} has no '@' header"
+        elif not all(map(bytes.startswith, plus, repeat(b'+'))):
+            self.error = f"read {self.reads + self._first_bad(plus, b'+') + 1} has no '+' separator"
+        elif list(map(len, seqs)) != list(map(len, quals)):
+            bad = next(i for i, (s, q) in enumerate(zip(seqs, quals)) if len(s) != len(q))
+            self.error = f"read {self.reads + bad + 1} has sequence and quality of different lengths"
+        self.reads += len(headers)
+
+    @staticmethod
+    def _first_bad(lines: List[bytes], prefix: bytes) -> int:
+        return next(i for i, line in enumerate(lines) if not line.startswith(prefix))
+
+    def _finish(self):
+        """Check the end of the stream: complete gzip member and whole last record."""
+        if self.error:
+            return
+        if self._decompressor is not None and self.fed and not self._decompressor.eof:
+            self.error = "truncated gzip stream"
+            return
+        tail = self._carry + ([self._pending] if self._pending else [])
+        if len(tail) % 4:
+            self.error = f"truncated record after read {self.reads}"
+        else:
+            self._check(tail)
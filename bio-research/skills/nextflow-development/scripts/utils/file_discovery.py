@@ -3,12 +3,29 @@ File discovery utilities for FASTQ, BAM, and CRAM files.
 
 This module provides functions to recursively discover sequencing data files
 in a directory structure.
+
+The tree is listed once with os.scandir, using a thread pool across
+subdirectories (network filesystems serve concurrent listings much faster
+than sequential ones), and every file type is classified in that one pass.
+
+ScanIndex holds one such scan for a whole detect -> generate -> validate
+session; save() writes it as a manifest that the next script can load
+instead of scanning again.
+
+Configuration (environment):
+    NF_CORE_SCAN_CACHE: Directory for persistent scan caches (unset = no cache).
+        A directory whose mtime is unchanged is not listed again. Files
+        rewritten in place keep their cached size, so this suits finished
+        data directories.
 """
 
+import hashlib
+import json
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 
 @dataclass
@@ -38,6 +55,396 @@ INDEX_EXTENSIONS = {
     "cram": [".cram.crai", ".crai"],
 }
 
+# Concurrent directory listings
+SCAN_WORKERS = 8
+
+SCAN_CACHE_VERSION = 1
+
+
+def classify_file(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    Classify a file by extension.
+
+    Args:
+        filename: File name
+
+    Returns:
+        Tuple of (file_type, extension), or None for other files
+    """
+    lower = filename.lower()
+    for file_type, extensions in EXTENSIONS.items():
+        for ext in extensions:
+            if lower.endswith(ext):
+                return file_type, ext
+    return None
+
+
+def scan_cache_path(directory: str) -> Optional[str]:
+    """Scan cache file for directory under NF_CORE_SCAN_CACHE, or None if unset."""
+    cache_dir = os.environ.get("NF_CORE_SCAN_CACHE")
+    if not cache_dir:
+        return None
+    key = hashlib.sha256(os.path.abspath(directory).encode()).hexdigest()[:16]
+    return os.path.join(os.path.expanduser(cache_dir), f"{key}.json")
+
+
+def _load_scan_cache(cache_path: str, directory: str, follow_symlinks: bool) -> Dict[str, Dict]:
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (data.get("version") != SCAN_CACHE_VERSION or data.get("root") != directory
+            or data.get("follow_symlinks") != follow_symlinks):
+        return {}
+    return data.get("dirs", {})
+
+
+def _save_scan_cache(cache_path: str, directory: str, follow_symlinks: bool, listing: Dict[str, Dict]):
+    """Write a listing atomically (scan cache or ScanIndex manifest)."""
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "version": SCAN_CACHE_VERSION,
+            "root": directory,
+            "follow_symlinks": follow_symlinks,
+            "dirs": listing,
+        }, f)
+    os.replace(tmp, cache_path)
+
+
+def _list_directory(path: str, mtime_ns: int, follow_symlinks: bool) -> Dict:
+    """
+    List one directory, reusing each DirEntry's cached type and stat.
+
+    Returns:
+        Dict with 'mtime_ns', 'files' ([name, size or None if the link is
+        broken, symlink target or None]) and 'dirs' ([name, symlink target or None])
+    """
+    files = []
+    dirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                symlink = entry.is_symlink()
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    dirs.append([entry.name, os.path.realpath(entry.path) if symlink else None])
+                    continue
+                if symlink and entry.is_dir():
+                    continue  # Directory link, not followed
+            except OSError:
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = None  # Broken symlink
+            files.append([entry.name, size, os.path.realpath(entry.path) if symlink else None])
+    return {"mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+
+
+def scan_tree(
+    directory: str,
+    follow_symlinks: bool = True,
+    max_workers: int = SCAN_WORKERS,
+    cache_path: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    List every file and directory under directory in a single pass.
+
+    Subdirectories are listed concurrently. Symlinked directories that
+    point back into the tree, or to a directory already listed, are
+    skipped, so links cannot cause loops or duplicates.
+
+    Args:
+        directory: Root directory to scan
+        follow_symlinks: Whether to descend into symlinked directories
+        max_workers: Concurrent directory listings
+        cache_path: Persistent scan cache (default: from NF_CORE_SCAN_CACHE)
+
+    Returns:
+        Dict mapping each directory path to its listing: 'files'
+        ([name, size, symlink target]), 'dirs' ([name, symlink target]),
+        'mtime_ns' and 'real' (path with symlinks resolved)
+    """
+    directory = os.path.abspath(directory)
+    if not os.path.isdir(directory):
+        raise ValueError(f"Not a directory: {directory}")
+
+    cache_path = cache_path or scan_cache_path(directory)
+    cached = _load_scan_cache(cache_path, directory, follow_symlinks) if cache_path else {}
+    changed = False
+
+    def scan(path: str) -> Tuple[str, Dict]:
+        mtime_ns = os.stat(path).st_mtime_ns
+        entry = cached.get(path)
+        if entry and entry["mtime_ns"] == mtime_ns:
+            return path, entry
+        return path, _list_directory(path, mtime_ns, follow_symlinks)
+
+    real_root = os.path.realpath(directory)
+    reals = {directory: real_root}
+    visited = set()
+    listing = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        pending = {pool.submit(scan, directory)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    path, entry = future.result()
+                except OSError:
+                    continue  # Unreadable directory, skipped like os.walk does
+                changed = changed or entry is not cached.get(path)
+                listing[path] = entry
+                for name, target in entry["dirs"]:
+                    if target is not None:
+                        if (target == real_root or target.startswith(real_root + os.sep)
+                                or target in visited):
+                            continue
+                        visited.add(target)
+                    subdir = os.path.join(path, name)
+                    reals[subdir] = target or os.path.join(reals[path], name)
+                    pending.add(pool.submit(scan, subdir))
+
+    if cache_path and (changed or len(listing) != len(cached)):
+        try:
+            _save_scan_cache(cache_path, directory, follow_symlinks, listing)
+        except OSError:
+            pass  # The cache is an optimization only
+    return {path: {**entry, "real": reals[path]} for path, entry in listing.items()}
+
+
+def classify_tree(listing: Dict[str, Dict]) -> Dict[str, List[FileInfo]]:
+    """
+    Classify the files of a scan_tree() listing by type.
+
+    A file reachable through several paths (symlinks) is reported once,
+    preferring the real file over links to it.
+
+    Args:
+        listing: Result of scan_tree()
+
+    Returns:
+        Dict mapping each file type to FileInfo objects sorted by path
+    """
+    candidates = []
+    for dir_path, entry in listing.items():
+        for name, size, target in entry["files"]:
+            kind = classify_file(name)
+            if kind is None:
+                continue
+            real_path = target or os.path.join(entry["real"], name)
+            candidates.append((target is not None, os.path.join(dir_path, name), real_path, name, size, kind))
+
+    files = {file_type: [] for file_type in EXTENSIONS}
+    seen_paths = set()  # Avoid duplicates from symlinks
+    for _, full_path, real_path, name, size, (file_type, ext) in sorted(candidates):
+        if real_path in seen_paths:
+            continue
+        seen_paths.add(real_path)
+        files[file_type].append(FileInfo(
+            path=full_path,
+            name=name,
+            stem=name[:-len(ext)],
+            extension=ext,
+            size=size or 0,
+            file_type=file_type
+        ))
+
+    for found in files.values():
+        found.sort(key=lambda f: f.path)
+    return files
+
+
+def discover_all_files(
+    directory: str,
+    follow_symlinks: bool = True,
+    max_workers: int = SCAN_WORKERS,
+    cache_path: Optional[str] = None,
+) -> Dict[str, List[FileInfo]]:
+    """
+    Discover files of every supported type in one pass.
+
+    Args:
+        directory: Root directory to search
+        follow_symlinks: Whether to follow symbolic links
+        max_workers: Concurrent directory listings
+        cache_path: Persistent scan cache (default: from NF_CORE_SCAN_CACHE)
+
+    Returns:
+        Dict mapping file_type to FileInfo objects sorted by path
+    """
+    return classify_tree(scan_tree(directory, follow_symlinks, max_workers, cache_path))
+
+
+def _predominant_type(counts: Dict[str, int]) -> str:
+    """Preferred input type among those present: FASTQ > BAM > CRAM."""
+    for file_type in ["fastq", "bam", "cram"]:
+        if counts.get(file_type, 0) > 0:
+            return file_type
+    return "fastq"  # Default
+
+
+class ScanIndex:
+    """
+    One scan of a data directory, shared by pipeline detection, samplesheet
+    generation and samplesheet validation.
+
+    Build it with scan(), or with open() to reuse a manifest written by an
+    earlier step. A manifest is a snapshot: scan again after adding or
+    removing files.
+
+    Args:
+        directory: Scanned root directory
+        listing: Result of scan_tree()
+        follow_symlinks: Whether the scan followed symlinked directories
+    """
+
+    def __init__(self, directory: str, listing: Dict[str, Dict], follow_symlinks: bool = True):
+        self.directory = os.path.abspath(directory)
+        self.listing = listing
+        self.follow_symlinks = follow_symlinks
+        self._files: Optional[Dict[str, List[FileInfo]]] = None
+        self._names: Dict[str, Tuple[set, set]] = {}
+
+    @classmethod
+    def scan(
+        cls,
+        directory: str,
+        follow_symlinks: bool = True,
+        max_workers: int = SCAN_WORKERS,
+        cache_path: Optional[str] = None,
+    ) -> "ScanIndex":
+        """Scan directory (see scan_tree())."""
+        return cls(directory, scan_tree(directory, follow_symlinks, max_workers, cache_path), follow_symlinks)
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "ScanIndex":
+        """
+        Load a manifest written by save().
+
+        Raises:
+            ValueError: If the manifest is missing or unreadable
+        """
+        try:
+            with open(manifest_path) as f:
+                data = json.load(f)
+            if data.get("version") != SCAN_CACHE_VERSION:
+                raise ValueError("unsupported version")
+            return cls(data["root"], data["dirs"], data.get("follow_symlinks", True))
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Cannot read scan manifest {manifest_path}: {e}")
+
+    @classmethod
+    def open(cls, directory: str, manifest_path: Optional[str] = None) -> "ScanIndex":
+        """
+        Reuse the manifest for directory if there is one, otherwise scan it
+        (and write the manifest, when a path is given).
+        """
+        if manifest_path and os.path.exists(manifest_path):
+            try:
+                index = cls.load(manifest_path)
+                if index.directory == os.path.abspath(directory):
+                    return index
+            except ValueError:
+                pass
+        index = cls.scan(directory)
+        if manifest_path:
+            try:
+                index.save(manifest_path)
+            except OSError as e:
+                raise ValueError(f"Cannot write scan manifest {manifest_path}: {e}")
+        return index
+
+    def save(self, manifest_path: str):
+        """Write the scan as a manifest (also usable as a scan cache)."""
+        _save_scan_cache(manifest_path, self.directory, self.follow_symlinks, self.listing)
+
+    def files(self, file_type: Optional[str] = None) -> Union[List[FileInfo], Dict[str, List[FileInfo]]]:
+        """
+        Discovered files, classified once per index.
+
+        Args:
+            file_type: One of 'fastq', 'bam', 'cram', or None for all
+
+        Returns:
+            FileInfo objects sorted by path, or a dict of them by type
+        """
+        if self._files is None:
+            self._files = classify_tree(self.listing)
+        if file_type is None:
+            return self._files
+        if file_type not in EXTENSIONS:
+            raise ValueError(f"Unknown file type: {file_type}. Supported: {list(EXTENSIONS.keys())}")
+        return self._files[file_type]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of files per type."""
+        return {file_type: len(found) for file_type, found in self.files().items()}
+
+    def input_type(self) -> str:
+        """Predominant input type (FASTQ > BAM > CRAM)."""
+        return _predominant_type(self.counts())
+
+    def unfollowed(self) -> "ScanIndex":
+        """
+        The part of the scan os.walk() sees without followlinks: directories
+        reached through a symlinked directory are left out. Symlinked files
+        are kept.
+        """
+        linked = {os.path.join(path, name) for path, entry in self.listing.items()
+                  for name, target in entry["dirs"] if target is not None}
+
+        def through_link(path: str) -> bool:
+            while len(path) > len(self.directory):
+                if path in linked:
+                    return True
+                path = os.path.dirname(path)
+            return False
+
+        listing = {path: entry for path, entry in self.listing.items() if not through_link(path)}
+        return ScanIndex(self.directory, listing, follow_symlinks=False)
+
+    @property
+    def filenames(self) -> List[str]:
+        """Names of all files, of any type."""
+        return [name for entry in self.listing.values() for name, _, _ in entry["files"]]
+
+    @property
+    def directories(self) -> List[str]:
+        """Subdirectories, relative to the root."""
+        return [os.path.relpath(path, self.directory) for path in self.listing if path != self.directory]
+
+    @property
+    def total_size(self) -> int:
+        """Total size in bytes of all files."""
+        return sum(size or 0 for entry in self.listing.values() for _, size, _ in entry["files"])
+
+    def lookup(self, path: str) -> Optional[str]:
+        """
+        Look a path up in the scan without touching the filesystem.
+
+        Returns:
+            'file', 'dir' or 'missing' for paths in scanned directories,
+            None for paths outside the scan
+        """
+        path = os.path.abspath(path)
+        parent, name = os.path.split(path)
+        if path in self.listing:
+            return "dir"
+        if parent not in self.listing:
+            return None
+        if parent not in self._names:
+            entry = self.listing[parent]
+            self._names[parent] = ({n for n, size, _ in entry["files"] if size is not None},
+                                   {n for n, _ in entry["dirs"]})
+        files, dirs = self._names[parent]
+        if name in files:
+            return "file"
+        return "dir" if name in dirs else "missing"
+
 
 def discover_files(
     directory: str,
@@ -58,54 +465,7 @@ def discover_files(
     if file_type not in EXTENSIONS:
         raise ValueError(f"Unknown file type: {file_type}. Supported: {list(EXTENSIONS.keys())}")
 
-    directory = os.path.abspath(directory)
-    if not os.path.isdir(directory):
-        raise ValueError(f"Not a directory: {directory}")
-
-    extensions = EXTENSIONS[file_type]
-    files = []
-    seen_paths = set()  # Avoid duplicates from symlinks
-
-    for root, _, filenames in os.walk(directory, followlinks=follow_symlinks):
-        for filename in filenames:
-            # Check each extension
-            for ext in extensions:
-                if filename.lower().endswith(ext.lower()):
-                    full_path = os.path.join(root, filename)
-
-                    # Resolve to handle symlinks
-                    try:
-                        real_path = os.path.realpath(full_path)
-                    except OSError:
-                        real_path = full_path
-
-                    if real_path in seen_paths:
-                        continue
-                    seen_paths.add(real_path)
-
-                    try:
-                        size = os.path.getsize(full_path)
-                    except OSError:
-                        size = 0
-
-                    # Extract stem (remove extension)
-                    stem = filename
-                    for e in extensions:
-                        if stem.lower().endswith(e.lower()):
-                            stem = stem[:-len(e)]
-                            break
-
-                    files.append(FileInfo(
-                        path=full_path,
-                        name=filename,
-                        stem=stem,
-                        extension=ext,
-                        size=size,
-                        file_type=file_type
-                    ))
-                    break  # Found matching extension, no need to check others
-
-    return sorted(files, key=lambda f: f.path)
+    return discover_all_files(directory, follow_symlinks)[file_type]
 
 
 def count_files_by_type(directory: str) -> Dict[str, int]:
@@ -118,28 +478,30 @@ def count_files_by_type(directory: str) -> Dict[str, int]:
     Returns:
         Dict mapping file_type to count
     """
-    counts = {}
-    for file_type in EXTENSIONS:
-        try:
-            files = discover_files(directory, file_type)
-            counts[file_type] = len(files)
-        except (ValueError, PermissionError):
-            counts[file_type] = 0
-    return counts
+    try:
+        files = discover_all_files(directory)
+    except (ValueError, PermissionError):
+        return {file_type: 0 for file_type in EXTENSIONS}
+    return {file_type: len(found) for file_type, found in files.items()}
 
 
-def find_index_file(alignment_file: str) -> Optional[str]:
+def find_index_file(alignment_file: str, index: Optional[ScanIndex] = None) -> Optional[str]:
     """
     Find index file for a BAM or CRAM file.
 
     Args:
         alignment_file: Path to BAM or CRAM file
+        index: Scan of the data directory, checked instead of the filesystem
 
     Returns:
         Path to index file if found, None otherwise
     """
     path = Path(alignment_file)
 
+    def exists(candidate: Path) -> bool:
+        kind = index.lookup(str(candidate)) if index is not None else None
+        return candidate.exists() if kind is None else kind != "missing"
+
     # Determine file type
     if path.suffix.lower() == ".bam":
         index_exts = INDEX_EXTENSIONS["bam"]
@@ -156,12 +518,12 @@ def find_index_file(alignment_file: str) -> Optional[str]:
         else:
             candidate = path.with_suffix(ext)
 
-        if candidate.exists():
+        if exists(candidate):
             return str(candidate)
 
         # Also try: file.bam -> file.bam.bai
         candidate = Path(str(path) + "." + ext.lstrip("."))
-        if candidate.exists():
+        if exists(candidate):
             return str(candidate)
 
     return None
@@ -179,11 +541,4 @@ def detect_input_type(directory: str) -> str:
     Returns:
         Detected file type ('fastq', 'bam', or 'cram')
     """
-    counts = count_files_by_type(directory)
-
-    # Prioritize by preference
-    for file_type in ["fastq", "bam", "cram"]:
-        if counts.get(file_type, 0) > 0:
-            return file_type
-
-    return "fastq"  # Default
+    return _predominant_type(count_files_by_type(directory))
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client for NCBI/ENA Access
+======================================
+One pooled, keep-alive session per host, with timeouts, gzip, retries with
+exponential backoff, and JSON/TSV decoding. Every fetcher in ncbi_utils goes
+through get_client() instead of opening its own connection.
+
+Uses requests when installed; otherwise falls back to urllib (no keep-alive).
+Successful GETs are stored in the persistent ResponseCache (see
+response_cache.py) unless it is disabled.
+"""
+
+import codecs
+import csv
+import gzip
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.error import HTTPError as _UrllibHTTPError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+from .response_cache import CacheMissError, ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Try to import requests for connection pooling
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+    logger.debug("requests not installed - using urllib fallback")
+
+USER_AGENT = 'geo-sra-skill/1.0'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpError(Exception):
+    """Raised when a request fails with an HTTP error status."""
+
+    def __init__(self, url: str, status: int, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpResponse:
+    """Fully read response body with its status and headers."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpStream:
+    """Streaming response body for downloads."""
+
+    def __init__(self, status: int, headers: Dict[str, str], chunks: Iterator[bytes]):
+        self.status = status
+        self.headers = headers
+        self.total_size = int(headers.get('content-length', 0) or 0)
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks
+
+
+def _iter_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """Decode byte chunks into lines as they arrive (UTF-8 split across chunks is safe)."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by all NCBI/ENA fetchers.
+
+    Keeps one requests.Session per host so consecutive E-utilities and ENA
+    calls reuse the same TCP/TLS connection. Connection errors, timeouts and
+    RETRY_STATUSES are retried with exponential backoff; a 429 or a
+    Retry-After header waits as long as the server asks.
+
+    Args:
+        timeout: Default timeout in seconds
+        retries: Number of retries after the first attempt
+        backoff: Base backoff in seconds (doubled on each retry)
+        pool_size: Max pooled connections per host (match download parallelism)
+        cache: Optional ResponseCache for request() results
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.cache = cache
+        self._sessions: Dict[str, 'requests.Session'] = {}
+        self._lock = threading.Lock()
+
+    def _session(self, url: str) -> 'requests.Session':
+        """Return the pooled session for the URL's host, creating it once."""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+                    self._sessions[host] = session
+        return session
+
+    def _with_retries(self, url: str, send: Callable, retries: Optional[int], limiter):
+        """
+        Call send() until it succeeds or retries run out.
+
+        With a limiter (see rate_limit.TokenBucket), every attempt takes a
+        token, and a server-requested wait pauses the limiter so that all
+        threads sharing it back off, not just this one.
+        """
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if limiter:
+                limiter.acquire()
+            try:
+                return send()
+            except HttpError as e:
+                if e.status not in RETRY_STATUSES or attempt == retries:
+                    raise
+                error = e
+                server_delay = _retry_after(e.headers)
+            except Exception as e:
+                if isinstance(e, (ValueError, TypeError)) or attempt == retries:
+                    raise
+                error = e
+                server_delay = None
+            delay = self.backoff * (2 ** attempt)
+            if server_delay is not None or getattr(error, 'status', None) == 429:
+                delay = max(delay, server_delay or 0.0)
+                if limiter:
+                    limiter.pause(delay)
+                    delay = 0.0
+            logger.debug(f"Retrying {url} (attempt {attempt + 1}/{retries}): {error}")
+            if delay:
+                time.sleep(delay)
+
+    def request(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        limiter=None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        validate: Optional[Callable[[HttpResponse], None]] = None,
+    ) -> HttpResponse:
+        """
+        GET a URL and return the fully read response.
+
+        A fresh cached response is returned without touching the network or
+        the limiter. If the network fails, a stale cached copy is used.
+
+        Args:
+            url: Request URL
+            params: Optional query parameters (URL-encoded)
+            timeout: Timeout in seconds (default: client timeout)
+            retries: Override the client's retry count
+            limiter: Rate limiter taking a token before every attempt
+            use_cache: Read and write the response cache (if configured)
+            refresh: Skip the cache read but store the fresh response
+            validate: Called on fresh responses; raising keeps them out of the cache
+
+        Returns:
+            HttpResponse
+
+        Raises:
+            HttpError: On an HTTP error status after all retries
+            CacheMissError: In offline mode when the response is not cached
+        """
+        timeout = timeout or self.timeout
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, safe=',[]')}"
+
+        cache = self.cache
+        if not use_cache:
+            cache = None
+        if cache and not refresh:
+            hit = cache.get(url)
+            if hit:
+                return HttpResponse(url, *hit)
+            if cache.offline:
+                raise CacheMissError(f"Not cached (offline mode): {url}")
+
+        def send():
+            if HAS_REQUESTS:
+                response = self._session(url).get(url, timeout=timeout)
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                if response.status_code >= 400:
+                    raise HttpError(url, response.status_code, headers)
+                return HttpResponse(url, response.status_code, headers, response.content)
+
+            req = Request(url, headers={'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip'})
+            try:
+                with urlopen(req, timeout=timeout) as response:
+                    headers = {k.lower(): v for k, v in response.headers.items()}
+                    content = response.read()
+                    status = response.status
+            except _UrllibHTTPError as e:
+                raise HttpError(url, e.code, {k.lower(): v for k, v in e.headers.items()})
+            if headers.get('content-encoding') == 'gzip':
+                content = gzip.decompress(content)
+            return HttpResponse(url, status, headers, content)
+
+        try:
+            response = self._with_retries(url, send, retries, limiter)
+        except Exception as e:
+            stale = cache.get(url, allow_stale=True) if cache else None
+            if stale is None:
+                raise
+            logger.warning(f"Using stale cached response for {url}: {e}")
+            return HttpResponse(url, *stale)
+
+        if validate:
+            validate(response)
+        if cache and response.status == 200:
+            cache.put(url, response.status, response.headers, response.content)
+        return response
+
+    def iter_tsv(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Stream a tab-separated table with a header row, yielding rows as bytes arrive.
+
+        A cached body is replayed without touching the network; a fully read
+        body is stored in the cache. If the connection cannot be opened, a
+        stale cached copy is used. A failure after rows have been yielded is
+        raised to the caller.
+
+        Args:
+            url: Request URL
+            params: Optional query parameters (URL-encoded)
+            timeout: Timeout in seconds (default: client timeout)
+            chunk_size: Size of the network reads
+
+        Yields:
+            One dict per row, keyed by the header fields
+        """
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, safe=',[]')}"
+
+        cache = self.cache
+        hit = cache.get(url) if cache else None
+        if hit:
+            yield from csv.DictReader(_iter_lines(iter([hit[2]])), delimiter='\t')
+            return
+        if cache and cache.offline:
+            raise CacheMissError(f"Not cached (offline mode): {url}")
+
+        body: List[bytes] = []
+        stack = ExitStack()
+        try:
+            response = stack.enter_context(self.stream(url, timeout=timeout, chunk_size=chunk_size))
+        except Exception as e:
+            stale = cache.get(url, allow_stale=True) if cache else None
+            if stale is None:
+                raise
+            logger.warning(f"Using stale cached response for {url}: {e}")
+            yield from csv.DictReader(_iter_lines(iter([stale[2]])), delimiter='\t')
+            return
+
+        def chunks():
+            for chunk in response:
+                body.append(chunk)
+                yield chunk
+
+        with stack:
+            yield from csv.DictReader(_iter_lines(chunks()), delimiter='\t')
+        if cache and response.status == 200:
+            cache.put(url, response.status, response.headers, b''.join(body))
+
+    @contextmanager
+    def stream(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        chunk_size: int = 65536,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[HttpStream]:
+        """
+        Open a streaming GET for a download.
+
+        Connection setup is retried; a failure mid-body is left to the caller.
+        Bodies are requested without transfer compression, so byte offsets
+        match the file on the server (needed for Range resumes).
+
+        Args:
+            url: Download URL
+            timeout: Timeout in seconds (default: client timeout)
+            chunk_size: Size of the chunks yielded
+            headers: Extra request headers (e.g., Range)
+
+        Yields:
+            HttpStream with total_size and an iterator of body chunks
+        """
+        timeout = timeout or self.timeout
+        if self.cache and self.cache.offline:
+            raise CacheMissError(f"Downloads are disabled in offline mode: {url}")
+        headers = {'Accept-Encoding': 'identity', **(headers or {})}
+
+        if HAS_REQUESTS:
+            def send():
+                response = self._session(url).get(url, stream=True, timeout=timeout, headers=headers)
+                if response.status_code >= 400:
+                    response.close()
+                    raise HttpError(url, response.status_code, {k.lower(): v for k, v in response.headers.items()})
+                return response
+
+            response = self._with_retries(url, send, None, None)
+            try:
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                yield HttpStream(response.status_code, headers, response.iter_content(chunk_size=chunk_size))
+            finally:
+                response.close()
+            return
+
+        def send():
+            try:
+                return urlopen(Request(url, headers={'User-Agent': USER_AGENT, **headers}), timeout=timeout)
+            except _UrllibHTTPError as e:
+                raise HttpError(url, e.code, {k.lower(): v for k, v in e.headers.items()})
+
+        response = self._with_retries(url, send, None, None)
+        try:
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            yield HttpStream(response.status, headers, iter(lambda: response.read(chunk_size), b''))
+        finally:
+            response.close()
+
+    def close(self):
+        """Close all pooled sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide shared HttpClient (cache configured from the environment)."""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = HttpClient(cache=ResponseCache.from_env())
+    return _default_client
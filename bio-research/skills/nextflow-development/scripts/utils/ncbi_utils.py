@@ -3,17 +3,27 @@
 NCBI Utilities for GEO/SRA Data Access
 ======================================
 Shared utilities for fetching metadata and downloading data from NCBI services.
+
+Independent lookups run concurrently in thread pools sharing the pooled
+HTTP client and NCBI rate limiter. The *_async counterparts run the same
+synchronous fetchers in a worker thread, so they can be awaited from an
+event loop without blocking it.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+import os
 import re
-import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.parsers import expat
+
+from .http_client import HttpError, get_client
+from .rate_limit import ncbi_api_key, ncbi_rate_limiter
 
 # Set up logging
 logging.basicConfig(
@@ -22,33 +32,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# NCBI rate limiting - track last request time
-_last_ncbi_request_time = 0.0
-_NCBI_MIN_DELAY = 0.34  # 3 requests per second max without API key
+EUTILS_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+ENA_FILEREPORT_URL = "https://www.ebi.ac.uk/ena/portal/api/filereport"
+
+# History-server paging: records per esummary/efetch request and parallel requests
+NCBI_CHUNK_SIZE = int(os.environ.get('NCBI_CHUNK_SIZE', 500))
+NCBI_FETCH_WORKERS = int(os.environ.get('NCBI_FETCH_WORKERS', 3))
+
+# Download read/write buffer; override with GEO_SRA_BUFFER_MB
+DOWNLOAD_BUFFER_SIZE = int(float(os.environ.get('GEO_SRA_BUFFER_MB', 1)) * 1024 * 1024)
+
+
+class EutilsError(Exception):
+    """E-utilities answered 200 with an error body (e.g., an expired WebEnv)."""
 
 
-def _rate_limit_ncbi():
-    """Enforce NCBI rate limit of 3 requests/second."""
-    global _last_ncbi_request_time
-    current_time = time.time()
-    elapsed = current_time - _last_ncbi_request_time
-    if elapsed < _NCBI_MIN_DELAY:
-        time.sleep(_NCBI_MIN_DELAY - elapsed)
-    _last_ncbi_request_time = time.time()
+def _check_eutils(response):
+    """Reject error bodies before they reach the response cache."""
+    # Error bodies are short, so the marker is near the start if present
+    text = response.content[:1024].decode('utf-8', errors='replace')
+    if '"error"' in text or '"ERROR"' in text:
+        data = response.json()
+        error = data.get('error') or data.get('esearchresult', {}).get('ERROR')
+        if error:
+            raise EutilsError(f"{response.url}: {error}")
+    elif '<ERROR>' in text:
+        raise EutilsError(f"{response.url}: {text.split('<ERROR>', 1)[1].split('<', 1)[0]}")
 
 
-# Try to import requests for better HTTP handling
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-    logger.debug("requests not installed - using urllib fallback")
+def _eutils(
+    endpoint: str,
+    params: Dict,
+    timeout: int = 30,
+    retmode: str = 'json',
+    refresh: bool = False,
+    validate: Optional[Callable] = None,
+):
+    """
+    Call an E-utilities endpoint through the shared client.
+
+    Every attempt, including retries, takes a token from the shared NCBI
+    rate limiter (3/s, or 10/s with NCBI_API_KEY, which is sent along).
+
+    Args:
+        endpoint: E-utility name (e.g., 'esearch', 'esummary', 'efetch')
+        params: Query parameters (retmode is added)
+        timeout: Timeout in seconds
+        retmode: 'json' returns decoded JSON; anything else returns text
+        refresh: Skip the response cache read and force a fresh request
+        validate: Extra check of fresh responses; raising keeps them out of the cache
+
+    Raises:
+        EutilsError: If the body reports an error
+    """
+    url = f"{EUTILS_BASE}/{endpoint}.fcgi"
+    params = {**params, 'retmode': retmode}
+    api_key = ncbi_api_key()
+    if api_key:
+        params['api_key'] = api_key
+    def check(response):
+        _check_eutils(response)
+        if validate:
+            validate(response)
+
+    response = get_client().request(url, params, timeout=timeout, limiter=ncbi_rate_limiter(),
+                                    refresh=refresh, validate=check)
+    return response.json() if retmode == 'json' else response.text
 
 
 def check_network_access() -> Tuple[bool, str]:
     """
-    Check if NCBI/ENA servers are accessible.
+    Check if NCBI/ENA servers are accessible, probing all hosts concurrently.
 
     Returns:
         Tuple of (success, message)
@@ -59,20 +113,21 @@ def check_network_access() -> Tuple[bool, str]:
         ("ENA API", "https://www.ebi.ac.uk/ena/portal/api/"),
     ]
 
-    results = []
-    for name, url in test_urls:
+    client = get_client()
+    if client.cache and client.cache.offline:
+        return True, "  Offline mode: using cached responses only"
+
+    def probe(name_url: Tuple[str, str]):
+        name, url = name_url
         try:
-            if HAS_REQUESTS:
-                # Use GET instead of HEAD - NCBI Entrez returns 405 for HEAD
-                response = requests.get(url, timeout=10)
-                success = response.status_code < 400
-            else:
-                req = Request(url, headers={'User-Agent': 'geo-sra-skill/1.0'})
-                with urlopen(req, timeout=10) as response:
-                    success = True
-            results.append((name, success, None))
+            # Use GET instead of HEAD - NCBI Entrez returns 405 for HEAD
+            client.request(url, timeout=10, retries=0, use_cache=False)
+            return name, True, None
         except Exception as e:
-            results.append((name, False, str(e)))
+            return name, False, str(e)
+
+    with ThreadPoolExecutor(max_workers=len(test_urls)) as executor:
+        results = list(executor.map(probe, test_urls))
 
     all_success = all(r[1] for r in results)
 
@@ -84,114 +139,397 @@ def check_network_access() -> Tuple[bool, str]:
     return all_success, "\n".join(msg_parts)
 
 
-def fetch_geo_metadata(geo_id: str) -> Optional[Dict]:
-    """
-    Fetch GEO study metadata using NCBI Entrez E-utilities.
+async def check_network_access_async() -> Tuple[bool, str]:
+    """Async version of check_network_access()."""
+    return await asyncio.to_thread(check_network_access)
 
-    Args:
-        geo_id: GEO accession (e.g., 'GSE110004')
 
-    Returns:
-        Dict with study metadata or None if failed
+# NCBI efetch runinfo CSV doesn't include headers
+# Fixed column order for the SRA runinfo format
+RUNINFO_HEADER = [
+    'Run', 'ReleaseDate', 'LoadDate', 'spots', 'bases', 'spots_with_mates',
+    'avgLength', 'size_MB', 'AssemblyName', 'download_path', 'Experiment',
+    'LibraryName', 'LibraryStrategy', 'LibrarySelection', 'LibrarySource',
+    'LibraryLayout', 'InsertSize', 'InsertDev', 'Platform', 'Model',
+    'SRAStudy', 'BioProject', 'Study_Pubmed_id', 'ProjectID', 'Sample',
+    'BioSample', 'SampleType', 'TaxID', 'ScientificName', 'SampleName',
+    'g1k_pop_code', 'source', 'g1k_analysis_group', 'Subject_ID', 'Sex',
+    'Disease', 'Tumor', 'Affection_Status', 'Analyte_Type', 'Histological_Type',
+    'Body_Site', 'CenterName', 'Submission', 'dbgap_study_accession', 'Consent',
+    'RunHash', 'ReadHash'
+]
+
+
+class StudyResolver:
     """
-    try:
-        # Use esearch to get GEO UID
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=gds&term={geo_id}[Accession]&retmode=json"
+    Memoized accession graph for one GEO study.
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(search_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(search_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
+    Resolves GSE -> GDS uid -> SRA search -> SRR runs -> SRP studies, and
+    GDS uid -> BioProject, on demand. Each edge is fetched at most once per
+    process, so every subcommand and helper querying the same study shares
+    the same E-utilities calls. Failed lookups are logged and not memoized,
+    so a later call can retry.
 
-        id_list = data.get('esearchresult', {}).get('idlist', [])
-        if not id_list:
-            logger.warning(f"No GEO entry found for {geo_id}")
-            return None
+    Use get_resolver() rather than constructing this directly.
 
-        # Use esummary to get metadata
-        uid = id_list[0]
-        summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=gds&id={uid}&retmode=json"
+    Run records are paged from the E-utilities history server (WebEnv /
+    query_key) in chunks of chunk_size, fetched `workers` at a time, so
+    studies with tens of thousands of runs are neither truncated nor sent
+    as one oversized URL.
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(summary_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(summary_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
+    Args:
+        geo_id: GEO accession (e.g., 'GSE110004')
+        bioproject: Optional known BioProject accession (skips the elink lookup)
+        chunk_size: Records per esummary/efetch request (default NCBI_CHUNK_SIZE)
+        workers: Parallel chunk requests (default NCBI_FETCH_WORKERS)
+    """
 
-        result = data.get('result', {}).get(uid, {})
+    def __init__(
+        self,
+        geo_id: str,
+        bioproject: Optional[str] = None,
+        chunk_size: int = NCBI_CHUNK_SIZE,
+        workers: int = NCBI_FETCH_WORKERS,
+    ):
+        self.geo_id = geo_id.upper()
+        self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+        self._memo: Dict[str, object] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        if bioproject:
+            self._memo['bioproject'] = bioproject
+
+    def _lock(self, key: str) -> threading.Lock:
+        """Per-key lock; _locks_lock is only held to look it up."""
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _once(self, key: str, compute, default=None):
+        """Return the memoized value for key, computing it once."""
+        if key in self._memo:
+            return self._memo[key]
+        with self._lock(key):
+            if key not in self._memo:
+                try:
+                    self._memo[key] = compute()
+                except Exception as e:
+                    logger.error(f"Error resolving {key} for {self.geo_id}: {e}")
+                    return default
+            return self._memo[key]
+
+    def gds_uid(self) -> Optional[str]:
+        """GDS uid for the GEO accession."""
+        def compute():
+            data = _eutils('esearch', {'db': 'gds', 'term': f'{self.geo_id}[Accession]'})
+            id_list = data.get('esearchresult', {}).get('idlist', [])
+            return id_list[0] if id_list else None
+        return self._once('gds_uid', compute)
+
+    def geo_metadata(self) -> Optional[Dict]:
+        """GEO study metadata from the GDS esummary."""
+        def compute():
+            uid = self.gds_uid()
+            if not uid:
+                logger.warning(f"No GEO entry found for {self.geo_id}")
+                return None
+            data = _eutils('esummary', {'db': 'gds', 'id': uid})
+            result = data.get('result', {}).get(uid, {})
+            return {
+                'geo_id': self.geo_id,
+                'title': result.get('title', 'N/A'),
+                'summary': result.get('summary', 'N/A'),
+                'organism': result.get('taxon', 'N/A'),
+                'n_samples': result.get('n_samples', 0),
+                'gpl': result.get('gpl', 'N/A'),
+                'entrytype': result.get('entrytype', 'N/A'),
+                'pubmed_ids': result.get('pubmedids', []),
+            }
+        return self._once('geo_metadata', compute)
 
+    def bioproject(self) -> Optional[str]:
+        """BioProject accession linked to the GEO study (e.g., 'PRJNA432544')."""
+        def compute():
+            uid = self.gds_uid()
+            if not uid:
+                return None
+            data = _eutils('elink', {'dbfrom': 'gds', 'db': 'bioproject', 'id': uid})
+            for linkset in data.get('linksets', [])[:1]:
+                for linksetdb in linkset.get('linksetdbs', []):
+                    bp_ids = linksetdb.get('links', []) if linksetdb.get('dbto') == 'bioproject' else []
+                    if bp_ids:
+                        data = _eutils('esummary', {'db': 'bioproject', 'id': bp_ids[0]})
+                        return data.get('result', {}).get(str(bp_ids[0]), {}).get('project_acc')
+            return None
+        return self._once('bioproject', compute)
+
+    def sra_search(self) -> Optional[Dict]:
+        """
+        SRA search on the E-utilities history server.
+
+        Tries the GEO link first, then the BioProject for SuperSeries.
+        Returns {'term', 'count', 'webenv', 'query_key'} or None.
+        """
+        def compute():
+            search = self._search_sra(f'{self.geo_id}[GEO]')
+            if not search:
+                logger.info(f"No direct SRA link for {self.geo_id}, searching for BioProject...")
+                bioproject = self.bioproject()
+                if bioproject:
+                    logger.info(f"Found BioProject: {bioproject}")
+                    search = self._search_sra(bioproject)
+            if not search:
+                logger.warning(f"No SRA entries found for {self.geo_id}")
+            return search
+        return self._once('sra_search', compute)
+
+    def _search_sra(self, term: str, refresh: bool = False) -> Optional[Dict]:
+        """Run an esearch with usehistory=y and return the history handle."""
+        data = _eutils('esearch', {'db': 'sra', 'term': term, 'usehistory': 'y', 'retmax': 0},
+                       refresh=refresh)
+        result = data.get('esearchresult', {})
+        count = int(result.get('count', 0) or 0)
+        if not count:
+            return None
+        return {'term': term, 'count': count, 'webenv': result.get('webenv'), 'query_key': result.get('querykey')}
+
+    def _renew_search(self, stale: Dict) -> Dict:
+        """
+        Re-run an expired history search, bypassing the response cache.
+
+        History sessions expire after a few hours, so a cached esearch can
+        outlive its WebEnv. Concurrent chunks that hit the same expired
+        session renew it only once; only the 'sra_search' lock is held
+        during the request, so other keys resolve meanwhile.
+        """
+        with self._lock('sra_search'):
+            current = self._memo.get('sra_search')
+            if current is stale or current is None:
+                current = self._search_sra(stale['term'], refresh=True) or stale
+                self._memo['sra_search'] = current
+            return current
+
+    def _iter_history(self, endpoint: str, params: Dict, parse, retmode: str = 'json') -> Iterator[Tuple[int, list]]:
+        """
+        Fetch every record of the SRA search in chunks of chunk_size.
+
+        Chunks are fetched in parallel by `workers` threads, all taking
+        tokens from the shared NCBI rate limiter, and yielded as
+        (retstart, parsed_records) in the order they arrive.
+        """
+        search = self.sra_search()
+        if not search:
+            return
+
+        def fetch(start: int):
+            current = search
+            for attempt in range(2):
+                history = {'db': 'sra', 'WebEnv': current['webenv'], 'query_key': current['query_key'],
+                           'retstart': start, 'retmax': self.chunk_size}
+                try:
+                    return start, parse(_eutils(endpoint, {**params, **history}, timeout=60, retmode=retmode))
+                except EutilsError:
+                    if attempt:
+                        raise
+                    current = self._renew_search(current)
+
+        starts = range(0, search['count'], self.chunk_size)
+        if len(starts) == 1:
+            yield fetch(0)
+            return
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(starts))) as executor:
+            futures = [executor.submit(fetch, start) for start in starts]
+            for future in as_completed(futures):
+                start, records = future.result()
+                done = min(done + self.chunk_size, search['count'])
+                logger.info(f"  Fetched {done}/{search['count']} SRA records ({endpoint})")
+                yield start, records
+
+    def _stream_history(self, key: str, endpoint: str, params: Dict, parse,
+                        retmode: str = 'json') -> Iterator[List]:
+        """
+        Yield the records of each chunk of _iter_history as it completes.
+
+        Once every chunk is in, the records are memoized under key in search
+        order. If key is already memoized, the memoized list is yielded.
+        """
+        if key in self._memo:
+            yield self._memo[key]
+            return
+        chunks = {}
+        for start, records in self._iter_history(endpoint, params, parse, retmode):
+            chunks[start] = records
+            yield records
+        self._memo[key] = [record for start in sorted(chunks) for record in chunks[start]]
+
+    def _collect_history(self, key: str, endpoint: str, params: Dict, parse, retmode: str = 'json') -> List:
+        """Memoize all chunks of _stream_history, in search order (fetched once across threads)."""
+        def compute():
+            for _ in self._stream_history(key, endpoint, params, parse, retmode):
+                pass
+            return self._memo[key]
+        return self._once(key, compute, [])
+
+    def runs_summary(self) -> List[Dict]:
+        """Run info parsed from the SRA esummary XML fragments."""
+        return self._collect_history('runs_summary', 'esummary', {}, _parse_sra_summaries)
+
+    def iter_runs_detailed(self) -> Iterator[List[Dict]]:
+        """
+        Stream detailed run info chunk by chunk, in arrival order, as chunks complete.
+
+        For a single consumer that can start on partial results; the full
+        list is memoized for runs_detailed() once the stream is exhausted.
+        """
+        return self._stream_history('runs_detailed', 'efetch', {'rettype': 'runinfo'}, _parse_runinfo,
+                                    retmode='csv')
+
+    def runs_detailed(self) -> List[Dict]:
+        """Run info from efetch runinfo CSV (richer than esummary, includes sample names)."""
+        return self._collect_history('runs_detailed', 'efetch', {'rettype': 'runinfo'}, _parse_runinfo,
+                                     retmode='csv')
+
+    def runs(self) -> List[Dict]:
+        """Detailed run info, falling back to esummary when efetch returns nothing."""
+        return self.runs_detailed() or self.runs_summary()
+
+    def run(self, srr: str) -> Optional[Dict]:
+        """Run info for one SRR accession."""
+        by_srr = self._once('runs_by_srr', lambda: {r['srr']: r for r in self.runs()}, {})
+        return by_srr.get(srr)
+
+    def sra_studies(self) -> List[str]:
+        """SRA study accessions (SRP) covered by the runs; several for SuperSeries."""
+        def compute():
+            runs = self._memo.get('runs_detailed') or self._memo.get('runs_summary') or self.runs()
+            studies = sorted({r['sra_study'] for r in runs if r.get('sra_study')})
+            if not studies:
+                # runinfo without SRAStudy: fall back to the esummary XML
+                studies = sorted({r['sra_study'] for r in self.runs_summary() if r.get('sra_study')})
+            return studies
+        return self._once('sra_studies', compute, [])
+
+    def sra_study(self) -> Optional[str]:
+        """Primary SRA study accession (e.g., 'SRP126328')."""
+        studies = self.sra_studies()
+        return studies[0] if studies else None
+
+    def fastq_files_by_study(self) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        ENA FASTQ files ({'url', 'bytes', 'md5', 'aspera'}) per SRA study, each keyed by SRR.
+
+        The ENA reports of a SuperSeries' studies are fetched concurrently.
+        """
+        def compute():
+            studies = self.sra_studies()
+            if not studies:
+                return {}
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(studies))) as executor:
+                return dict(zip(studies, executor.map(fetch_ena_fastq_files, studies)))
+        return self._once('fastq_files', compute, {})
+
+    def fastq_files(self) -> Dict[str, List[Dict]]:
+        """ENA FASTQ files for all runs of the study, keyed by SRR."""
+        merged: Dict[str, List[Dict]] = {}
+        for files in self.fastq_files_by_study().values():
+            merged.update(files)
+        return merged
+
+    def overview(self) -> Dict:
+        """
+        Everything `info` reports, with independent lookups running concurrently.
+
+        The GDS and SRA searches don't depend on each other, so GEO metadata,
+        BioProject and run info start together; PubMed starts as soon as the
+        GEO metadata names a paper, and the ENA reports as soon as the runs
+        name their SRA studies. Shared edges (e.g., the GDS uid) are still
+        fetched once, as the memoized lookups wait on each other.
+
+        Returns:
+            Dict with 'metadata', 'bioproject', 'runs', 'sra_studies',
+            'fastq_files' (per study) and 'publication' (PubMed, or None)
+        """
+        def publication():
+            pmids = (self.geo_metadata() or {}).get('pubmed_ids') or []
+            return fetch_pubmed_metadata(str(pmids[0])) if pmids else None
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            metadata, bioproject, runs, fastq_files, paper = [
+                future.result() for future in [
+                    executor.submit(self.geo_metadata),
+                    executor.submit(self.bioproject),
+                    executor.submit(self.runs),
+                    executor.submit(self.fastq_files_by_study),
+                    executor.submit(publication),
+                ]
+            ]
         return {
-            'geo_id': geo_id,
-            'title': result.get('title', 'N/A'),
-            'summary': result.get('summary', 'N/A'),
-            'organism': result.get('taxon', 'N/A'),
-            'n_samples': result.get('n_samples', 0),
-            'gpl': result.get('gpl', 'N/A'),
-            'entrytype': result.get('entrytype', 'N/A'),
-            'pubmed_ids': result.get('pubmedids', []),
+            'metadata': metadata,
+            'bioproject': bioproject,
+            'runs': runs,
+            'sra_studies': self.sra_studies(),
+            'fastq_files': fastq_files,
+            'publication': paper,
         }
 
-    except Exception as e:
-        logger.error(f"Error fetching GEO metadata for {geo_id}: {e}")
-        return None
+    async def overview_async(self) -> Dict:
+        """Async version of overview()."""
+        return await asyncio.to_thread(self.overview)
 
 
-def fetch_sra_study_accession(geo_id: str) -> Optional[str]:
+_resolvers: Dict[str, StudyResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(geo_id: str, bioproject: Optional[str] = None) -> StudyResolver:
     """
-    Get the SRA study accession (SRPxxxxxx) for a GEO accession.
+    Return the process-wide StudyResolver for a GEO accession.
 
     Args:
         geo_id: GEO accession (e.g., 'GSE110004')
+        bioproject: Optional known BioProject accession
+    """
+    key = geo_id.upper()
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is None:
+            resolver = _resolvers[key] = StudyResolver(key, bioproject)
+        elif bioproject:
+            resolver._memo.setdefault('bioproject', bioproject)
+        return resolver
 
-    Returns:
-        SRA study accession (e.g., 'SRP126328') or None
+
+def fetch_geo_metadata(geo_id: str) -> Optional[Dict]:
     """
-    try:
-        # Search for SRA study linked to GEO
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=sra&term={geo_id}[GEO]&retmode=json"
+    Fetch GEO study metadata using NCBI Entrez E-utilities.
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(search_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(search_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
+    Args:
+        geo_id: GEO accession (e.g., 'GSE110004')
 
-        id_list = data.get('esearchresult', {}).get('idlist', [])
-        if not id_list:
-            return None
+    Returns:
+        Dict with study metadata or None if failed
+    """
+    return get_resolver(geo_id).geo_metadata()
 
-        # Get summary to extract SRP accession
-        uid = id_list[0]
-        summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=sra&id={uid}&retmode=json"
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(summary_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(summary_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
+async def fetch_geo_metadata_async(geo_id: str) -> Optional[Dict]:
+    """Async version of fetch_geo_metadata()."""
+    return await asyncio.to_thread(fetch_geo_metadata, geo_id)
 
-        result = data.get('result', {}).get(uid, {})
-        exp_xml = result.get('expxml', '')
 
-        # Extract SRP from the XML
-        srp_match = re.search(r'<Study acc="(SRP\d+)"', exp_xml)
-        if srp_match:
-            return srp_match.group(1)
+def fetch_sra_study_accession(geo_id: str) -> Optional[str]:
+    """
+    Get the SRA study accession (SRPxxxxxx) for a GEO accession.
 
-        return None
+    Args:
+        geo_id: GEO accession (e.g., 'GSE110004')
 
-    except Exception as e:
-        logger.debug(f"Error fetching SRA study for {geo_id}: {e}")
-        return None
+    Returns:
+        SRA study accession (e.g., 'SRP126328') or None
+    """
+    return get_resolver(geo_id).sra_study()
 
 
 def fetch_sra_run_info(geo_id: str, bioproject: Optional[str] = None) -> List[Dict]:
@@ -205,197 +543,324 @@ def fetch_sra_run_info(geo_id: str, bioproject: Optional[str] = None) -> List[Di
     Returns:
         List of dicts with run info (srr, gsm, layout, library_strategy, etc.)
     """
-    runs = []
+    return get_resolver(geo_id, bioproject).runs_summary()
 
-    try:
-        # First get the BioProject accession
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=sra&term={geo_id}[GEO]&retmax=1000&retmode=json"
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(search_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(search_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
-
-        id_list = data.get('esearchresult', {}).get('idlist', [])
-
-        # If no results, try BioProject fallback
-        if not id_list:
-            if not bioproject:
-                bioproject = fetch_bioproject_from_geo(geo_id)
-
-            if bioproject:
-                logger.info(f"Using BioProject {bioproject} for {geo_id}")
-                search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=sra&term={bioproject}&retmax=1000&retmode=json"
-
-                _rate_limit_ncbi()
-                if HAS_REQUESTS:
-                    response = requests.get(search_url, timeout=30)
-                    data = response.json()
-                else:
-                    with urlopen(search_url, timeout=30) as response:
-                        data = json.loads(response.read().decode())
-
-                id_list = data.get('esearchresult', {}).get('idlist', [])
-
-        if not id_list:
-            logger.warning(f"No SRA entries found for {geo_id}")
-            return runs
-
-        # Batch fetch summaries
-        ids_str = ','.join(id_list)
-        summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=sra&id={ids_str}&retmode=json"
-
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(summary_url, timeout=60)
-            data = response.json()
-        else:
-            with urlopen(summary_url, timeout=60) as response:
-                data = json.loads(response.read().decode())
+ENA_FASTQ_FIELDS = 'run_accession,sample_alias,fastq_ftp,fastq_bytes,fastq_md5,fastq_aspera'
 
-        result = data.get('result', {})
 
-        for uid in id_list:
-            entry = result.get(uid, {})
-            if not entry:
-                continue
+def _ena_fastq_row(row: Dict[str, str]) -> List[Dict]:
+    """FASTQ file dicts from one ENA filereport row (parallel ';'-separated lists)."""
+    urls = (row.get('fastq_ftp') or '').split(';')
+    sizes = (row.get('fastq_bytes') or '').split(';')
+    md5s = (row.get('fastq_md5') or '').split(';')
+    asperas = (row.get('fastq_aspera') or '').split(';')
+    files = []
+    for i, url in enumerate(urls):
+        if not url:
+            continue
+        size = sizes[i] if i < len(sizes) else ''
+        md5 = md5s[i] if i < len(md5s) else ''
+        aspera = asperas[i] if i < len(asperas) else ''
+        files.append({
+            # ENA supports both FTP and HTTP, HTTP is easier with requests
+            'url': f"http://{url}",
+            'bytes': int(size) if size.isdigit() else None,
+            'md5': md5 or None,
+            'aspera': aspera or None,
+        })
+    return files
+
+
+def iter_ena_fastq_files(study_accession: str) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Stream FASTQ files from the ENA filereport for an SRA study.
 
-            exp_xml = entry.get('expxml', '')
-            runs_xml = entry.get('runs', '')
+    Rows are parsed as the TSV arrives, so large studies are never held as
+    one string.
 
-            # Extract metadata from XML
-            layout_match = re.search(r'<LIBRARY_LAYOUT>\s*<(\w+)', exp_xml)
-            strategy_match = re.search(r'<LIBRARY_STRATEGY>(\w+)', exp_xml)
-            source_match = re.search(r'<LIBRARY_SOURCE>(\w+)', exp_xml)
-            gsm_match = re.search(r'<Sample acc="(GSM\d+)"', exp_xml)
-            srx_match = re.search(r'<Experiment acc="(SRX\d+)"', exp_xml)
+    Args:
+        study_accession: SRA study accession (e.g., 'SRP126328')
 
-            # Extract run accessions
-            srr_matches = re.findall(r'<Run acc="(SRR\d+)"[^>]*total_spots="(\d+)"[^>]*total_bases="(\d+)"', runs_xml)
+    Yields:
+        (SRR accession, list of {'url', 'bytes', 'md5', 'aspera'} dicts)
+    """
+    rows = get_client().iter_tsv(ENA_FILEREPORT_URL, {
+        'accession': study_accession,
+        'result': 'read_run',
+        'fields': ENA_FASTQ_FIELDS,
+        'format': 'tsv',
+    }, timeout=60)
+    for row in rows:
+        srr = row.get('run_accession') or ''
+        files = _ena_fastq_row(row)
+        if srr and files:
+            yield srr, files
+
+
+def fetch_ena_fastq_files(study_accession: str) -> Dict[str, List[Dict]]:
+    """
+    Get FASTQ files from ENA for an SRA study, with sizes and checksums.
 
-            for srr, spots, bases in srr_matches:
-                runs.append({
-                    'srr': srr,
-                    'srx': srx_match.group(1) if srx_match else '',
-                    'gsm': gsm_match.group(1) if gsm_match else '',
-                    'layout': layout_match.group(1).upper() if layout_match else 'UNKNOWN',
-                    'library_strategy': strategy_match.group(1) if strategy_match else 'UNKNOWN',
-                    'library_source': source_match.group(1) if source_match else 'UNKNOWN',
-                    'spots': int(spots),
-                    'bases': int(bases),
-                })
+    ENA provides faster downloads than SRA with pre-split paired files.
 
-        return runs
+    Args:
+        study_accession: SRA study accession (e.g., 'SRP126328')
 
+    Returns:
+        Dict mapping SRR accession to a list of {'url', 'bytes', 'md5', 'aspera'}
+        dicts ('bytes', 'md5' and 'aspera' are None when ENA does not report them)
+    """
+    fastq_files = {}
+
+    try:
+        for srr, files in iter_ena_fastq_files(study_accession):
+            fastq_files[srr] = files
     except Exception as e:
-        logger.error(f"Error fetching SRA run info for {geo_id}: {e}")
-        return runs
+        logger.error(f"Error fetching ENA URLs for {study_accession}: {e}")
+        return fastq_files
+
+    if not fastq_files:
+        logger.warning(f"No FASTQ URLs found in ENA for {study_accession}")
+    return fastq_files
+
+
+async def fetch_ena_fastq_files_async(study_accession: str) -> Dict[str, List[Dict]]:
+    """Async version of fetch_ena_fastq_files()."""
+    return await asyncio.to_thread(fetch_ena_fastq_files, study_accession)
 
 
 def fetch_ena_fastq_urls(study_accession: str) -> Dict[str, List[str]]:
     """
     Get FASTQ download URLs from ENA for an SRA study.
 
-    ENA provides faster downloads than SRA with pre-split paired files.
-
     Args:
         study_accession: SRA study accession (e.g., 'SRP126328')
 
     Returns:
         Dict mapping SRR accession to list of FASTQ URLs
     """
-    fastq_urls = {}
+    return {
+        srr: [f['url'] for f in files]
+        for srr, files in fetch_ena_fastq_files(study_accession).items()
+    }
 
-    try:
-        # Query ENA API
-        ena_url = f"https://www.ebi.ac.uk/ena/portal/api/filereport?accession={study_accession}&result=read_run&fields=run_accession,sample_alias,fastq_ftp&format=tsv"
 
-        if HAS_REQUESTS:
-            response = requests.get(ena_url, timeout=60)
-            content = response.text
-        else:
-            with urlopen(ena_url, timeout=60) as response:
-                content = response.read().decode()
-
-        lines = content.strip().split('\n')
-        if len(lines) < 2:
-            logger.warning(f"No FASTQ URLs found in ENA for {study_accession}")
-            return fastq_urls
-
-        # Parse TSV
-        header = lines[0].split('\t')
-        run_idx = header.index('run_accession') if 'run_accession' in header else 0
-        ftp_idx = header.index('fastq_ftp') if 'fastq_ftp' in header else 2
-
-        for line in lines[1:]:
-            if not line.strip():
-                continue
-            fields = line.split('\t')
-            if len(fields) > max(run_idx, ftp_idx):
-                srr = fields[run_idx]
-                ftp_urls = fields[ftp_idx]
-                if ftp_urls:
-                    # URLs are semicolon-separated, convert to HTTP URLs
-                    # ENA supports both FTP and HTTP, HTTP is easier with requests
-                    urls = [f"http://{url}" for url in ftp_urls.split(';') if url]
-                    fastq_urls[srr] = urls
-
-        return fastq_urls
+def _part_path(output_path: Path) -> Path:
+    """Partial-download path for a file (e.g., SRR1_1.fastq.gz.part)."""
+    return output_path.with_name(output_path.name + '.part')
+
+
+def _segments_path(output_path: Path) -> Path:
+    """
+    Partial path for a file downloaded in byte-range segments (e.g., SRR1_1.fastq.gz.seg.part).
+
+    It is preallocated at full size with holes where segments are missing,
+    so it must never be mistaken for a contiguous '.part' file.
+    """
+    return output_path.with_name(output_path.name + '.seg.part')
 
-    except Exception as e:
-        logger.error(f"Error fetching ENA URLs for {study_accession}: {e}")
-        return fastq_urls
 
+def is_download_complete(output_path: Path, expected_size: Optional[int] = None) -> bool:
+    """
+    Check whether a file was fully downloaded.
 
-def download_file(url: str, output_path: Path, timeout: int = 300, show_progress: bool = True) -> bool:
+    download_file() renames into place only after verification, so an
+    existing file is complete unless it predates that and its size is off.
+    """
+    try:
+        size = output_path.stat().st_size
+    except OSError:
+        return False
+    return expected_size is None or size == expected_size
+
+
+def download_file(
+    url: str,
+    output_path: Path,
+    timeout: int = 300,
+    show_progress: bool = True,
+    expected_size: Optional[int] = None,
+    expected_md5: Optional[str] = None,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    max_resumes: int = 3,
+    on_chunk: Optional[Callable[[int], None]] = None,
+    on_retry: Optional[Callable[[int, Exception], None]] = None,
+    validator=None,
+) -> bool:
     """
-    Download a file with progress indication.
+    Download a file with resume support and integrity checks.
+
+    Data goes to '<name>.part'. An existing partial file is resumed with an
+    HTTP Range request, and a dropped connection (or a body that ends
+    before expected_size) is resumed up to max_resumes times; a partial file
+    still short after that is kept for the next run. The file is renamed
+    into place atomically only after its size and MD5 match
+    expected_size/expected_md5 (when given). A file larger than expected or
+    with the wrong MD5 is discarded. A segmented partial left by
+    DownloadScheduler ('<name>.seg.part') is never resumed here; it is
+    removed once this download completes.
 
     Args:
         url: URL to download
         output_path: Path to save file
         timeout: Download timeout in seconds
         show_progress: Show progress bar
+        expected_size: Expected size in bytes (e.g., ENA fastq_bytes)
+        expected_md5: Expected MD5 hex digest (e.g., ENA fastq_md5)
+        buffer_size: Network read and file write buffer size in bytes
+        max_resumes: Resume attempts after a dropped connection
+        on_chunk: Called with the size of each chunk written (throttling, metrics)
+        on_retry: Called with the resume offset and the error before each resume
+        validator: Fed the file's bytes in order as they are written, e.g. a
+            FastqValidator (only bytes resumed from a '.part' are read back)
 
     Returns:
         True if successful, False otherwise
     """
+    part_path = _part_path(output_path)
+
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if HAS_REQUESTS:
-            response = requests.get(url, stream=True, timeout=timeout)
-            response.raise_for_status()
-
-            total_size = int(response.headers.get('content-length', 0))
-
-            with open(output_path, 'wb') as f:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if show_progress and total_size > 0:
-                        pct = (downloaded / total_size) * 100
-                        print(f"\r  Progress: {pct:.1f}%", end='', flush=True)
-                if show_progress:
-                    print()  # New line after progress
-            return True
-        else:
-            # Fallback to urllib
-            req = Request(url, headers={'User-Agent': 'geo-sra-skill/1.0'})
-            with urlopen(req, timeout=timeout) as response:
-                with open(output_path, 'wb') as f:
-                    shutil.copyfileobj(response, f)
-            return True
+        # A short file left by an older, non-resumable download becomes the partial
+        if output_path.exists() and not part_path.exists():
+            if is_download_complete(output_path, expected_size):
+                return True
+            os.replace(output_path, part_path)
+
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if expected_size is not None and offset > expected_size:
+            offset = 0
+        # Seed the checksum and validator with the bytes already on disk
+        digest = hashlib.md5() if expected_md5 else None
+        _read_prefix(part_path, offset, buffer_size, digest, validator)
+
+        for attempt in range(max_resumes + 1):
+            if expected_size is not None and offset == expected_size:
+                break
+            try:
+                offset, digest = _download_range(url, part_path, offset, digest, timeout, buffer_size,
+                                                 expected_size, show_progress, on_chunk, validator)
+                # Some clients end the body silently when the connection drops
+                if expected_size is not None and offset < expected_size:
+                    raise ConnectionError(f"connection closed at {offset} of {expected_size} bytes")
+                break
+            except HttpError as e:
+                if e.status == 416 and offset:
+                    break  # Nothing left past the partial file; verify it
+                raise
+            except Exception as e:
+                if attempt == max_resumes:
+                    raise
+                logger.warning(f"Download interrupted for {output_path.name} at {offset} bytes, resuming: {e}")
+                offset = part_path.stat().st_size if part_path.exists() else 0
+                digest = hashlib.md5() if expected_md5 else None
+                if validator:
+                    validator.reset()
+                _read_prefix(part_path, offset, buffer_size, digest, validator)
+                if on_retry:
+                    on_retry(offset, e)
+
+        if show_progress:
+            print()  # New line after progress
+
+        if expected_size is not None and offset > expected_size:
+            logger.error(f"Size mismatch for {output_path.name}: {offset} > {expected_size} bytes")
+            part_path.unlink()
+            return False
+        if expected_size is not None and offset < expected_size:
+            # Keep the partial file; the next run resumes it
+            logger.error(f"Incomplete download of {output_path.name}: {offset} of {expected_size} bytes")
+            return False
+        if digest and digest.hexdigest() != expected_md5.lower():
+            logger.error(f"MD5 mismatch for {output_path.name}: {digest.hexdigest()} != {expected_md5}")
+            part_path.unlink()
+            return False
+
+        os.replace(part_path, output_path)
+        # A segmented attempt of the same file is superseded
+        segments_path = _segments_path(output_path)
+        segments_path.unlink(missing_ok=True)
+        segments_path.with_name(segments_path.name + '.json').unlink(missing_ok=True)
+        return True
 
     except Exception as e:
         logger.error(f"Download error for {url}: {e}")
         return False
 
 
+def _read_prefix(path: Path, length: int, buffer_size: int, *sinks):
+    """Feed the first `length` bytes of path to each sink (MD5 digest, validator) that is set."""
+    sinks = [sink for sink in sinks if sink]
+    if not length or not sinks:
+        return
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(buffer_size, remaining))
+            if not block:
+                break
+            for sink in sinks:
+                sink.update(block)
+            remaining -= len(block)
+
+
+def _download_range(
+    url: str,
+    part_path: Path,
+    offset: int,
+    digest,
+    timeout: int,
+    buffer_size: int,
+    expected_size: Optional[int],
+    show_progress: bool,
+    on_chunk: Optional[Callable[[int], None]] = None,
+    validator=None,
+):
+    """
+    Append url's bytes from offset onwards to part_path.
+
+    Restarts from zero if the server ignores the Range header.
+
+    Returns:
+        Tuple of (new size of part_path, updated MD5 digest or None)
+    """
+    headers = {'Range': f'bytes={offset}-'} if offset else None
+    with get_client().stream(url, timeout=timeout, chunk_size=buffer_size, headers=headers) as response:
+        if offset and response.status != 206:
+            logger.info(f"Server ignored Range for {part_path.name}, restarting")
+            offset = 0
+            digest = hashlib.md5() if digest else None
+            if validator:
+                validator.reset()
+        total = expected_size or (response.total_size + offset)
+
+        with open(part_path, 'ab' if offset else 'wb', buffering=buffer_size) as f:
+            for chunk in response:
+                f.write(chunk)
+                if digest:
+                    digest.update(chunk)
+                if validator:
+                    validator.update(chunk)
+                offset += len(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+                if show_progress and total > 0:
+                    pct = (offset / total) * 100
+                    print(f"\r  Progress: {pct:.1f}%", end='', flush=True)
+    return offset, digest
+
+
+def _check_pubmed_summary(pmid: str) -> Callable:
+    """Validator rejecting a PubMed esummary without a usable record for pmid (per-UID error, no authors)."""
+    def check(response):
+        result = response.json().get('result', {}).get(pmid, {})
+        if not result or 'error' in result or not result.get('authors'):
+            raise EutilsError(f"{response.url}: no summary for PMID {pmid}: {result.get('error', 'no authors')}")
+    return check
+
+
 def fetch_pubmed_metadata(pmid: str, max_retries: int = 3) -> Optional[Dict]:
     """
     Fetch paper metadata from PubMed.
@@ -407,17 +872,11 @@ def fetch_pubmed_metadata(pmid: str, max_retries: int = 3) -> Optional[Dict]:
     Returns:
         Dict with 'authors', 'year', 'journal', 'doi' or None
     """
-    url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id={pmid}&retmode=json"
-
     for attempt in range(max_retries):
         try:
-            _rate_limit_ncbi()
-            if HAS_REQUESTS:
-                response = requests.get(url, timeout=30)
-                data = response.json()
-            else:
-                with urlopen(url, timeout=30) as response:
-                    data = json.loads(response.read().decode())
+            # Retries go back to the network rather than re-reading the cache
+            data = _eutils('esummary', {'db': 'pubmed', 'id': pmid}, refresh=attempt > 0,
+                           validate=_check_pubmed_summary(pmid))
 
             result = data.get('result', {}).get(pmid, {})
 
@@ -472,6 +931,11 @@ def fetch_pubmed_metadata(pmid: str, max_retries: int = 3) -> Optional[Dict]:
     return None
 
 
+async def fetch_pubmed_metadata_async(pmid: str, max_retries: int = 3) -> Optional[Dict]:
+    """Async version of fetch_pubmed_metadata()."""
+    return await asyncio.to_thread(fetch_pubmed_metadata, pmid, max_retries)
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
     if size_bytes < 1024:
@@ -484,19 +948,28 @@ def format_file_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
 
 
-def estimate_download_size(runs: List[Dict]) -> int:
+def _run_size(run: Dict, fastq_files: Optional[Dict[str, List[Dict]]] = None) -> int:
+    """Download size of a run: ENA's fastq_bytes when known, else estimated from bases."""
+    files = (fastq_files or {}).get(run.get('srr', ''))
+    if files and all(f.get('bytes') is not None for f in files):
+        return sum(f['bytes'] for f in files)
+    # FASTQ is roughly 1 byte per base, and gzip compresses it about 4x
+    return run.get('bases', 0) // 4
+
+
+def estimate_download_size(runs: List[Dict], fastq_files: Optional[Dict[str, List[Dict]]] = None) -> int:
     """
     Estimate total download size from SRA run info.
 
     Args:
         runs: List of run info dicts with 'bases' field
+        fastq_files: Optional ENA files by SRR (see fetch_ena_fastq_files);
+                     their real sizes replace the estimate for those runs
 
     Returns:
-        Estimated size in bytes (rough estimate based on bases)
+        Size in bytes (exact for runs with ENA sizes, estimated from bases otherwise)
     """
-    total_bases = sum(r.get('bases', 0) for r in runs)
-    # FASTQ is roughly 1 byte per base when compressed
-    return total_bases // 4  # Rough compression ratio
+    return sum(_run_size(run, fastq_files) for run in runs)
 
 
 def fetch_bioproject_from_geo(geo_id: str) -> Optional[str]:
@@ -509,57 +982,12 @@ def fetch_bioproject_from_geo(geo_id: str) -> Optional[str]:
     Returns:
         BioProject accession (e.g., 'PRJNA432544') or None
     """
-    try:
-        # First get GDS UID
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=gds&term={geo_id}[Accession]&retmode=json"
+    return get_resolver(geo_id).bioproject()
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(search_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(search_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
-
-        gds_ids = data.get('esearchresult', {}).get('idlist', [])
-        if not gds_ids:
-            return None
 
-        # Get linked BioProject
-        elink_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/elink.fcgi?dbfrom=gds&db=bioproject&id={gds_ids[0]}&retmode=json"
-
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(elink_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(elink_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
-
-        linksets = data.get('linksets', [])
-        if linksets and linksets[0].get('linksetdbs'):
-            for linksetdb in linksets[0]['linksetdbs']:
-                if linksetdb.get('dbto') == 'bioproject':
-                    bp_ids = linksetdb.get('links', [])
-                    if bp_ids:
-                        # Get BioProject accession
-                        summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=bioproject&id={bp_ids[0]}&retmode=json"
-                        _rate_limit_ncbi()
-                        if HAS_REQUESTS:
-                            response = requests.get(summary_url, timeout=30)
-                            data = response.json()
-                        else:
-                            with urlopen(summary_url, timeout=30) as response:
-                                data = json.loads(response.read().decode())
-
-                        result = data.get('result', {}).get(str(bp_ids[0]), {})
-                        return result.get('project_acc')
-
-        return None
-
-    except Exception as e:
-        logger.debug(f"Error fetching BioProject for {geo_id}: {e}")
-        return None
+async def fetch_bioproject_from_geo_async(geo_id: str) -> Optional[str]:
+    """Async version of fetch_bioproject_from_geo()."""
+    return await asyncio.to_thread(fetch_bioproject_from_geo, geo_id)
 
 
 def fetch_sra_run_info_detailed(geo_id: str, bioproject: Optional[str] = None) -> List[Dict]:
@@ -575,124 +1003,189 @@ def fetch_sra_run_info_detailed(geo_id: str, bioproject: Optional[str] = None) -
     Returns:
         List of dicts with detailed run info
     """
+    return get_resolver(geo_id, bioproject).runs_detailed()
+
+
+async def fetch_sra_run_info_detailed_async(geo_id: str, bioproject: Optional[str] = None) -> List[Dict]:
+    """Async version of fetch_sra_run_info_detailed()."""
+    return await asyncio.to_thread(fetch_sra_run_info_detailed, geo_id, bioproject)
+
+
+def _parse_runinfo(content: str) -> List[Dict]:
+    """Parse headerless efetch runinfo CSV into run dicts."""
     runs = []
 
-    try:
-        # First get SRA UIDs using GEO search
-        search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=sra&term={geo_id}[GEO]&retmax=1000&retmode=json"
+    # Map column names to indices
+    col_map = {col: idx for idx, col in enumerate(RUNINFO_HEADER)}
 
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(search_url, timeout=30)
-            data = response.json()
-        else:
-            with urlopen(search_url, timeout=30) as response:
-                data = json.loads(response.read().decode())
-
-        id_list = data.get('esearchresult', {}).get('idlist', [])
-
-        # If no results with GEO search, try BioProject
-        if not id_list:
-            # Try to find BioProject if not provided
-            if not bioproject:
-                logger.info(f"No direct SRA link for {geo_id}, searching for BioProject...")
-                bioproject = fetch_bioproject_from_geo(geo_id)
-
-            if bioproject:
-                logger.info(f"Found BioProject: {bioproject}")
-                search_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=sra&term={bioproject}&retmax=1000&retmode=json"
-
-                _rate_limit_ncbi()
-                if HAS_REQUESTS:
-                    response = requests.get(search_url, timeout=30)
-                    data = response.json()
-                else:
-                    with urlopen(search_url, timeout=30) as response:
-                        data = json.loads(response.read().decode())
-
-                id_list = data.get('esearchresult', {}).get('idlist', [])
-
-        if not id_list:
-            logger.warning(f"No SRA entries found for {geo_id}")
-            return runs
-
-        # Fetch run info in CSV format using efetch
-        ids_str = ','.join(id_list)
-        efetch_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=sra&id={ids_str}&rettype=runinfo&retmode=csv"
-
-        _rate_limit_ncbi()
-        if HAS_REQUESTS:
-            response = requests.get(efetch_url, timeout=60)
-            content = response.text
-        else:
-            with urlopen(efetch_url, timeout=60) as response:
-                content = response.read().decode()
-
-        lines = content.strip().split('\n')
-        if len(lines) < 1:
-            return runs
-
-        # NCBI efetch runinfo CSV doesn't include headers
-        # Define the fixed column order for SRA runinfo format
-        header = [
-            'Run', 'ReleaseDate', 'LoadDate', 'spots', 'bases', 'spots_with_mates',
-            'avgLength', 'size_MB', 'AssemblyName', 'download_path', 'Experiment',
-            'LibraryName', 'LibraryStrategy', 'LibrarySelection', 'LibrarySource',
-            'LibraryLayout', 'InsertSize', 'InsertDev', 'Platform', 'Model',
-            'SRAStudy', 'BioProject', 'Study_Pubmed_id', 'ProjectID', 'Sample',
-            'BioSample', 'SampleType', 'TaxID', 'ScientificName', 'SampleName',
-            'g1k_pop_code', 'source', 'g1k_analysis_group', 'Subject_ID', 'Sex',
-            'Disease', 'Tumor', 'Affection_Status', 'Analyte_Type', 'Histological_Type',
-            'Body_Site', 'CenterName', 'Submission', 'dbgap_study_accession', 'Consent',
-            'RunHash', 'ReadHash'
-        ]
-
-        # Map column names to indices
-        col_map = {col: idx for idx, col in enumerate(header)}
-
-        for line in lines:
-            if not line.strip():
-                continue
-
-            # Handle CSV fields (some may contain commas in quotes)
-            fields = _parse_csv_line(line)
-            if len(fields) < len(header):
-                continue
-
-            def get_field(name, default=''):
-                idx = col_map.get(name, -1)
-                return fields[idx] if idx >= 0 and idx < len(fields) else default
-
-            run = {
-                'srr': get_field('Run'),
-                'srx': get_field('Experiment'),
-                'gsm': get_field('SampleName'),  # Often GSM ID
-                'sample_name': get_field('SampleName'),
-                'library_name': get_field('LibraryName'),
-                'layout': get_field('LibraryLayout', 'UNKNOWN').upper(),
-                'library_strategy': get_field('LibraryStrategy', 'UNKNOWN'),
-                'library_source': get_field('LibrarySource', 'UNKNOWN'),
-                'library_selection': get_field('LibrarySelection', ''),
-                'platform': get_field('Platform'),
-                'model': get_field('Model'),
-                'organism': get_field('ScientificName', ''),
-                'spots': int(get_field('spots', 0) or 0),
-                'bases': int(get_field('bases', 0) or 0),
-                'size_mb': float(get_field('size_MB', 0) or 0),
-                'bioproject': get_field('BioProject'),
-                'biosample': get_field('BioSample'),
-                'sra_study': get_field('SRAStudy'),
-            }
+    for line in content.strip().split('\n'):
+        if not line.strip():
+            continue
+
+        # Handle CSV fields (some may contain commas in quotes)
+        fields = _parse_csv_line(line)
+        if len(fields) < len(RUNINFO_HEADER):
+            continue
 
-            # Only add if we have a valid SRR
-            if run['srr'].startswith('SRR'):
-                runs.append(run)
+        def get_field(name, default=''):
+            idx = col_map.get(name, -1)
+            return fields[idx] if idx >= 0 and idx < len(fields) else default
+
+        run = {
+            'srr': get_field('Run'),
+            'srx': get_field('Experiment'),
+            'gsm': get_field('SampleName'),  # Often GSM ID
+            'sample_name': get_field('SampleName'),
+            'library_name': get_field('LibraryName'),
+            'layout': get_field('LibraryLayout', 'UNKNOWN').upper(),
+            'library_strategy': get_field('LibraryStrategy', 'UNKNOWN'),
+            'library_source': get_field('LibrarySource', 'UNKNOWN'),
+            'library_selection': get_field('LibrarySelection', ''),
+            'platform': get_field('Platform'),
+            'model': get_field('Model'),
+            'organism': get_field('ScientificName', ''),
+            'spots': int(get_field('spots', 0) or 0),
+            'bases': int(get_field('bases', 0) or 0),
+            'size_mb': float(get_field('size_MB', 0) or 0),
+            'bioproject': get_field('BioProject'),
+            'biosample': get_field('BioSample'),
+            'sra_study': get_field('SRAStudy'),
+        }
 
-        return runs
+        # Only add if we have a valid SRR
+        if run['srr'].startswith('SRR'):
+            runs.append(run)
 
-    except Exception as e:
-        logger.error(f"Error fetching detailed SRA run info for {geo_id}: {e}")
-        return runs
+    return runs
+
+
+_GSM_RE = re.compile(r'GSM\d+')
+
+# Text elements of the esummary ExpXml captured as experiment fields
+_EXPXML_TEXT_FIELDS = {
+    'Title': 'title',
+    'Platform': 'platform',
+    'LIBRARY_NAME': 'library_name',
+    'LIBRARY_STRATEGY': 'library_strategy',
+    'LIBRARY_SOURCE': 'library_source',
+    'LIBRARY_SELECTION': 'library_selection',
+    'Bioproject': 'bioproject',
+    'Biosample': 'biosample',
+}
+
+
+class _SraSummaryParser:
+    """
+    Single-pass expat handler for one SRA esummary entry.
+
+    Collects experiment fields from the ExpXml fragment and every <Run>
+    from the Runs fragment without building a tree. Run attributes are
+    read by name, so their order does not matter.
+    """
+
+    def __init__(self):
+        self.experiment: Dict[str, str] = {}
+        self.runs: List[Tuple[str, str, str]] = []
+        self._field: Optional[str] = None
+        self._text: List[str] = []
+        self._in_layout = False
+
+    def start(self, name: str, attrs: Dict[str, str]):
+        if name == 'Run':
+            self.runs.append((attrs.get('acc', ''), attrs.get('total_spots', ''), attrs.get('total_bases', '')))
+        elif name == 'Experiment':
+            self.experiment['srx'] = attrs.get('acc', '')
+            self.experiment['experiment_name'] = attrs.get('name', '')
+        elif name == 'Study':
+            self.experiment['sra_study'] = attrs.get('acc', '')
+        elif name == 'Sample':
+            self.experiment['srs'] = attrs.get('acc', '')
+            self.experiment['sample_name'] = attrs.get('name', '')
+        elif name == 'Organism':
+            self.experiment['organism'] = attrs.get('ScientificName', '')
+        elif name == 'LIBRARY_LAYOUT':
+            self._in_layout = True
+        elif self._in_layout:
+            self.experiment['layout'] = name.upper()  # <PAIRED .../> or <SINGLE/>
+        if name == 'Platform':
+            self.experiment['model'] = attrs.get('instrument_model', '')
+        if name in _EXPXML_TEXT_FIELDS:
+            self._field = _EXPXML_TEXT_FIELDS[name]
+            self._text = []
+
+    def end(self, name: str):
+        if name == 'LIBRARY_LAYOUT':
+            self._in_layout = False
+        elif self._field and _EXPXML_TEXT_FIELDS.get(name) == self._field:
+            self.experiment[self._field] = ''.join(self._text).strip()
+            self._field = None
+
+    def text(self, data: str):
+        if self._field:
+            self._text.append(data)
+
+    def parse(self, exp_xml: str, runs_xml: str):
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.text
+        parser.Parse(f'<DocSum>{exp_xml}{runs_xml}</DocSum>', True)
+
+
+def _parse_sra_summaries(data: Dict) -> List[Dict]:
+    """
+    Parse run info from an SRA esummary JSON page (expxml/runs XML fragments).
+
+    Each entry's fragments go through one expat pass. The GSM accession is
+    taken from the first of sample accession, sample name, library name,
+    experiment name and title that contains one.
+    """
+    runs = []
+    result = data.get('result', {})
+
+    for uid in result.get('uids', []):
+        entry = result.get(uid, {})
+        handler = _SraSummaryParser()
+        try:
+            handler.parse(entry.get('expxml', ''), entry.get('runs', ''))
+        except expat.ExpatError as e:
+            logger.warning(f"Skipping malformed SRA summary {uid}: {e}")
+            continue
+
+        exp = handler.experiment
+        gsm = ''
+        for candidate in ('srs', 'sample_name', 'library_name', 'experiment_name', 'title'):
+            match = _GSM_RE.search(exp.get(candidate, ''))
+            if match:
+                gsm = match.group(0)
+                break
+
+        record = {
+            'srx': exp.get('srx', ''),
+            'gsm': gsm,
+            'sample_name': exp.get('sample_name') or exp.get('library_name', ''),
+            'library_name': exp.get('library_name', ''),
+            'layout': exp.get('layout', 'UNKNOWN'),
+            'library_strategy': exp.get('library_strategy') or 'UNKNOWN',
+            'library_source': exp.get('library_source') or 'UNKNOWN',
+            'library_selection': exp.get('library_selection', ''),
+            'platform': exp.get('platform', ''),
+            'model': exp.get('model', ''),
+            'organism': exp.get('organism', ''),
+            'bioproject': exp.get('bioproject', ''),
+            'biosample': exp.get('biosample', ''),
+            'sra_study': exp.get('sra_study', ''),
+        }
+        for srr, spots, bases in handler.runs:
+            if srr:
+                runs.append({
+                    'srr': srr,
+                    **record,
+                    'spots': int(spots) if spots.isdigit() else 0,
+                    'bases': int(bases) if bases.isdigit() else 0,
+                })
+
+    return runs
 
 
 def _parse_csv_line(line: str) -> List[str]:
@@ -705,10 +1198,13 @@ def _parse_csv_line(line: str) -> List[str]:
     return []
 
 
-def group_samples_by_type(runs: List[Dict]) -> Dict[str, Dict]:
+def group_samples_by_type(runs: List[Dict], fastq_files: Optional[Dict[str, List[Dict]]] = None) -> Dict[str, Dict]:
     """
     Group SRA runs by library type and layout.
 
+    Group sizes use ENA's fastq_bytes when fastq_files (by SRR) is given,
+    and an estimate from the run's bases otherwise.
+
     Returns dict with group names as keys and info dicts as values:
     {
         'RNA-Seq:PAIRED': {
@@ -732,7 +1228,7 @@ def group_samples_by_type(runs: List[Dict]) -> Dict[str, Dict]:
             groups[key] = {
                 'runs': [],
                 'gsm_ids': set(),
-                'total_bases': 0,
+                'total_size': 0,
                 'strategy': strategy,
                 'layout': layout,
             }
@@ -741,7 +1237,7 @@ def group_samples_by_type(runs: List[Dict]) -> Dict[str, Dict]:
         gsm = run.get('gsm', '')
         if gsm.startswith('GSM'):
             groups[key]['gsm_ids'].add(gsm)
-        groups[key]['total_bases'] += run.get('bases', 0)
+        groups[key]['total_size'] += _run_size(run, fastq_files)
 
     # Post-process groups
     result = {}
@@ -754,7 +1250,7 @@ def group_samples_by_type(runs: List[Dict]) -> Dict[str, Dict]:
             'count': len(info['runs']),
             'gsm_range': gsm_range,
             'gsm_ids': gsm_list,
-            'size_estimate': info['total_bases'] // 4,  # Rough compressed size
+            'size_estimate': info['total_size'],
             'strategy': info['strategy'],
             'layout': info['layout'],
             'description': f"{info['strategy']} {info['layout'].lower()}",
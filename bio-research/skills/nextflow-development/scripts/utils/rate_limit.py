@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting for NCBI E-utilities
+==================================
+Token-bucket limiter shared by threads and asyncio tasks.
+
+NCBI allows 3 requests/second per IP, or 10 requests/second with an API key.
+The key is read from NCBI_API_KEY; NCBI_RATE_LIMIT overrides the rate.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NCBI_RATE_DEFAULT = 3.0    # requests/second without an API key
+NCBI_RATE_WITH_KEY = 10.0  # requests/second with NCBI_API_KEY
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Each caller reserves a token under a short lock and then sleeps outside
+    it, so concurrent callers are spaced at the configured rate instead of
+    serializing on the lock. Tokens may go negative: that debt is the queue
+    of callers already waiting.
+
+    Tokens can stand for requests or, with acquire(n), for bytes when used
+    as a bandwidth cap.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum burst size (1 = evenly spaced requests)
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return how long the caller must wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1.0):
+        """Block the calling thread until the tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait for tokens without blocking the event loop."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Hold back all callers for `seconds`, e.g. after a 429 or Retry-After.
+
+        Drains the bucket and adds the pause as debt, so requests resume
+        evenly spaced after the pause rather than in a burst.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+        logger.warning(f"Rate limited by server - pausing requests for {seconds:.1f}s")
+
+
+def ncbi_api_key() -> Optional[str]:
+    """Return the NCBI API key from NCBI_API_KEY, if set."""
+    return os.environ.get('NCBI_API_KEY') or None
+
+
+_ncbi_limiter: Optional[TokenBucket] = None
+_ncbi_lock = threading.Lock()
+
+
+def ncbi_rate_limiter() -> TokenBucket:
+    """
+    Return the process-wide NCBI limiter.
+
+    Rate is NCBI_RATE_LIMIT if set, else 10/s with NCBI_API_KEY, else 3/s.
+    """
+    global _ncbi_limiter
+    if _ncbi_limiter is None:
+        with _ncbi_lock:
+            if _ncbi_limiter is None:
+                rate = float(os.environ.get('NCBI_RATE_LIMIT') or
+                             (NCBI_RATE_WITH_KEY if ncbi_api_key() else NCBI_RATE_DEFAULT))
+                logger.debug(f"NCBI rate limit: {rate:g} requests/second")
+                _ncbi_limiter = TokenBucket(rate)
+    return _ncbi_limiter
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Response Cache
+==============================
+On-disk cache for GEO/SRA/ENA/PubMed metadata responses, so repeated
+sra_geo_fetch.py commands on the same accession skip the network.
+
+Entries live in SQLite, keyed by a hash of the request URL (minus the API
+key, which is never written to disk). Each endpoint has its own TTL, total size is bounded with LRU
+eviction, and offline mode serves only from the cache.
+
+Configuration (environment):
+    NF_CORE_HTTP_CACHE: Cache directory (default ~/.nf-core/http-cache);
+                        'off' disables the cache
+    NF_CORE_HTTP_CACHE_MB: Size bound in MB (default 256)
+    NF_CORE_OFFLINE: '1' to never touch the network
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+
+# Per-endpoint TTLs in seconds. Accession records are effectively immutable;
+# searches and file reports can gain runs as submitters add data.
+DEFAULT_TTLS = {
+    'esearch': 1 * DAY,
+    'esummary': 30 * DAY,
+    'efetch': 30 * DAY,
+    'elink': 30 * DAY,
+    'filereport': 7 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+
+# Query parameters that do not change the response
+_IGNORED_PARAMS = {'api_key', 'tool', 'email'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+"""
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a response is not cached."""
+
+
+def endpoint_name(url: str) -> str:
+    """Endpoint used for TTL lookup, e.g. 'esummary' or 'filereport'."""
+    last = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    return last.split('.', 1)[0] or 'root'
+
+
+def redact_url(url: str) -> str:
+    """The URL without the API key and other ignored parameters, safe to store."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _IGNORED_PARAMS]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def cache_key(url: str) -> str:
+    """Hash of the URL with sorted query parameters, ignoring the API key."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in _IGNORED_PARAMS)
+    canonical = f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache shared by all threads of a process.
+
+    Args:
+        path: SQLite database file
+        max_bytes: Total body size before least-recently-used entries are evicted
+        ttls: Per-endpoint TTLs in seconds (merged over DEFAULT_TTLS)
+        offline: Serve only cached responses, ignoring TTLs
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        offline: bool = False,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = offline
+        self.refresh = False  # skip reads (still store) when True
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._redact_stored_urls()
+        # Running total of body sizes, so put() needs no SUM() over the table
+        self._total = self._stored_bytes()
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseCache']:
+        """Build the cache from NF_CORE_HTTP_CACHE* settings, or None if disabled."""
+        cache_dir = os.environ.get('NF_CORE_HTTP_CACHE', os.path.expanduser('~/.nf-core/http-cache'))
+        if cache_dir.lower() in ('off', 'none', '0'):
+            return None
+        max_mb = float(os.environ.get('NF_CORE_HTTP_CACHE_MB', 256))
+        offline = os.environ.get('NF_CORE_OFFLINE', '') not in ('', '0')
+        try:
+            return cls(Path(cache_dir) / 'responses.db', int(max_mb * 1024 * 1024), offline=offline)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"HTTP cache disabled ({cache_dir}): {e}")
+            return None
+
+    def _redact_stored_urls(self):
+        """Strip API keys from URLs stored by versions that kept them."""
+        rows = self._conn.execute("SELECT key, url FROM responses WHERE url LIKE '%api_key=%'").fetchall()
+        if rows:
+            self._conn.executemany("UPDATE responses SET url = ? WHERE key = ?",
+                                   [(redact_url(url), key) for key, url in rows])
+
+    def ttl(self, url: str) -> float:
+        return self.ttls.get(endpoint_name(url), DEFAULT_TTL)
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        Return (status, headers, body) for a cached URL, or None.
+
+        Expired entries are returned only with allow_stale or in offline mode.
+        """
+        if self.refresh and not allow_stale:
+            return None
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, headers, body, stored_at = row
+            if now - stored_at > self.ttl(url) and not (allow_stale or self.offline):
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return status, json.loads(headers), body
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """Store a response and evict least-recently-used entries over the size bound."""
+        now = time.time()
+        keep = {k: v for k, v in headers.items() if k in ('content-type', 'last-modified', 'etag')}
+        key = cache_key(url)
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, redact_url(url), endpoint_name(url), status, json.dumps(keep),
+                 sqlite3.Binary(body), len(body), now, now)
+            )
+            self._total += len(body) - (replaced[0] if replaced else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is under 90% of max_bytes."""
+        # Other processes share the database; start from the real total
+        total = self._total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._total = total
+        logger.debug(f"HTTP cache: evicted {evicted} entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and total body size (for `sra_geo_fetch.py cache`)."""
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {'entries': count, 'bytes': size}
+
+    def clear(self):
+        """Remove all entries (for `sra_geo_fetch.py cache --clear`)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("VACUUM")
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
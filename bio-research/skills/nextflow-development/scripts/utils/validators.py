@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import yaml
 
+from .file_discovery import ScanIndex
+
 
 @dataclass
 class ValidationResult:
@@ -57,7 +59,8 @@ def load_pipeline_config(pipeline: str) -> Optional[Dict]:
 def validate_samplesheet(
     rows: List[Dict],
     pipeline: str,
-    config: Optional[Dict] = None
+    config: Optional[Dict] = None,
+    index: Optional[ScanIndex] = None
 ) -> ValidationResult:
     """
     Validate samplesheet rows against pipeline requirements.
@@ -66,6 +69,8 @@ def validate_samplesheet(
         rows: List of row dictionaries
         pipeline: Pipeline name (e.g., 'rnaseq', 'sarek')
         config: Optional pre-loaded config dict
+        index: Optional scan of the data directory; paths it covers are
+            checked against it instead of the filesystem
 
     Returns:
         ValidationResult with errors, warnings, and suggestions
@@ -113,9 +118,10 @@ def validate_samplesheet(
         for col_name in ["fastq_1", "fastq_2", "bam", "bai"]:
             if col_name in row and row[col_name]:
                 path = row[col_name]
-                if not os.path.exists(path):
+                kind = index.lookup(path) if index is not None else None
+                if kind == "missing" or (kind is None and not os.path.exists(path)):
                     errors.append(f"Row {row_num}: File not found: {path}")
-                elif not os.path.isfile(path):
+                elif kind == "dir" or (kind is None and not os.path.isfile(path)):
                     errors.append(f"Row {row_num}: Not a file: {path}")
 
         # Validate enum values